@@ -0,0 +1,68 @@
+"""Benchmark of TimeSeries.hyd_year against the former row-wise loop.
+
+Run from the repository root with
+`python -m benchmarks.bench_hyd_year [--years 80] [--freq hourly]`.
+"""
+import argparse
+import timeit
+
+import pandas as pd
+
+from flyingfish.timeseries import TimeSeries
+from benchmarks.generators import FREQUENCIES, synthetic_frame
+
+
+def hyd_year_loop(
+        df: pd.DataFrame,
+        hyd_year_begin_month: int = 11,
+        hyd_year_begin_day: int = 1):
+    """Former implementation of TimeSeries.hyd_year (row-wise loop)."""
+    df_copy = df.copy(deep=True)
+    df_copy["hyd_year"] = df_copy.index.year
+    for index, _ in df_copy.iterrows():
+        hyd_new_year = pd.Timestamp(
+            year=index.year,
+            month=hyd_year_begin_month,
+            day=hyd_year_begin_day)
+        if index >= hyd_new_year:
+            df_copy.loc[index, "hyd_year"] = int(index.year + 1)
+        else:
+            df_copy.loc[index, "hyd_year"] = int(index.year)
+    return df_copy
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--years", type=int, default=80)
+    parser.add_argument("--freq", type=str, default="hourly", choices=list(FREQUENCIES))
+    parser.add_argument("--loop-rows", type=int, default=20_000,
+                        help="number of rows timed with the former loop")
+    args = parser.parse_args()
+
+    step = pd.tseries.frequencies.to_offset(FREQUENCIES[args.freq]).nanos
+    n_points = int(pd.Timedelta(days=365.25*args.years).value // step)
+    df = synthetic_frame(n_points, args.freq, columns=["discharge"], start="1940-01-01")
+    ts = TimeSeries(df)
+    n = len(df)
+
+    t_vec = min(timeit.repeat(lambda: ts.hyd_year(), number=1, repeat=5))
+    t_inplace = min(timeit.repeat(lambda: ts.hyd_year(copy=False), number=1, repeat=5))
+
+    # The loop is far too slow for the full record, so it is timed on
+    # the first rows and extrapolated linearly.
+    df_loop = df.iloc[:args.loop_rows]
+    t_loop = timeit.timeit(lambda: hyd_year_loop(df_loop), number=1)
+    t_loop_full = t_loop * n / len(df_loop)
+
+    assert (hyd_year_loop(df_loop)["hyd_year"].to_numpy()
+            == TimeSeries(df_loop).hyd_year().df["hyd_year"].to_numpy()).all()
+
+    print(f"rows: {n}")
+    print(f"vectorized (copy):    {t_vec:10.4f} s")
+    print(f"vectorized (inplace): {t_inplace:10.4f} s")
+    print(f"loop (extrapolated):  {t_loop_full:10.4f} s")
+    print(f"speed-up:             {t_loop_full / t_vec:10.0f}x")
+
+
+if __name__ == "__main__":
+    main()
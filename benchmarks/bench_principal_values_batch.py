@@ -0,0 +1,55 @@
+"""Scaling benchmark of network.principal_values_batch from 10 to 10,000
+synthetic stations, compared against one TimeSeries.principal_values
+call per station for the smaller networks.
+
+Run from the repository root with
+`python -m benchmarks.bench_principal_values_batch [--years 5] [--processes 4]`.
+"""
+import argparse
+import time
+
+import pandas as pd
+
+from flyingfish.timeseries import TimeSeries
+from flyingfish.network import principal_values_batch
+from benchmarks.generators import synthetic_long_frame
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--years", type=int, default=5)
+    parser.add_argument("--processes", type=int, default=1)
+    parser.add_argument("--stations", type=int, nargs="+",
+                        default=[10, 100, 1_000, 10_000])
+    parser.add_argument("--loop-max-stations", type=int, default=1_000)
+    args = parser.parse_args()
+
+    date_start = pd.Timestamp("2000-01-01")
+    date_end = pd.Timestamp("2100-01-01")
+    windows = {"year": list(range(1, 13)), "winter": [11, 12, 1, 2, 3, 4],
+               "summer": [5, 6, 7, 8, 9, 10]}
+
+    print(f"{'stations':>10} {'rows':>12} {'batch [s]':>10} {'loop [s]':>10}")
+    for n in args.stations:
+        df = synthetic_long_frame(n, 365*args.years, start="2000-01-01")
+
+        t0 = time.perf_counter()
+        principal_values_batch(
+            df, date_start, date_end, varname="discharge", windows=windows,
+            processes=args.processes)
+        t_batch = time.perf_counter() - t0
+
+        t_loop = float("nan")
+        if n <= args.loop_max_stations:
+            t0 = time.perf_counter()
+            for months in windows.values():
+                for station, group in df.groupby("station"):
+                    TimeSeries(group.set_index("date")).principal_values(
+                        date_start, date_end, varname="discharge", months=months)
+            t_loop = time.perf_counter() - t0
+
+        print(f"{n:>10} {len(df):>12} {t_batch:>10.3f} {t_loop:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
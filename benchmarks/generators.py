@@ -0,0 +1,55 @@
+"""Synthetic daily, hourly and 10-minute series for the benchmarks."""
+import numpy as np
+import pandas as pd
+
+
+FREQUENCIES = {
+    "daily": "D",
+    "hourly": "H",
+    "10min": "10T",
+}
+
+
+def synthetic_frame(
+        n_points: int,
+        freq: str = "daily",
+        columns: list[str] = ["discharge", "precipitation"],
+        start: str = "1950-01-01",
+        seed: int = 42):
+    """Returns a DataFrame with n_points rows, "date" as index and
+    gamma-distributed values with a seasonal cycle per column.
+
+    Args:
+        n_points (int): number of rows
+        freq (str, optional): "daily", "hourly" or "10min".
+            Defaults to "daily".
+        columns (list[str], optional): column names.
+            Defaults to ["discharge", "precipitation"].
+        start (str, optional): first date. Defaults to "1950-01-01".
+        seed (int, optional): seed of the random generator.
+            Defaults to 42.
+    """
+    index = pd.date_range(start, periods=n_points, freq=FREQUENCIES[freq], name="date")
+    rng = np.random.default_rng(seed)
+    season = 1 + 0.5*np.sin(2*np.pi*index.dayofyear.to_numpy()/365.25)
+    return pd.DataFrame(
+        {col: rng.gamma(2.0, 5.0, n_points)*season for col in columns},
+        index=index)
+
+
+def synthetic_long_frame(
+        n_stations: int,
+        n_points: int,
+        freq: str = "daily",
+        varname: str = "discharge",
+        start: str = "1950-01-01",
+        seed: int = 42):
+    """Returns a long-format DataFrame (station, date, <varname>) with
+    n_points rows per station (see synthetic_frame)."""
+    dates = pd.date_range(start, periods=n_points, freq=FREQUENCIES[freq])
+    rng = np.random.default_rng(seed)
+    season = 1 + 0.5*np.sin(2*np.pi*dates.dayofyear.to_numpy()/365.25)
+    return pd.DataFrame({
+        "station": np.repeat(np.arange(n_stations), n_points),
+        "date": np.tile(dates.to_numpy(), n_stations),
+        varname: rng.gamma(2.0, 5.0, n_stations*n_points)*np.tile(season, n_stations)})
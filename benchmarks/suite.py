@@ -0,0 +1,380 @@
+"""Benchmark suite of the public methods of NumericalList and TimeSeries
+and of the network batch functions.
+
+Every case is timed (best of --repeat runs, each on a freshly built
+object so that no cache is reused) and profiled once with tracemalloc
+(peak of the memory allocated by the call). The results are saved as
+JSON and compared against a stored baseline; cases which got slower or
+need more memory than the tolerance allows are reported as regressions
+and the exit code is 1.
+
+Run from the repository root with
+`python -m benchmarks.suite [--freq daily hourly 10min]
+[--points 1000 100000 1000000 10000000] [--stations 1 100 10000]
+[--output results.json] [--baseline benchmarks/baseline.json]`.
+A baseline is simply the output of an earlier run on the same machine
+(`--output benchmarks/baseline.json`).
+"""
+import argparse
+import datetime
+import io
+import json
+import platform
+import re
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from flyingfish.numericallist import NumericalList, Status
+from flyingfish.timeseries import TimeSeries
+from flyingfish.network import (
+    principal_values_batch, ausreisser_batch, partial_series_batch, append_batch,
+    annual_principal_values_batch)
+from benchmarks.generators import synthetic_frame, synthetic_long_frame
+
+
+def _numericallist(df: pd.DataFrame):
+    """Returns a fresh NumericalList of the discharge and weights."""
+    values = df["discharge"].to_numpy()
+    return NumericalList(values, status=Status.READY), np.arange(len(values)) % 5 + 1.0
+
+
+def _timeseries(df: pd.DataFrame):
+    """Returns a fresh TimeSeries of a copy of the frame."""
+    return (TimeSeries(df.copy()), df.index[0], df.index[-1])
+
+
+def _timeseries_with_cache(df: pd.DataFrame):
+    """Returns a TimeSeries of all but the last day with cached yearly
+    aggregates and the last day as new data."""
+    n_new = max(len(df) - df.index.searchsorted(df.index[-1] - pd.Timedelta("1D"), side="right"), 1)
+    ts = TimeSeries(df.iloc[:-n_new])
+    ts.yearly_aggregates("discharge", aggr="hyd_year")
+    return ts, df.iloc[-n_new:]
+
+
+def _network_with_cache(df: pd.DataFrame):
+    """Returns TimeSeries per station of all but the last date with
+    cached yearly aggregates and the last date as long-format update."""
+    last = df["date"] == df["date"].max()
+    data = {station: TimeSeries(group.drop(columns="station").set_index("date"))
+            for station, group in df[~last].groupby("station")}
+    for ts in data.values():
+        ts.yearly_aggregates("discharge", aggr="hyd_year")
+    return data, df[last]
+
+
+# name: (setup, call) -- setup(df) returns the arguments of call and is
+# not timed
+NUMERICALLIST_CASES = {
+    "NumericalList.__init__": (
+        lambda df: (df["discharge"].to_numpy(),),
+        lambda values: NumericalList(values, status=Status.READY)),
+    "NumericalList.set_status_ready": (_numericallist, lambda nl, w: nl.set_status_ready()),
+    "NumericalList.sorted": (_numericallist, lambda nl, w: nl.sorted()),
+    "NumericalList.order": (_numericallist, lambda nl, w: nl.order()),
+    "NumericalList.moments": (_numericallist, lambda nl, w: nl.moments()),
+    "NumericalList.arithmetic_mean": (_numericallist, lambda nl, w: nl.arithmetic_mean()),
+    "NumericalList.weighted_arithmetic_mean": (
+        _numericallist, lambda nl, w: nl.weighted_arithmetic_mean(w)),
+    "NumericalList.trimmed_mean": (_numericallist, lambda nl, w: nl.trimmed_mean(nl.n//10)),
+    "NumericalList.geometric_mean": (_numericallist, lambda nl, w: nl.geometric_mean()),
+    "NumericalList.exponential_mean": (_numericallist, lambda nl, w: nl.exponential_mean(2)),
+    "NumericalList.harmonic_mean": (_numericallist, lambda nl, w: nl.harmonic_mean()),
+    "NumericalList.median": (_numericallist, lambda nl, w: nl.median()),
+    "NumericalList.weighted_median": (_numericallist, lambda nl, w: nl.weighted_median(w)),
+    "NumericalList.weighted_percentile": (
+        _numericallist, lambda nl, w: nl.weighted_percentile([10, 50, 90], w)),
+    "NumericalList.percentile": (_numericallist, lambda nl, w: nl.percentile(90)),
+    "NumericalList.mu": (_numericallist, lambda nl, w: nl.mu(3)),
+    "NumericalList.avg_absolute_deviation_from_mean": (
+        _numericallist, lambda nl, w: nl.avg_absolute_deviation_from_mean()),
+    "NumericalList.avg_absolute_deviation_from_median": (
+        _numericallist, lambda nl, w: nl.avg_absolute_deviation_from_median()),
+    "NumericalList.median_absolute_deviaton": (
+        _numericallist, lambda nl, w: nl.median_absolute_deviaton()),
+    "NumericalList.variance": (_numericallist, lambda nl, w: nl.variance(biased=False)),
+    "NumericalList.stdev": (_numericallist, lambda nl, w: nl.stdev(biased=False)),
+    "NumericalList.range": (_numericallist, lambda nl, w: nl.range()),
+    "NumericalList.iqr": (_numericallist, lambda nl, w: nl.iqr()),
+    "NumericalList.coefficient_of_skewness": (
+        _numericallist, lambda nl, w: nl.coefficient_of_skewness(biased=False)),
+    "NumericalList.coefficient_of_kurtosis": (
+        _numericallist, lambda nl, w: nl.coefficient_of_kurtosis(biased=False)),
+    "NumericalList.mode": (_numericallist, lambda nl, w: nl.mode()),
+    "NumericalList.describe": (_numericallist, lambda nl, w: nl.describe()),
+}
+
+TIMESERIES_CASES = {
+    "TimeSeries.subset_timeframe": (
+        _timeseries, lambda ts, start, end: ts.subset_timeframe(start, end)),
+    "TimeSeries.subset_period": (
+        _timeseries, lambda ts, start, end: ts.subset_period(months=[11, 12, 1, 2, 3, 4])),
+    "TimeSeries.subset": (
+        _timeseries, lambda ts, start, end: ts.subset(start, end, months=[5, 6, 7, 8, 9, 10])),
+    "TimeSeries.hyd_year": (_timeseries, lambda ts, start, end: ts.hyd_year()),
+    "TimeSeries.principal_values": (
+        _timeseries, lambda ts, start, end: ts.principal_values(start, end, "discharge")),
+    "TimeSeries.principal_values_table": (
+        _timeseries, lambda ts, start, end: ts.principal_values_table(
+            start, end, ["discharge", "precipitation"])),
+    "TimeSeries.partial_series": (
+        _timeseries, lambda ts, start, end: ts.partial_series("discharge", per=95)),
+    "TimeSeries.independent_events": (
+        _timeseries, lambda ts, start, end: ts.independent_events(
+            "precipitation", threshold=20, min_inter_event_time="6H")),
+    "TimeSeries.flow_duration_curve": (
+        _timeseries, lambda ts, start, end: ts.flow_duration_curve("discharge")),
+    "TimeSeries.append": (
+        _timeseries_with_cache, lambda ts, new: ts.append(new)),
+    "TimeSeries.yearly_aggregates": (
+        _timeseries, lambda ts, start, end: ts.yearly_aggregates("discharge", aggr="hyd_year")),
+    "TimeSeries.annual_principal_values": (
+        _timeseries_with_cache, lambda ts, new: ts.append(new).annual_principal_values(
+            ["discharge"], aggr="hyd_year")),
+    "TimeSeries.calendar": (
+        _timeseries, lambda ts, start, end: ts.calendar("hyd_year")),
+    "TimeSeries.resample": (
+        _timeseries, lambda ts, start, end: ts.resample(
+            "day", rules={"discharge": ["mean", "max"], "precipitation": "sum"})),
+    "TimeSeries.summation_curve": (
+        _timeseries, lambda ts, start, end: ts.summation_curve("precipitation", reset="hyd_year")),
+    "TimeSeries.plot_hydrograph": (
+        _timeseries, lambda ts, start, end: ts.plot_hydrograph(["discharge"]).savefig(io.BytesIO())),
+    "TimeSeries.plot_summation_curve": (
+        _timeseries, lambda ts, start, end: ts.plot_summation_curve("precipitation").savefig(
+            io.BytesIO())),
+    "TimeSeries.outlier_bounds": (
+        _timeseries, lambda ts, start, end: ts.outlier_bounds(method="mad")),
+    "TimeSeries.outliers": (
+        _timeseries, lambda ts, start, end: ts.outliers(method="zscore")),
+    "TimeSeries.ausreisser": (
+        _timeseries, lambda ts, start, end: ts.ausreisser(method="hampel", solving="cap_outlier")),
+    "TimeSeries.duplicates": (_timeseries, lambda ts, start, end: ts.duplicates()),
+    "TimeSeries.missing_days": (_timeseries, lambda ts, start, end: ts.missing_days()),
+    "TimeSeries.consistency": (_timeseries, lambda ts, start, end: ts.consistency()),
+}
+
+NETWORK_CASES = {
+    "network.principal_values_batch": (
+        lambda df: (df, df["date"].iloc[0], df["date"].iloc[-1]),
+        lambda df, start, end: principal_values_batch(
+            df, start, end, "discharge",
+            windows={"year": list(range(1, 13)), "winter": [11, 12, 1, 2, 3, 4]})),
+    "network.ausreisser_batch": (
+        lambda df: (df,),
+        lambda df: ausreisser_batch(df, ["discharge"], method="mad")),
+    "network.partial_series_batch": (
+        lambda df: (df,),
+        lambda df: partial_series_batch(df, "discharge", per=95)),
+    "network.daily_refresh": (
+        _network_with_cache,
+        lambda data, new: annual_principal_values_batch(
+            append_batch(data, new), "discharge", aggr="hyd_year")),
+}
+
+
+def missing_cases():
+    """Returns the public methods of NumericalList and TimeSeries
+    [list[str]] without a benchmark case."""
+    cases = {**NUMERICALLIST_CASES, **TIMESERIES_CASES}
+    missing = []
+    for cls in [NumericalList, TimeSeries]:
+        for name in dir(cls):
+            if not name.startswith("_") and callable(getattr(cls, name)) \
+                    and f"{cls.__name__}.{name}" not in cases:
+                missing.append(f"{cls.__name__}.{name}")
+    return missing
+
+
+def measure(setup, call, df: pd.DataFrame, repeat: int = 3):
+    """Returns the best run time [s] of repeat calls and the peak memory
+    [bytes] allocated by one call (tracemalloc). The arguments are built
+    by setup before every call and are not measured."""
+    times = []
+    for _ in range(repeat):
+        args = setup(df)
+        t0 = time.perf_counter()
+        call(*args)
+        times.append(time.perf_counter() - t0)
+
+    args = setup(df)
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        base, _ = tracemalloc.get_traced_memory()
+        call(*args)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return min(times), peak - base
+
+
+def run(
+        freqs: list[str] = ["daily"],
+        points: list[int] = [1_000, 100_000],
+        stations: list[int] = [1, 100],
+        station_points: int = 3_650,
+        repeat: int = 3,
+        pattern: str = "",
+        verbose: bool = True):
+    """Returns the benchmark results [list[dict]] of all cases whose
+    name matches the regular expression pattern.
+
+    Args:
+        freqs (list[str], optional): frequencies of the series ("daily",
+            "hourly", "10min"). Defaults to ["daily"].
+        points (list[int], optional): lengths of the single series.
+            Defaults to [1_000, 100_000].
+        stations (list[int], optional): numbers of stations of the
+            network cases. Defaults to [1, 100].
+        station_points (int, optional): length of the series per
+            station. Defaults to 3_650.
+        repeat (int, optional): timed runs per case. Defaults to 3.
+        pattern (str, optional): regular expression of the case names.
+            Defaults to "" (all cases).
+        verbose (bool, optional): print each result. Defaults to True.
+    """
+    results = []
+
+    def _run_cases(cases: dict, df: pd.DataFrame, freq: str, n_points: int, n_stations: int):
+        for name, (setup, call) in cases.items():
+            if not re.search(pattern, name):
+                continue
+            seconds, peak = measure(setup, call, df, repeat)
+            result = {
+                "name": name,
+                "freq": freq,
+                "n_points": n_points,
+                "n_stations": n_stations,
+                "time_s": seconds,
+                "peak_memory_bytes": peak,
+            }
+            results.append(result)
+            if verbose:
+                print(f"{name:<50} {freq:>6} {n_points:>10} {n_stations:>6} "
+                      f"{seconds:>10.4f} s {peak/2**20:>10.1f} MiB")
+
+    for freq in freqs:
+        for n in points:
+            df = synthetic_frame(n, freq)
+            _run_cases({**NUMERICALLIST_CASES, **TIMESERIES_CASES}, df, freq, n, 1)
+        for n in stations:
+            df = synthetic_long_frame(n, station_points, freq)
+            _run_cases(NETWORK_CASES, df, freq, station_points, n)
+    return results
+
+
+def _key(result: dict):
+    return (result["name"], result["freq"], result["n_points"], result["n_stations"])
+
+
+def compare(
+        results: list[dict],
+        baseline: list[dict],
+        time_tolerance: float = 0.25,
+        memory_tolerance: float = 0.25,
+        min_time: float = 5e-3,
+        min_memory: int = 2**20):
+    """Returns the regressions [list[dict]] of results compared to a
+    baseline of the same cases. A case regresses if its time (memory)
+    exceeds the baseline by more than the relative tolerance and by more
+    than min_time seconds (min_memory bytes), so that noise of very fast
+    cases is not reported.
+
+    Args:
+        results (list[dict]): results of run
+        baseline (list[dict]): results of an earlier run
+        time_tolerance (float, optional): allowed relative increase of
+            the time. Defaults to 0.25.
+        memory_tolerance (float, optional): allowed relative increase of
+            the peak memory. Defaults to 0.25.
+        min_time (float, optional): allowed absolute increase of the
+            time in seconds. Defaults to 5e-3.
+        min_memory (int, optional): allowed absolute increase of the
+            peak memory in bytes. Defaults to 2**20.
+    """
+    reference = {_key(r): r for r in baseline}
+    regressions = []
+    for result in results:
+        base = reference.get(_key(result))
+        if base is None:
+            continue
+        for field, tolerance, minimum in [
+                ("time_s", time_tolerance, min_time),
+                ("peak_memory_bytes", memory_tolerance, min_memory)]:
+            new, old = result[field], base[field]
+            if new > old*(1 + tolerance) and new - old > minimum:
+                regressions.append({
+                    **{k: result[k] for k in ["name", "freq", "n_points", "n_stations"]},
+                    "field": field,
+                    "baseline": old,
+                    "value": new,
+                    "ratio": new/old if old else float("inf"),
+                })
+    return regressions
+
+
+def save(results: list[dict], path: str):
+    """Saves the results together with the environment as JSON."""
+    document = {
+        "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "results": results,
+    }
+    with open(path, "w") as f:
+        json.dump(document, f, indent=2)
+
+
+def load(path: str):
+    """Returns the results [list[dict]] of a saved JSON file."""
+    with open(path) as f:
+        return json.load(f)["results"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--freq", nargs="+", default=["daily", "hourly", "10min"])
+    parser.add_argument("--points", type=int, nargs="+",
+                        default=[1_000, 100_000, 1_000_000, 10_000_000])
+    parser.add_argument("--stations", type=int, nargs="+", default=[1, 100, 10_000])
+    parser.add_argument("--station-points", type=int, default=3_650)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--filter", type=str, default="",
+                        help="regular expression of the case names")
+    parser.add_argument("--output", type=str, default="benchmark_results.json")
+    parser.add_argument("--baseline", type=str, default=None)
+    parser.add_argument("--time-tolerance", type=float, default=0.25)
+    parser.add_argument("--memory-tolerance", type=float, default=0.25)
+    args = parser.parse_args()
+
+    missing = missing_cases()
+    if missing:
+        print(f"methods without benchmark case: {', '.join(missing)}")
+
+    results = run(args.freq, args.points, args.stations, args.station_points,
+                  args.repeat, args.filter)
+    save(results, args.output)
+    print(f"results saved to {args.output}")
+
+    if args.baseline is not None:
+        regressions = compare(results, load(args.baseline),
+                              args.time_tolerance, args.memory_tolerance)
+        for r in regressions:
+            print(f"REGRESSION {r['name']} ({r['freq']}, {r['n_points']} points, "
+                  f"{r['n_stations']} stations): {r['field']} "
+                  f"{r['baseline']:.4g} -> {r['value']:.4g} ({r['ratio']:.2f}x)")
+        if regressions:
+            sys.exit(1)
+        print("no regressions")
+
+
+if __name__ == "__main__":
+    main()
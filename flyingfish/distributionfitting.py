@@ -0,0 +1,286 @@
+import numpy as np
+import pandas as pd
+import scipy.special
+import scipy.stats
+
+from flyingfish.numericallist import NumericalList
+from flyingfish.parallel import map_bounded
+
+
+DISTRIBUTIONS = {
+    "gumbel": scipy.stats.gumbel_r,
+    "gev": scipy.stats.genextreme,
+    "pearson3": scipy.stats.pearson3,
+    "lognorm": scipy.stats.lognorm,
+    "norm": scipy.stats.norm,
+}
+
+EULER_GAMMA = 0.5772156649015329
+
+
+def lmoments(samples: np.ndarray):
+    """Returns the sample L-moments l1, l2 and the L-moment ratios t3
+    (L-skewness), t4 (L-kurtosis) [tuple[np.ndarray, ...]].
+
+    The L-moments are derived in closed form from the unbiased
+    probability weighted moments b0..b3 of the sorted samples. All
+    samples of a 2-D array (one per row) are processed at once.
+
+    Args:
+        samples (np.ndarray): 1-D sample or 2-D array with one sample of
+            equal size per row
+    """
+    x = np.sort(np.asarray(samples, dtype=float), axis=-1)
+    n = x.shape[-1]
+    j = np.arange(n, dtype=float)
+    b0 = x.mean(axis=-1)
+    b1 = (x @ (j/(n-1)))/n
+    b2 = (x @ (j*(j-1)/((n-1)*(n-2))))/n
+    b3 = (x @ (j*(j-1)*(j-2)/((n-1)*(n-2)*(n-3))))/n
+    l1 = b0
+    l2 = 2*b1 - b0
+    l3 = 6*b2 - 6*b1 + b0
+    l4 = 20*b3 - 30*b2 + 12*b1 - b0
+    return l1, l2, l3/l2, l4/l2
+
+
+def lmoment_parameters(distribution: str, l1, l2, t3):
+    """Returns the parameters [dict[str, np.ndarray]] (scipy.stats
+    naming) of a distribution from L-moments (Hosking & Wallis 1997).
+    Works element-wise on arrays of L-moments. For "lognorm" the
+    L-moments of the logarithms have to be given.
+
+    Args:
+        distribution (str): "gumbel", "gev", "pearson3", "lognorm" or
+            "norm"
+        l1 (np.ndarray): first L-moment
+        l2 (np.ndarray): second L-moment
+        t3 (np.ndarray): L-skewness
+    """
+    l1, l2, t3 = np.asarray(l1), np.asarray(l2), np.asarray(t3)
+    match distribution:
+        case "gumbel":
+            scale = l2/np.log(2)
+            return {"loc": l1 - EULER_GAMMA*scale, "scale": scale}
+        case "gev":
+            c = 2/(3 + t3) - np.log(2)/np.log(3)
+            k = 7.8590*c + 2.9554*c**2
+            gamma_k = scipy.special.gamma(1 + k)
+            scale = l2*k/((1 - 2**(-k))*gamma_k)
+            return {"c": k, "loc": l1 - scale*(1 - gamma_k)/k, "scale": scale}
+        case "pearson3":
+            # symmetric samples: normal distribution (limit alpha -> inf)
+            symmetric = np.abs(t3) < 1e-8
+            abs_t3 = np.where(symmetric, 0.5, np.abs(t3))
+            z = np.where(abs_t3 < 1/3, 3*np.pi*abs_t3**2, 1 - abs_t3)
+            alpha = np.where(
+                abs_t3 < 1/3,
+                (1 + 0.2906*z)/(z + 0.1882*z**2 + 0.0442*z**3),
+                (0.36067*z - 0.59567*z**2 + 0.25361*z**3)
+                / (1 - 2.78861*z + 2.56096*z**2 - 0.77045*z**3))
+            # sqrt(alpha)*Gamma(alpha)/Gamma(alpha + 1/2), stable for large alpha
+            ratio = np.sqrt(alpha)/scipy.special.poch(alpha, 0.5)
+            return {
+                "skew": np.where(symmetric, 0.0, np.sign(t3)*2/np.sqrt(alpha)),
+                "loc": l1,
+                "scale": l2*np.sqrt(np.pi)*np.where(symmetric, 1.0, ratio),
+            }
+        case "lognorm":
+            return {"s": l2*np.sqrt(np.pi), "loc": np.zeros_like(l1), "scale": np.exp(l1)}
+        case "norm":
+            return {"loc": l1, "scale": l2*np.sqrt(np.pi)}
+        case _:
+            raise ValueError(f"Unknown distribution {distribution}!")
+
+
+class FittedDistribution:
+
+    def __init__(self, distribution: str, params: dict[str, float], method: str):
+        """Constructor
+
+        Args:
+            distribution (str): "gumbel", "gev", "pearson3", "lognorm" or
+                "norm"
+            params (dict[str, float]): parameters in scipy.stats naming
+            method (str): "lmoments" or "mle"
+        """
+        self.distribution: str = distribution
+        self.params: dict[str, float] = params
+        self.method: str = method
+        self.frozen = DISTRIBUTIONS[distribution](**params)
+
+    def cdf(self, x: float | np.ndarray):
+        """Returns the non-exceedance probabilities [float | np.ndarray]."""
+        return self.frozen.cdf(x)
+
+    def ppf(self, p: float | np.ndarray):
+        """Returns the values [float | np.ndarray] of the non-exceedance
+        probabilities p."""
+        return self.frozen.ppf(p)
+
+    def return_level(self, return_period: float | np.ndarray):
+        """Returns the value [float | np.ndarray] which is exceeded on
+        average once in return_period years (annual series)."""
+        return self.frozen.ppf(1 - 1/np.asarray(return_period, dtype=float))
+
+    def goodness_of_fit(self, data: NumericalList):
+        """Returns goodness-of-fit statistics [dict[str, float]] of the
+        fitted distribution for a sample: Kolmogorov-Smirnov statistic
+        "ks" and p-value "ks_pvalue", Anderson-Darling statistic "ad",
+        log-likelihood "loglik" and "aic" (the p-value is too optimistic
+        if the parameters were fitted to the same sample)."""
+        x = data.sorted()
+        n = len(x)
+        ks = scipy.stats.kstest(x, self.frozen.cdf)
+        f = np.clip(self.frozen.cdf(x), 1e-12, 1 - 1e-12)
+        i = np.arange(1, n + 1)
+        ad = -n - np.sum((2*i - 1)*(np.log(f) + np.log(1 - f[::-1])))/n
+        loglik = np.sum(self.frozen.logpdf(x))
+        # the location of the log-normal distribution is fixed at 0
+        n_params = len(self.params) - (self.distribution == "lognorm")
+        return {
+            "ks": ks.statistic,
+            "ks_pvalue": ks.pvalue,
+            "ad": ad,
+            "loglik": loglik,
+            "aic": 2*n_params - 2*loglik,
+        }
+
+
+def fit(data: NumericalList, distribution: str, method: str = "lmoments"):
+    """Returns the distribution fitted to a sample (e.g. annual maximum
+    series) [FittedDistribution].
+
+    Args:
+        data (NumericalList): sample
+        distribution (str): "gumbel", "gev", "pearson3", "lognorm" or
+            "norm"
+        method (str, optional): "lmoments" or "mle" (maximum likelihood).
+            Defaults to "lmoments".
+    """
+    params = _fit_params(data.data, distribution, method)
+    return FittedDistribution(distribution, params, method)
+
+
+def _fit_params(x: np.ndarray, distribution: str, method: str):
+    """Returns the fitted parameters [dict[str, float]] of a sample."""
+    if distribution not in DISTRIBUTIONS:
+        raise ValueError(f"Unknown distribution {distribution}!")
+    x = np.asarray(x, dtype=float)
+    match method:
+        case "lmoments":
+            sample = np.log(x) if distribution == "lognorm" else x
+            l1, l2, t3, _ = lmoments(sample)
+            return {k: float(v) for k, v in lmoment_parameters(distribution, l1, l2, t3).items()}
+        case "mle":
+            dist = DISTRIBUTIONS[distribution]
+            if distribution == "lognorm":
+                s, loc, scale = dist.fit(x, floc=0)
+                return {"s": s, "loc": loc, "scale": scale}
+            values = dist.fit(x)
+            names = [*(dist.shapes.split(", ") if dist.shapes else []), "loc", "scale"]
+            return dict(zip(names, map(float, values)))
+        case _:
+            raise ValueError(f"Unknown fitting method {method}!")
+
+
+def fit_batch(
+        samples: dict[str, np.ndarray | NumericalList] | np.ndarray,
+        distribution: str,
+        method: str = "lmoments",
+        return_periods: list[float] = [],
+        processes: int = 1,
+        chunksize: int = 64):
+    """Returns the distributions fitted to many samples (e.g. one annual
+    maximum series per station).
+
+    L-moment fits of a 2-D array (one sample of equal size per row) are
+    computed in one vectorized pass. All other fits run sample by
+    sample, optionally in a process pool.
+
+    Args:
+        samples (dict[str, np.ndarray | NumericalList] | np.ndarray):
+            samples per station id or 2-D array with one sample per row
+        distribution (str): "gumbel", "gev", "pearson3", "lognorm" or
+            "norm"
+        method (str, optional): "lmoments" or "mle".
+            Defaults to "lmoments".
+        return_periods (list[float], optional): return periods of the
+            return levels to add. Defaults to [].
+        processes (int, optional): number of worker processes.
+            Defaults to 1.
+        chunksize (int, optional): samples per task of the process pool.
+            Defaults to 64.
+
+    Returns:
+        pd.DataFrame: one row per sample with the parameters and the
+            return levels (columns "T<return period>")
+    """
+    if isinstance(samples, dict):
+        names = list(samples.keys())
+        arrays = [s.data if isinstance(s, NumericalList) else np.asarray(s, dtype=float)
+                  for s in samples.values()]
+    else:
+        arrays = np.asarray(samples, dtype=float)
+        names = list(range(len(arrays)))
+
+    if method == "lmoments" and isinstance(arrays, np.ndarray):
+        sample = np.log(arrays) if distribution == "lognorm" else arrays
+        l1, l2, t3, _ = lmoments(sample)
+        table = pd.DataFrame(lmoment_parameters(distribution, l1, l2, t3), index=names)
+    else:
+        params = map_bounded(
+            _fit_params, arrays, dict(distribution=distribution, method=method),
+            processes, chunksize)
+        table = pd.DataFrame(params, index=names)
+
+    dist = DISTRIBUTIONS[distribution]
+    params = {k: table[k].to_numpy() for k in table.columns}
+    for T in return_periods:
+        table[f"T{T}"] = dist.ppf(1 - 1/T, **params)
+    return table
+
+
+def bootstrap_return_levels(
+        data: NumericalList,
+        distribution: str,
+        return_periods: list[float],
+        n_boot: int = 1000,
+        confidence: float = 0.9,
+        method: str = "lmoments",
+        seed: int | None = None):
+    """Returns bootstrap confidence intervals of return levels.
+
+    All n_boot resamples are drawn as one 2-D index array. For
+    "lmoments" the fits of all resamples are computed in one vectorized
+    pass, for "mle" they are fitted one by one.
+
+    Args:
+        data (NumericalList): sample (e.g. annual maximum series)
+        distribution (str): "gumbel", "gev", "pearson3", "lognorm" or
+            "norm"
+        return_periods (list[float]): return periods
+        n_boot (int, optional): number of resamples. Defaults to 1000.
+        confidence (float, optional): confidence level. Defaults to 0.9.
+        method (str, optional): "lmoments" or "mle".
+            Defaults to "lmoments".
+        seed (int | None, optional): seed of the random generator.
+            Defaults to None.
+
+    Returns:
+        pd.DataFrame: index "return_period" and the columns "estimate",
+            "lower" and "upper"
+    """
+    x = data.data
+    rng = np.random.default_rng(seed)
+    resamples = x[rng.integers(0, len(x), size=(n_boot, len(x)))]
+    table = fit_batch(resamples, distribution, method, return_periods=return_periods)
+    levels = table[[f"T{T}" for T in return_periods]].to_numpy()
+
+    alpha = (1 - confidence)/2
+    estimate = fit(data, distribution, method).return_level(np.asarray(return_periods))
+    return pd.DataFrame({
+        "estimate": estimate,
+        "lower": np.nanquantile(levels, alpha, axis=0),
+        "upper": np.nanquantile(levels, 1 - alpha, axis=0),
+    }, index=pd.Index(return_periods, name="return_period"))
@@ -0,0 +1,91 @@
+import numpy as np
+import pandas as pd
+
+from flyingfish.numericallist import NumericalList, Status
+
+
+# Parameter a of the plotting position formula (i-a)/(n+1-2a)
+PLOTTING_POSITIONS = {
+    "weibull": 0.0,
+    "blom": 0.375,
+    "cunnane": 0.4,
+    "gringorten": 0.44,
+    "hazen": 0.5,
+}
+
+
+def plotting_positions(ranks: np.ndarray, n: np.ndarray | int, method: str = "weibull"):
+    """Returns the non-exceedance probabilities [np.ndarray] of ranks
+    (1 for the smallest value) within samples of size n.
+
+    Args:
+        ranks (np.ndarray): ranks starting at 1
+        n (np.ndarray | int): sample size (per rank)
+        method (str, optional): "weibull", "blom", "cunnane",
+            "gringorten" or "hazen". Defaults to "weibull".
+    """
+    if method not in PLOTTING_POSITIONS:
+        raise ValueError(f"Unknown plotting position {method}!")
+    a = PLOTTING_POSITIONS[method]
+    return (ranks - a)/(n + 1 - 2*a)
+
+
+class EmpiricalDistribution:
+
+    def __init__(self, data: NumericalList, plotting_position: str = "weibull"):
+        """Constructor
+
+        Holds the sorted sample and its plotting positions, so that
+        cdf and quantile queries for many values are answered by binary
+        search without sorting again. The sorted sample is taken from
+        the cached sorted view of the NumericalList.
+
+        Args:
+            data (NumericalList): sample
+            plotting_position (str, optional): "weibull", "blom",
+                "cunnane", "gringorten" or "hazen". Defaults to "weibull".
+        """
+        self.values: np.ndarray = data.sorted()
+        self.n: int = data.n
+        self.plotting_position: str = plotting_position
+        self.probabilities: np.ndarray = plotting_positions(
+            np.arange(1, self.n + 1), self.n, plotting_position)
+
+    @classmethod
+    def from_timeseries(cls, ts, varname: str, plotting_position: str = "weibull"):
+        """Returns the EmpiricalDistribution of a TimeSeries column
+        (missing values are skipped).
+
+        Args:
+            ts (TimeSeries): time series
+            varname (str): column name (e.g. "discharge")
+            plotting_position (str, optional): see constructor.
+                Defaults to "weibull".
+        """
+        values = ts.df[varname].dropna().to_numpy(dtype=float)
+        return cls(NumericalList(values, status=Status.READY), plotting_position)
+
+    def cdf(self, x: float | np.ndarray):
+        """Returns the non-exceedance probabilities [float | np.ndarray]
+        of x, linearly interpolated between the plotting positions
+        (0 below the smallest and 1 above the largest value)."""
+        return np.interp(x, self.values, self.probabilities, left=0.0, right=1.0)
+
+    def quantile(self, p: float | np.ndarray):
+        """Returns the values [float | np.ndarray] of the non-exceedance
+        probabilities p, linearly interpolated between the plotting
+        positions (limited to the smallest and largest value)."""
+        return np.interp(p, self.probabilities, self.values)
+
+    def exceedance_probabilities(self):
+        """Returns the exceedance probabilities [np.ndarray] of the
+        sorted values."""
+        return 1 - self.probabilities
+
+    def duration_curve(self):
+        """Returns the duration curve [pd.DataFrame] with the columns
+        "exceedance_probability" and "value" in descending order of the
+        values."""
+        return pd.DataFrame({
+            "exceedance_probability": self.exceedance_probabilities()[::-1],
+            "value": self.values[::-1]})
@@ -0,0 +1,305 @@
+import numpy as np
+import pandas as pd
+import scipy.stats
+
+from flyingfish.numericallist import NumericalList, Status
+from flyingfish.timeseries import TimeSeries
+from flyingfish.parallel import map_bounded
+
+
+TESTS = ["pettitt", "snht", "buishand", "mann_kendall"]
+
+
+def pettitt(
+        data: NumericalList | TimeSeries,
+        varname: str | None = None,
+        n_permutations: int = 999,
+        seed: int | None = None,
+        batch_size: int = 1000):
+    """Returns Pettitt's test of a change point in the location of a
+    series.
+
+    The statistic U_t = 2*sum(r_1..r_t) - t*(n+1) is derived from one
+    ranking of the series (O(n log n)) instead of comparing all pairs.
+    Permuting a series permutes its ranks, so the permutation p-value
+    reuses the ranks as well.
+
+    Args:
+        data (NumericalList | TimeSeries): series in chronological order
+        varname (str | None, optional): column of a TimeSeries (missing
+            values are skipped). Defaults to None.
+        n_permutations (int, optional): number of random permutations of
+            the p-value. Uses the asymptotic approximation
+            2*exp(-6K^2/(n^3+n^2)) if 0. Defaults to 999.
+        seed (int | None, optional): seed of the random generator.
+            Defaults to None.
+        batch_size (int, optional): permutations per vectorized batch.
+            Defaults to 1000.
+
+    Returns:
+        dict: "statistic" K = max|U_t|, "change_point" (position of the
+            first value after the change, its date for a TimeSeries) and
+            "p_value"
+    """
+    x, index = _values(data, varname)
+    n = len(x)
+    ranks = scipy.stats.rankdata(x)
+    u = _pettitt_u(ranks)
+    k = np.argmax(u)
+    statistic = u[k]
+    if n_permutations == 0:
+        p_value = min(1.0, 2*np.exp(-6*statistic**2/(n**3 + n**2)))
+    else:
+        p_value = _permutation_p_value(
+            ranks, statistic, lambda r: _pettitt_u(r).max(axis=-1),
+            n_permutations, seed, batch_size)
+    return _result(statistic, k + 1, p_value, index)
+
+
+def snht(
+        data: NumericalList | TimeSeries,
+        varname: str | None = None,
+        n_permutations: int = 999,
+        seed: int | None = None,
+        batch_size: int = 1000):
+    """Returns the standard normal homogeneity test (SNHT, Alexandersson
+    1986) of a shift in the mean of a series.
+
+    T_k = k*z1^2 + (n-k)*z2^2 of the means z1, z2 of the standardized
+    values before and after k is computed for all k from one cumulative
+    sum.
+
+    Args:
+        data (NumericalList | TimeSeries): series in chronological order
+        varname (str | None, optional): column of a TimeSeries.
+            Defaults to None.
+        n_permutations (int, optional): number of random permutations of
+            the p-value (NaN if 0). Defaults to 999.
+        seed (int | None, optional): seed of the random generator.
+            Defaults to None.
+        batch_size (int, optional): permutations per vectorized batch.
+            Defaults to 1000.
+
+    Returns:
+        dict: "statistic" T0 = max T_k, "change_point" (see pettitt) and
+            "p_value"
+    """
+    x, index = _values(data, varname)
+    z = (x - x.mean())/x.std(ddof=1)
+    t = _snht_t(z)
+    k = np.argmax(t)
+    p_value = _permutation_p_value(
+        z, t[k], lambda z: _snht_t(z).max(axis=-1), n_permutations, seed, batch_size)
+    return _result(t[k], k + 1, p_value, index)
+
+
+def buishand(
+        data: NumericalList | TimeSeries,
+        varname: str | None = None,
+        n_permutations: int = 999,
+        seed: int | None = None,
+        batch_size: int = 1000):
+    """Returns Buishand's range test (1982) of a shift in the mean of a
+    series based on the cumulative deviations from the mean S_k.
+
+    Args:
+        data (NumericalList | TimeSeries): series in chronological order
+        varname (str | None, optional): column of a TimeSeries.
+            Defaults to None.
+        n_permutations (int, optional): number of random permutations of
+            the p-value of Q (NaN if 0). Defaults to 999.
+        seed (int | None, optional): seed of the random generator.
+            Defaults to None.
+        batch_size (int, optional): permutations per vectorized batch.
+            Defaults to 1000.
+
+    Returns:
+        dict: "statistic" Q/sqrt(n) = max|S_k|/(s*sqrt(n)),
+            "change_point" (see pettitt), "p_value" and "range"
+            R/sqrt(n) = (max S_k - min S_k)/(s*sqrt(n))
+    """
+    x, index = _values(data, varname)
+    n = len(x)
+    s = np.cumsum(x - x.mean())[:-1]/(x.std()*np.sqrt(n))
+    k = np.argmax(np.abs(s))
+    statistic = abs(s[k])
+    p_value = _permutation_p_value(
+        x, statistic, _buishand_q, n_permutations, seed, batch_size)
+    result = _result(statistic, k + 1, p_value, index)
+    result["range"] = s.max() - s.min()
+    return result
+
+
+def mann_kendall(data: NumericalList | TimeSeries, varname: str | None = None):
+    """Returns the Mann-Kendall test of a monotonic trend.
+
+    The statistic S = sum(sign(x_j - x_i)) over all i < j is derived
+    from Kendall's tau between time and values (O(n log n)), the
+    variance is corrected for ties and the p-value (two-sided) uses
+    the normal approximation with continuity correction.
+
+    Args:
+        data (NumericalList | TimeSeries): series in chronological order
+        varname (str | None, optional): column of a TimeSeries.
+            Defaults to None.
+
+    Returns:
+        dict: "statistic" S, "z", "tau" (Kendall's tau-b) and "p_value"
+    """
+    x, _ = _values(data, varname)
+    n = len(x)
+    tau, _ = scipy.stats.kendalltau(np.arange(n), x)
+    _, ties = np.unique(x, return_counts=True)
+    n0 = n*(n - 1)/2
+    n_tied = np.sum(ties*(ties - 1)/2)
+    s = np.round(tau*np.sqrt(n0*(n0 - n_tied)))
+    var = (n*(n - 1)*(2*n + 5) - np.sum(ties*(ties - 1)*(2*ties + 5)))/18
+    z = (s - np.sign(s))/np.sqrt(var)
+    return {
+        "statistic": s,
+        "z": z,
+        "tau": tau,
+        "p_value": 2*scipy.stats.norm.sf(abs(z)),
+    }
+
+
+def homogeneity_batch(
+        samples: dict[str, np.ndarray | NumericalList] | np.ndarray,
+        tests: list[str] = TESTS,
+        n_permutations: int = 999,
+        seed: int | None = None,
+        processes: int = 1,
+        chunksize: int = 16):
+    """Returns homogeneity tests of many station records (e.g. one
+    annual series per station), optionally in a process pool. Every
+    record gets an independent random stream derived from seed, so the
+    result does not depend on the number of processes.
+
+    Args:
+        samples (dict[str, np.ndarray | NumericalList] | np.ndarray):
+            records per station id or 2-D array with one record per row
+        tests (list[str], optional): tests to run ("pettitt", "snht",
+            "buishand", "mann_kendall"). Defaults to all.
+        n_permutations (int, optional): number of random permutations of
+            the p-values. Defaults to 999.
+        seed (int | None, optional): seed of the random generator.
+            Defaults to None.
+        processes (int, optional): number of worker processes.
+            Defaults to 1.
+        chunksize (int, optional): records per task of the process pool.
+            Defaults to 16.
+
+    Returns:
+        pd.DataFrame: one row per record with the columns
+            "<test>_statistic", "<test>_p_value" and (except
+            Mann-Kendall) "<test>_change_point"
+    """
+    for test in tests:
+        if test not in TESTS:
+            raise ValueError(f"Unknown homogeneity test {test}!")
+    if isinstance(samples, dict):
+        names = list(samples.keys())
+        arrays = [s.data if isinstance(s, NumericalList) else np.asarray(s, dtype=float)
+                  for s in samples.values()]
+    else:
+        arrays = list(np.asarray(samples, dtype=float))
+        names = list(range(len(arrays)))
+
+    seeds = np.random.SeedSequence(seed).spawn(len(arrays))
+    rows = map_bounded(
+        _test_record, zip(arrays, seeds), dict(tests=tests, n_permutations=n_permutations),
+        processes, chunksize)
+    return pd.DataFrame(rows, index=names)
+
+
+def _test_record(
+        record: tuple[np.ndarray, np.random.SeedSequence],
+        tests: list[str],
+        n_permutations: int):
+    """Returns the results of the tests of one record (values and seed
+    of its random stream) [dict]."""
+    x, seed = record
+    data = NumericalList(x[~np.isnan(x)], status=Status.READY)
+    row = {}
+    for test, stream in zip(tests, seed.spawn(len(tests))):
+        match test:
+            case "pettitt":
+                result = pettitt(data, n_permutations=n_permutations, seed=stream)
+            case "snht":
+                result = snht(data, n_permutations=n_permutations, seed=stream)
+            case "buishand":
+                result = buishand(data, n_permutations=n_permutations, seed=stream)
+            case "mann_kendall":
+                result = mann_kendall(data)
+        row[f"{test}_statistic"] = result["statistic"]
+        row[f"{test}_p_value"] = result["p_value"]
+        if "change_point" in result:
+            row[f"{test}_change_point"] = result["change_point"]
+    return row
+
+
+def _values(data: NumericalList | TimeSeries, varname: str | None):
+    """Returns the values [np.ndarray] and, for a TimeSeries, the dates
+    [pd.DatetimeIndex | None] of a series without missing values."""
+    if isinstance(data, TimeSeries):
+        if varname is None:
+            raise ValueError("varname must be given for a TimeSeries!")
+        column = data.df[varname].dropna()
+        return column.to_numpy(dtype=float), column.index
+    return np.asarray(data.data, dtype=float), None
+
+
+def _result(statistic: float, change_point: int, p_value: float, index: pd.DatetimeIndex | None):
+    """Returns the result [dict] of a change point test."""
+    return {
+        "statistic": float(statistic),
+        "change_point": change_point if index is None else index[change_point],
+        "p_value": float(p_value),
+    }
+
+
+def _pettitt_u(ranks: np.ndarray):
+    """Returns |U_t| for t = 1..n-1 of the rows of ranks."""
+    n = ranks.shape[-1]
+    t = np.arange(1, n)
+    return np.abs(2*np.cumsum(ranks, axis=-1)[..., :-1] - t*(n + 1))
+
+
+def _snht_t(z: np.ndarray):
+    """Returns T_k for k = 1..n-1 of the rows of standardized values."""
+    n = z.shape[-1]
+    k = np.arange(1, n)
+    cumulative = np.cumsum(z, axis=-1)
+    total = cumulative[..., -1:]
+    cumulative = cumulative[..., :-1]
+    return cumulative**2/k + (total - cumulative)**2/(n - k)
+
+
+def _buishand_q(x: np.ndarray):
+    """Returns Q/sqrt(n) of the rows of x."""
+    n = x.shape[-1]
+    s = np.cumsum(x - x.mean(axis=-1, keepdims=True), axis=-1)[..., :-1]
+    return np.abs(s).max(axis=-1)/(x.std(axis=-1)*np.sqrt(n))
+
+
+def _permutation_p_value(
+        x: np.ndarray,
+        statistic: float,
+        func,
+        n_permutations: int,
+        seed: int | np.random.SeedSequence | None,
+        batch_size: int):
+    """Returns the permutation p-value [float] (1 + number of
+    permutations with a statistic >= statistic)/(1 + n_permutations).
+    The permutations are drawn and evaluated in 2-D batches of at most
+    batch_size rows."""
+    if n_permutations == 0:
+        return np.nan
+    rng = np.random.default_rng(seed)
+    exceed = 0
+    for start in range(0, n_permutations, batch_size):
+        size = min(batch_size, n_permutations - start)
+        permuted = rng.permuted(np.broadcast_to(x, (size, len(x))), axis=1)
+        # tolerance for the rounding of cumulative sums
+        exceed += np.count_nonzero(func(permuted) >= statistic*(1 - 1e-12))
+    return (1 + exceed)/(1 + n_permutations)
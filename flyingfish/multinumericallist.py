@@ -0,0 +1,194 @@
+import math
+import numpy as np
+import pandas as pd
+
+from flyingfish.numericallist import Status
+
+
+class MultiNumericalList:
+
+    def __init__(
+            self,
+            input: np.ndarray | pd.DataFrame,
+            names: list[str] | None = None,
+            status: Status = Status.RAW):
+        """Constructor
+
+        Holds p aligned series of n values each as one (n, p) float64
+        array (one series per column). Missing values (NaN) are allowed
+        and handled pairwise. A C-contiguous float64 array (e.g. a
+        np.memmap of a large file) is used without copying.
+
+        Args:
+            input (np.ndarray | pd.DataFrame): 2-D array or DataFrame
+                with one series per column
+            names (list[str] | None, optional): names of the series.
+                Defaults to None (DataFrame columns or 0..p-1).
+            status (Status, optional): Status of the MultiNumericalList,
+                which can be set or turned to Status.READY, if the
+                data is been cleaned. Defaults to Status.RAW.
+        """
+        if isinstance(input, pd.DataFrame) and names is None:
+            names = list(input.columns)
+        data = np.ascontiguousarray(input, dtype=np.float64)
+        if data.ndim != 2:
+            raise ValueError("Input of MultiNumericalList must be two-dimensional!")
+        data = data.view()
+        data.flags.writeable = False
+        self.data: np.ndarray = data
+        self.n, self.p = data.shape
+        self.names: list = list(names) if names is not None else list(range(self.p))
+        self.status: Status = status
+
+        if (not self.status.value) or self.n == 0:
+            raise ValueError("Status of MultiNumericalList object is not READY!")
+
+    def set_status_ready(self):
+        """Change status of input list."""
+        self.status = Status.READY
+
+    # ----------------------------------------------------------------
+    # covariance and correlation
+    # ----------------------------------------------------------------
+
+    def covariance(
+            self,
+            biased: bool = False,
+            block_size: int | None = None,
+            max_memory: int | None = None,
+            out: str | None = None):
+        """Returns the (biased/ unbiased) covariance matrix (p, p)
+        [np.ndarray] of all series.
+
+        Without missing values the matrix is one matrix product of the
+        centered data. With missing values each pair uses the rows
+        where both series are present (pairwise complete); the pairwise
+        counts and sums are matrix products of the NaN masks as well,
+        so there is no loop over pairs.
+
+        Args:
+            biased (bool, optional): divide by n instead of n-1.
+                Defaults to False.
+            block_size (int | None, optional): compute the matrix in
+                tiles of block_size series. Defaults to None (one tile).
+            max_memory (int | None, optional): memory cap of the
+                intermediate arrays in bytes, used to derive the block
+                size. The series are centered and masked block by block
+                within the tiles, so together with out and a memory-mapped
+                input the data never needs to fit into memory.
+                Defaults to None.
+            out (str | None, optional): path of a .npy file to write the
+                matrix to (memory-mapped), so it does not need to fit
+                into memory. Defaults to None.
+        """
+        return self._pairwise("covariance", biased, block_size, max_memory, out)
+
+    def correlation(
+            self,
+            method: str = "pearson",
+            block_size: int | None = None,
+            max_memory: int | None = None,
+            out: str | None = None):
+        """Returns the correlation matrix (p, p) [np.ndarray] of all
+        series (see covariance for missing values and tiling).
+
+        Args:
+            method (str, optional): "pearson" or "spearman". Spearman's
+                rho is the Pearson correlation of the ranks of each
+                series (ranks of all present values of a series, so with
+                missing values it approximates the rank correlation of
+                the pairwise complete rows). Defaults to "pearson".
+            block_size (int | None, optional): see covariance.
+            max_memory (int | None, optional): see covariance.
+            out (str | None, optional): see covariance.
+        """
+        if method not in ["pearson", "spearman"]:
+            raise ValueError(f"Unknown correlation method {method}!")
+        return self._pairwise(
+            "correlation", False, block_size, max_memory, out, method == "spearman")
+
+    def _pairwise(
+            self,
+            kind: str,
+            biased: bool,
+            block_size: int | None,
+            max_memory: int | None,
+            out: str | None,
+            ranks: bool = False):
+        """Returns the covariance or correlation matrix computed tile by
+        tile. Only the column blocks of the current tile are centered
+        and masked, so the memory does not grow with p."""
+        if block_size is None:
+            block_size = self.p
+            if max_memory is not None:
+                block_size = self._block_size(max_memory)
+        if out is None:
+            result = np.empty((self.p, self.p))
+        else:
+            result = np.lib.format.open_memmap(out, mode="w+", shape=(self.p, self.p))
+
+        for i0 in range(0, self.p, block_size):
+            i1 = min(i0 + block_size, self.p)
+            xa, ma = _centered_block(self.data[:, i0:i1], ranks)
+            for j0 in range(i0, self.p, block_size):
+                j1 = min(j0 + block_size, self.p)
+                xb, mb = (xa, ma) if j0 == i0 else _centered_block(self.data[:, j0:j1], ranks)
+                tile = _pairwise_tile(xa, ma, xb, mb, kind, biased)
+                result[i0:i1, j0:j1] = tile
+                result[j0:j1, i0:i1] = tile.T
+        if out is not None:
+            result.flush()
+        return result
+
+    def _block_size(self, max_memory: int):
+        """Returns the block size [int] whose intermediate arrays
+        (about 6 (b, b) and 8 (n, b) float64 arrays) fit into
+        max_memory bytes."""
+        # 48 b^2 + 64 n b - max_memory = 0
+        b = (-64*self.n + math.sqrt((64*self.n)**2 + 4*48*max_memory))/(2*48)
+        return max(int(b), 1)
+
+
+def _centered_block(x: np.ndarray, ranks: bool):
+    """Returns a block of series centered on their means (or their ranks
+    centered, if ranks) with missing values set to 0 and the mask of
+    present values (None if there are no missing values)."""
+    if ranks:
+        x = pd.DataFrame(x).rank(axis=0).to_numpy()
+    mask = ~np.isnan(x)
+    if mask.all():
+        return x - x.mean(axis=0), None
+    # center the series for numerical stability
+    return np.where(mask, x - np.nanmean(x, axis=0), 0.0), mask
+
+
+def _pairwise_tile(
+        xa: np.ndarray,
+        ma: np.ndarray | None,
+        xb: np.ndarray,
+        mb: np.ndarray | None,
+        kind: str,
+        biased: bool):
+    """Returns a tile of the covariance or correlation matrix of the
+    (centered, NaN set to 0) series xa and xb with the masks ma and mb
+    of present values (None if all are present)."""
+    if ma is None and mb is None:
+        n = len(xa)
+        cross = xa.T @ xb
+        if kind == "covariance":
+            return cross/(n if biased else n - 1)
+        sa = np.sqrt(np.sum(xa*xa, axis=0))
+        sb = np.sqrt(np.sum(xb*xb, axis=0))
+        return cross/np.outer(sa, sb)
+
+    fa = np.ones(xa.shape) if ma is None else ma.astype(np.float64)
+    fb = np.ones(xb.shape) if mb is None else mb.astype(np.float64)
+    n = fa.T @ fb
+    sum_a = xa.T @ fb
+    sum_b = fa.T @ xb
+    cross = xa.T @ xb - sum_a*sum_b/n
+    if kind == "covariance":
+        return cross/(n if biased else n - 1)
+    var_a = (xa*xa).T @ fb - sum_a**2/n
+    var_b = fa.T @ (xb*xb) - sum_b**2/n
+    return cross/np.sqrt(var_a*var_b)
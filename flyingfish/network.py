@@ -0,0 +1,447 @@
+import math
+import pandas as pd
+import numpy as np
+
+from flyingfish.timeseries import (
+    TimeSeries, MAD_SCALE, _exceedance_runs, _most_common_step, _partial_series_frame,
+    _principal_values_of_yearly, _calendar_fields, _hyd_years, _hampel_center_scale)
+from flyingfish.parallel import map_bounded
+
+
+PRINCIPAL_VALUES = ["HHX", "HX", "MHX", "MX", "MNX", "NX", "NNX"]
+
+
+def to_long_format(
+        data: dict[str, TimeSeries],
+        varname: str,
+        station_col: str = "station",
+        date_col: str = "date",
+        extra_cols: list[str] = []):
+    """Returns a long-format DataFrame (one row per station and date)
+    from a dict of TimeSeries.
+
+    Args:
+        data (dict[str, TimeSeries]): TimeSeries per station id
+        varname (str): column name of the variable (e.g. "discharge")
+        station_col (str, optional): name of the station column.
+            Defaults to "station".
+        date_col (str, optional): name of the date column.
+            Defaults to "date".
+        extra_cols (list[str], optional): further columns to keep
+            (e.g. ["hyd_year"]). Defaults to [].
+
+    Returns:
+        pd.DataFrame: columns station_col, date_col, varname, *extra_cols
+    """
+    frames = []
+    for station, ts in data.items():
+        df = ts.df[[varname, *extra_cols]]
+        frames.append(pd.DataFrame({
+            station_col: np.repeat(station, len(df)),
+            date_col: df.index,
+            **{col: df[col].to_numpy() for col in [varname, *extra_cols]}}))
+    return pd.concat(frames, ignore_index=True)
+
+
+def _iter_station_chunks(
+        data: pd.DataFrame | dict[str, TimeSeries],
+        varname: str,
+        station_col: str,
+        date_col: str,
+        extra_cols: list[str],
+        chunk_stations: int | None):
+    """Yields long-format DataFrames with at most chunk_stations stations
+    each. Chunks are built lazily so that only the chunks in flight are
+    held in memory in addition to the input."""
+    if isinstance(data, dict):
+        stations = list(data.keys())
+        size = chunk_stations or max(len(stations), 1)
+        for i in range(0, len(stations), size):
+            chunk = {s: data[s] for s in stations[i:i+size]}
+            yield to_long_format(chunk, varname, station_col, date_col, extra_cols)
+        return
+
+    if date_col not in data.columns:
+        data = data.reset_index()
+    if chunk_stations is None:
+        yield data
+        return
+
+    codes, uniques = pd.factorize(data[station_col], sort=True)
+    order = np.argsort(codes, kind="stable")
+    bounds = np.searchsorted(
+        codes[order], np.arange(0, len(uniques) + chunk_stations, chunk_stations))
+    for b0, b1 in zip(bounds[:-1], bounds[1:]):
+        if b1 > b0:
+            yield data.iloc[order[b0:b1]]
+
+
+def _principal_values_long(
+        df: pd.DataFrame,
+        date_start: pd.Timestamp,
+        date_end: pd.Timestamp,
+        varname: str,
+        station_col: str,
+        date_col: str,
+        aggr_col_name: str,
+        windows: dict[str, list[int]],
+        hyd_year_begin_month: int,
+        hyd_year_begin_day: int):
+    """Returns principal values of a long-format DataFrame for all
+    stations and month windows (see principal_values_batch)."""
+    dates = pd.DatetimeIndex(df[date_col])
+    values = df[varname].to_numpy(dtype=float)
+    stations = df[station_col].to_numpy()
+
+    # Derive highest and lowest value ever observed per station
+    extremes = pd.DataFrame({"station": stations, "value": values}) \
+        .groupby("station")["value"].agg(["max", "min"])
+
+    # limit data to timeframe
+    in_timeframe = np.asarray(
+        (dates >= pd.Timestamp(date_start)) & (dates <= pd.Timestamp(date_end)))
+    dates = dates[in_timeframe]
+    values = values[in_timeframe]
+    stations = stations[in_timeframe]
+
+    # Aggregation key: calendric year, hydrological year or given column
+    calendar = _calendar_fields(dates)
+    month = calendar["month"]
+    if aggr_col_name == "":
+        keys = calendar["year"]
+    elif aggr_col_name == "hyd_year" and aggr_col_name not in df.columns:
+        keys = _hyd_years(
+            calendar["year"], month, calendar["day"], hyd_year_begin_month, hyd_year_begin_day)
+    else:
+        keys = df[aggr_col_name].to_numpy()[in_timeframe]
+
+    # Stack the rows of all month windows so that every station, window
+    # and year combination is aggregated in the same grouped pass.
+    rows = []
+    window_codes = []
+    for code, months in enumerate(windows.values()):
+        idx = np.flatnonzero(np.isin(month, months))
+        rows.append(idx)
+        window_codes.append(np.full(len(idx), code))
+    rows = np.concatenate(rows)
+    stacked = pd.DataFrame({
+        "station": stations[rows],
+        "window": np.concatenate(window_codes),
+        "key": keys[rows],
+        "value": values[rows]})
+
+    yearly = stacked.groupby(["station", "window", "key"], sort=False)["value"] \
+        .agg(["max", "min", "mean"])
+    grouped = yearly.groupby(level=["station", "window"])
+    table = pd.DataFrame({
+        "HX": grouped["max"].max(),
+        "MHX": grouped["max"].mean(),
+        "MX": grouped["mean"].mean(),
+        "MNX": grouped["min"].mean(),
+        "NX": grouped["min"].min()})
+
+    station_level = table.index.get_level_values("station")
+    table["HHX"] = extremes["max"].reindex(station_level).to_numpy()
+    table["NNX"] = extremes["min"].reindex(station_level).to_numpy()
+    table.index = table.index.set_levels(
+        pd.Index(list(windows.keys()))[table.index.levels[1]], level="window")
+    return table[PRINCIPAL_VALUES]
+
+
+def principal_values_batch(
+        data: pd.DataFrame | dict[str, TimeSeries],
+        date_start: pd.Timestamp,
+        date_end: pd.Timestamp,
+        varname: str,
+        station_col: str = "station",
+        date_col: str = "date",
+        aggr_col_name: str = "",
+        windows: dict[str, list[int]] = {"year": [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12]},
+        hyd_year_begin_month: int = 11,
+        hyd_year_begin_day: int = 1,
+        processes: int = 1,
+        chunk_stations: int | None = None):
+    """Returns principal values HHX, HX, MHX, MX, MNX, NX, NNX (see
+    TimeSeries.principal_values) for many stations at once.
+
+    All stations, years and month windows are aggregated in one grouped
+    pass. With processes > 1 the stations are split into chunks which
+    are processed in a process pool. At most two chunks per process are
+    in flight at any time to bound the memory use.
+
+    Args:
+        data (pd.DataFrame | dict[str, TimeSeries]): long-format
+            DataFrame with the columns station_col, date_col (or "date"
+            as index) and varname, or TimeSeries per station id
+        date_start (datetime.datetime): first day of time series
+        date_end (datetime.datetime): last day of time series
+        varname (str): column name to derive principal values
+            (e.g. "discharge")
+        station_col (str, optional): name of the station column.
+            Defaults to "station".
+        date_col (str, optional): name of the date column.
+            Defaults to "date".
+        aggr_col_name (str, optional): column name for aggregation. Uses
+            the calendric year if empty. "hyd_year" is derived from the
+            dates if there is no such column. Defaults to "".
+        windows (dict[str, list[int]], optional): month index per window
+            name (e.g. {"winter": [11, 12, 1, 2, 3, 4]}).
+            Defaults to {"year": [1,2,3,4,5,6,7,8,9,10,11,12]}.
+        hyd_year_begin_month (int, optional): number of month of a year
+            the hydrological year begins. Defaults to 11.
+        hyd_year_begin_day (int, optional): number of day of a month
+            the hydrological year begins. Defaults to 1.
+        processes (int, optional): number of worker processes.
+            Defaults to 1.
+        chunk_stations (int | None, optional): number of stations per
+            chunk. Defaults to None (all stations in one chunk if
+            processes is 1, else four chunks per process).
+
+    Returns:
+        pd.DataFrame: index (station, window) and the columns
+            "HHX", "HX", "MHX", "MX", "MNX", "NX", "NNX"
+    """
+    extra_cols = [aggr_col_name] if aggr_col_name not in ["", "hyd_year"] else []
+    if aggr_col_name == "hyd_year" and isinstance(data, dict):
+        if all("hyd_year" in ts.df.columns for ts in data.values()):
+            extra_cols = ["hyd_year"]
+
+    if chunk_stations is None and processes > 1:
+        n_stations = len(data) if isinstance(data, dict) else data[station_col].nunique()
+        chunk_stations = max(math.ceil(n_stations / (4*processes)), 1)
+
+    chunks = _iter_station_chunks(
+        data, varname, station_col, date_col, extra_cols, chunk_stations)
+    kwargs = dict(
+        date_start=date_start,
+        date_end=date_end,
+        varname=varname,
+        station_col=station_col,
+        date_col=date_col,
+        aggr_col_name=aggr_col_name,
+        windows=windows,
+        hyd_year_begin_month=hyd_year_begin_month,
+        hyd_year_begin_day=hyd_year_begin_day)
+
+    results = map_bounded(_principal_values_long, chunks, kwargs, processes)
+
+    table = pd.concat(results).round(2)
+    table.index.names = ["station", "window"]
+    return table.sort_index()
+
+
+def ausreisser_batch(
+        data: pd.DataFrame | dict[str, TimeSeries],
+        varnames: list[str],
+        method: str = "zscore",
+        solving: str = "drop_outlier",
+        threshold: float = 3.0,
+        window: int = 7,
+        station_col: str = "station",
+        date_col: str = "date",
+        processes: int = 1):
+    """Returns the data of many stations with treated outliers (see
+    TimeSeries.outlier_bounds and TimeSeries.ausreisser).
+
+    A long-format DataFrame is treated for all stations at once with
+    grouped operations (for "hampel" windows over the stacked values
+    that leave out the values of other stations). A dict of
+    TimeSeries is treated station by station, optionally in a process
+    pool.
+
+    Args:
+        data (pd.DataFrame | dict[str, TimeSeries]): long-format
+            DataFrame with the columns station_col, date_col and
+            varnames, or TimeSeries per station id
+        varnames (list[str]): columns to treat
+        method (str, optional): "zscore", "mad" or "hampel".
+            Defaults to "zscore".
+        solving (str, optional): "drop_outlier" or "cap_outlier".
+            Defaults to "drop_outlier".
+        threshold (float, optional): number of standard deviations
+            (or scaled MADs). Defaults to 3.0.
+        window (int, optional): window size of "hampel". Defaults to 7.
+        station_col (str, optional): name of the station column.
+            Defaults to "station".
+        date_col (str, optional): name of the date column.
+            Defaults to "date".
+        processes (int, optional): number of worker processes for a
+            dict of TimeSeries. Defaults to 1.
+
+    Returns:
+        pd.DataFrame | dict[str, TimeSeries]: same type as data
+    """
+    kwargs = dict(
+        method=method, solving=solving, threshold=threshold,
+        window=window, columns=list(varnames))
+    if isinstance(data, dict):
+        stations = list(data.keys())
+        results = map_bounded(_ausreisser, (data[s] for s in stations), kwargs, processes)
+        return dict(zip(stations, results))
+
+    df = data.sort_values([station_col, date_col], kind="stable").reset_index(drop=True)
+    stations = df[station_col]
+    for col in varnames:
+        values = df[col]
+        grouped = values.groupby(stations)
+        match method:
+            case "zscore":
+                center = grouped.transform("mean")
+                scale = grouped.transform("std")
+            case "mad":
+                center = grouped.transform("median")
+                scale = MAD_SCALE*(values - center).abs().groupby(stations).transform("median")
+            case "hampel":
+                center, mad = _hampel_center_scale(
+                    values.to_numpy(dtype=float), window, pd.factorize(stations)[0])
+                center = pd.Series(center, index=values.index)
+                scale = pd.Series(MAD_SCALE*mad, index=values.index)
+            case _:
+                raise ValueError(f"Unknown outlier method {method}!")
+        lower = center - threshold*scale
+        upper = center + threshold*scale
+        match solving:
+            case "drop_outlier":
+                df[col] = values.mask((values < lower) | (values > upper))
+            case "cap_outlier":
+                df[col] = values.clip(lower=lower, upper=upper)
+            case _:
+                raise ValueError(f"Unknown outlier solving {solving}!")
+    return df
+
+
+def partial_series_batch(
+        data: pd.DataFrame | dict[str, TimeSeries],
+        varname: str,
+        threshold: float | None = None,
+        per: float | None = None,
+        station_col: str = "station",
+        date_col: str = "date"):
+    """Returns the partial duration series (see TimeSeries.partial_series)
+    of many stations at once.
+
+    The runs of all stations are found in one vectorized pass over the
+    stacked values. Percentile thresholds are derived per station from
+    one sort of all values (same definition as NumericalList.percentile).
+
+    Args:
+        data (pd.DataFrame | dict[str, TimeSeries]): long-format
+            DataFrame with the columns station_col, date_col and
+            varname, or TimeSeries per station id
+        varname (str): column name (e.g. "discharge")
+        threshold (float | None, optional): fixed threshold for all
+            stations. Defaults to None.
+        per (float | None, optional): percentile per station used as
+            threshold if no fixed threshold is given. Defaults to None.
+        station_col (str, optional): name of the station column.
+            Defaults to "station".
+        date_col (str, optional): name of the date column.
+            Defaults to "date".
+
+    Returns:
+        pd.DataFrame: column "station" and the columns of
+            TimeSeries.partial_series
+    """
+    if isinstance(data, dict):
+        data = to_long_format(data, varname, station_col, date_col)
+    df = data.sort_values([station_col, date_col], kind="stable")
+    codes, uniques = pd.factorize(df[station_col], sort=True)
+    dates = pd.DatetimeIndex(df[date_col])
+    values = df[varname].to_numpy(dtype=float)
+    breaks = np.r_[True, codes[1:] != codes[:-1]]
+
+    if threshold is None:
+        if per is None:
+            raise ValueError("Either threshold or per must be given!")
+        # sort by station and value (NaN last) and pick the rank per station
+        valid = ~np.isnan(values)
+        order = np.lexsort((values[valid], codes[valid]))
+        sorted_values = values[valid][order]
+        n_valid = np.bincount(codes[valid], minlength=len(uniques))
+        offsets = np.r_[0, np.cumsum(n_valid)[:-1]]
+        ranks = np.minimum((per/100*n_valid).astype(np.int64), np.maximum(n_valid - 1, 0))
+        station_threshold = np.where(
+            n_valid > 0, sorted_values[np.minimum(offsets + ranks, len(sorted_values) - 1)], np.inf)
+        thresholds = station_threshold[codes]
+    else:
+        thresholds = np.full(len(values), threshold, dtype=float)
+
+    steps = np.diff(dates.asi8)[~breaks[1:]]
+    runs = _exceedance_runs(values, thresholds, breaks)
+    table = _partial_series_frame(dates, runs, pd.Timedelta(_most_common_step(steps)))
+    table.insert(0, "station", uniques[codes[runs["start"]]])
+    return table
+
+
+def append_batch(
+        data: dict[str, TimeSeries],
+        new: pd.DataFrame,
+        station_col: str = "station",
+        date_col: str = "date"):
+    """Appends new observations of many stations (e.g. the daily
+    update of a network) to their TimeSeries (see TimeSeries.append).
+    The long-format update is split by station with one sort; stations
+    without a TimeSeries yet are added.
+
+    Args:
+        data (dict[str, TimeSeries]): TimeSeries per station id, updated
+            in place
+        new (pd.DataFrame): long-format DataFrame with the columns
+            station_col, date_col and the value columns
+        station_col (str, optional): name of the station column.
+            Defaults to "station".
+        date_col (str, optional): name of the date column.
+            Defaults to "date".
+
+    Returns:
+        dict[str, TimeSeries]: data
+    """
+    new = new.sort_values([station_col, date_col], kind="stable")
+    codes, uniques = pd.factorize(new[station_col], sort=True)
+    values = new.drop(columns=station_col).set_index(date_col)
+    offsets = np.r_[0, np.flatnonzero(codes[1:] != codes[:-1]) + 1, len(codes)]
+    for station, i0, i1 in zip(uniques, offsets[:-1], offsets[1:]):
+        chunk = values.iloc[i0:i1]
+        if station in data:
+            data[station].append(chunk)
+        else:
+            data[station] = TimeSeries(chunk)
+    return data
+
+
+def annual_principal_values_batch(
+        data: dict[str, TimeSeries],
+        varname: str,
+        aggr: str = "year",
+        hyd_year_begin_month: int = 11,
+        hyd_year_begin_day: int = 1):
+    """Returns principal values of the whole record of many stations
+    (see TimeSeries.annual_principal_values) from their cached yearly
+    aggregates, so a daily refresh after append_batch does not read the
+    history again.
+
+    Args:
+        data (dict[str, TimeSeries]): TimeSeries per station id
+        varname (str): column name (e.g. "discharge")
+        aggr (str, optional): "year" or "hyd_year". Defaults to "year".
+        hyd_year_begin_month (int, optional): begin month of the
+            hydrological year. Defaults to 11.
+        hyd_year_begin_day (int, optional): begin day of the
+            hydrological year. Defaults to 1.
+
+    Returns:
+        pd.DataFrame: one row per station (index "station") and the
+            columns "HHX", "HX", "MHX", "MX", "MNX", "NX", "NNX"
+    """
+    rows = [
+        _principal_values_of_yearly(ts._cached_yearly(
+            varname, aggr, hyd_year_begin_month, hyd_year_begin_day))
+        for ts in data.values()]
+    return pd.DataFrame(
+        rows, columns=PRINCIPAL_VALUES,
+        index=pd.Index(list(data.keys()), name="station")).round(2)
+
+
+def _ausreisser(ts: TimeSeries, **kwargs):
+    """Returns ts.ausreisser(**kwargs) (picklable for process pools)."""
+    return ts.ausreisser(**kwargs)
@@ -1,7 +1,5 @@
 from enum import Enum
 import numpy as np
-import statistics
-from collections import Counter
 
 
 class Status(Enum):
@@ -9,20 +7,74 @@ class Status(Enum):
     READY = 1
 
 
-class NumericalList:
+class MomentEstimates:
+    """Estimates derived from the moments (see NumericalList.moments)
+    shared by NumericalList and OnlineNumericalList. Subclasses provide
+    n and moments()."""
 
-    def __init__(self, input: list[float], status: Status = Status.RAW):
+    def variance(self, biased: bool):
+        """Returns the (biased/ unbiased) variance [float]"""
+        mu2 = self.moments()[1]
+        if biased:
+            return mu2
+        else:
+            return mu2 * self.n/(self.n-1)
+
+    def stdev(self, biased: bool):
+        """Returns the (biased/ unbiased) standard deviation from 
+        arithmetic mean [float]."""
+        return self.variance(biased=biased)**(1/2)
+
+    def coefficient_of_skewness(self, biased: bool):
+        """Returns (biased/ unbiased) skewness [float]."""
+        _, mu2, mu3, _ = self.moments()
+        skew = mu3/mu2**(3/2)
+        if biased:
+            return skew
+        else:
+            return skew*(self.n**2)/((self.n-1)*(self.n-2))
+
+    def coefficient_of_kurtosis(self, biased:bool):
+        """Returns (biased/ unbiased) kortosis [float]."""
+        _, mu2, _, mu4 = self.moments()
+        kurt = mu4/mu2**2
+        if biased:
+            return kurt
+        else:
+            return kurt*(self.n**3)/((self.n-1)*(self.n-2)*(self.n-3))
+
+
+class NumericalList(MomentEstimates):
+
+    def __init__(
+            self,
+            input: list[float] | np.ndarray,
+            status: Status = Status.RAW,
+            dtype: type = np.float64):
         """Constructor
 
+        The values are held as one contiguous, read-only NumPy array.
+        NumPy arrays, pandas Series and buffer-protocol objects of the
+        requested dtype are used without copying. The caller must not
+        change such an input afterwards: the sorted values and moments
+        are cached and would get stale. Pass a copy (input.copy()) if
+        the array is modified later, or assign the changed values to
+        data again to reset the cache.
+
         Args:
-            input (list[float]): numerical values
+            input (list[float] | np.ndarray): numerical values as list,
+                NumPy array, pandas Series or buffer-protocol object
             status (Status, optional): Status of the NumericalList,
                 which can be set or turned to Status.READY, if the
                 data is been cleaned. Defaults to Status.RAW.
+            dtype (type, optional): np.float64 or np.float32 (halves the
+                memory of long series). Defaults to np.float64.
         """
-        self.data: list[float] = input
+        if dtype not in [np.float64, np.float32]:
+            raise ValueError("dtype of NumericalList must be np.float64 or np.float32!")
+        self.dtype: type = dtype
+        self.data: np.ndarray = input
         self.status: Status = status
-        self.n: int = len(input)
 
         if (not self.status.value) or self.n == 0:
             raise ValueError("Status of NumericalList object is not READY!")
@@ -31,52 +83,155 @@ class NumericalList:
         """Change status of input list."""
         self.status = Status.READY
 
+    @property
+    def data(self):
+        """Numerical values [np.ndarray]. Assigning new values
+        invalidates all cached results; in-place changes of the input
+        array are not detected (see constructor)."""
+        return self._data
+
+    @data.setter
+    def data(self, input: list[float] | np.ndarray):
+        if isinstance(input, (bytes, bytearray)):
+            data = np.frombuffer(input, dtype=self.dtype)
+        else:
+            data = np.ascontiguousarray(input, dtype=self.dtype)
+        if data.ndim != 1:
+            raise ValueError("Input of NumericalList must be one-dimensional!")
+        # Read-only view, so the cached results can not get stale by
+        # in-place changes through this instance.
+        data = data.view()
+        data.flags.writeable = False
+        self._data = data
+        self.n: int = len(data)
+        self._sorted: np.ndarray | None = None
+        self._order: np.ndarray | None = None
+        self._moments: tuple[float, float, float, float] | None = None
+
+    def sorted(self):
+        """Returns the values as sorted array [np.ndarray]. The array is
+        built on first use and cached until the data changes."""
+        if self._sorted is None:
+            self._sorted = np.sort(self.data)
+        return self._sorted
+
+    def order(self):
+        """Returns the indices [np.ndarray] that sort the values. The
+        array is built on first use and cached until the data changes."""
+        if self._order is None:
+            self._order = np.argsort(self.data, kind="stable")
+        return self._order
+
+    def moments(self):
+        """Returns the arithmetic mean and the (biased) central moments
+        of order 2, 3 and 4 [tuple[float, float, float, float]].
+
+        The moments are computed together from one float64 array of
+        deviations from the mean and cached until the data changes.
+        """
+        if self._moments is None:
+            mean = np.mean(self.data, dtype=np.float64)
+            d = np.subtract(self.data, mean, dtype=np.float64)
+            d2 = d*d
+            self._moments = (
+                mean, np.sum(d2)/self.n, np.dot(d2, d)/self.n, np.dot(d2, d2)/self.n)
+        return self._moments
+
+    def _weights(self, weights: list[float]):
+        """Returns validated weights [np.ndarray] as float64 array."""
+        weights = np.asarray(weights, dtype=np.float64)
+        if weights.shape != (self.n,):
+            raise ValueError("weights must have the same length as the NumericalList!")
+        if (weights < 0).any() or weights.sum() <= 0:
+            raise ValueError("weights must be non-negative with a positive sum!")
+        return weights
+
+    def _select(self, indices: list[int]):
+        """Returns the values [np.ndarray] at the given positions of the
+        sorted data. Uses the cached sorted array if present, otherwise a
+        selection (partition) instead of a full sort."""
+        if self._sorted is not None:
+            return self._sorted[indices]
+        return np.partition(self.data, indices)[indices]
+
     # ----------------------------------------------------------------
     # estimates of location
     # ----------------------------------------------------------------
 
     def arithmetic_mean(self):
         """Returns arithmetic mean [float]."""
-        return np.mean(self.data)
+        return self.moments()[0]
 
     def weighted_arithmetic_mean(self, weights: list[float]):
         """Returns weighted (element-wise) arithmetic mean [float]."""
-        return sum(np.multiply(self.data, weights))/sum(weights)
+        weights = self._weights(weights)
+        return np.dot(self.data, weights)/np.sum(weights)
 
     def trimmed_mean(self, p:int):
         """Returns trimmed arithmetic mean [float] with the smallest and 
         largest p elements skipped."""
-        trimmed = sorted(self.data)[p:-p]
+        trimmed = self.sorted()[p:self.n-p]
         return np.mean(trimmed)
 
     def geometric_mean(self):
         """Returns geometric mean [float]."""
-        return statistics.geometric_mean(self.data)
+        if self.data.min() <= 0:
+            raise ValueError("geometric mean requires positive numbers")
+        return np.exp(np.mean(np.log(self.data), dtype=np.float64))
 
     def exponential_mean(self, m: float):
         """Returns exponential mean [float] using exponent m."""
-        return (sum([x**m for x in self.data])/self.n)**(1/m)
+        return np.mean(self.data**m, dtype=np.float64)**(1/m)
 
     def harmonic_mean(self):
         """Returns harmonic mean [float]."""
-        return statistics.harmonic_mean(self.data)
+        minimum = self.data.min()
+        if minimum < 0:
+            raise ValueError("harmonic mean does not support negative values")
+        if minimum == 0:
+            return 0.0
+        return self.n/np.sum(1/self.data, dtype=np.float64)
 
     def median(self):
         """Returns median [float]."""
-        return statistics.median(self.data)
+        return _median_of_sorted(self.sorted())
 
     def weighted_median(self, weights: list[float]):
-        """Returns (element-wise) weighted median [float]."""
-        weighted_list = []
-        for i in range(self.n):
-            weighted_list.extend([self.data[i]]*weights[i])
-        return statistics.median(weighted_list)
+        """Returns (element-wise) weighted median [float]. For integer
+        weights this equals the median of the sample with each value
+        repeated weights[i] times."""
+        return self.weighted_percentile(per=50, weights=weights)
+
+    def weighted_percentile(self, per: float | list[float], weights: list[float]):
+        """Returns (element-wise) weighted percentile value(s)
+        [float | np.ndarray].
+
+        The result is the first sorted value whose cumulative weight
+        reaches per/100 of the total weight, averaged with the next
+        value if the cumulative weight hits the target exactly. Weights
+        may be non-integer; the cost is O(n log n) independent of the
+        weight magnitudes.
+
+        Args:
+            per (float | list[float]): percentile(s) between 0 and 100
+            weights (list[float]): non-negative weight per value
+        """
+        weights = self._weights(weights)[self.order()]
+        positive = weights > 0
+        values = self.sorted()[positive]
+        cumulative = np.cumsum(weights[positive])
+
+        target = np.asarray(per, dtype=float)/100*cumulative[-1]
+        i = np.minimum(np.searchsorted(cumulative, target), len(values)-1)
+        # relative tolerance only for the rounding of the cumulative sum,
+        # so large weight totals (e.g. areas in m^2) give no false ties
+        tie = np.isclose(cumulative[i], target, rtol=1e-12, atol=0) & (i < len(values)-1)
+        result = np.where(tie, (values[i] + values[np.minimum(i+1, len(values)-1)])/2, values[i])
+        return result[()] if result.ndim == 0 else result
 
     def percentile(self, per: int):
         """Return percentile value [float]."""
-        sort = sorted(self.data)
-        # return np.percentile(self.data, per)
-        return sort[int(per/100*len(sort))]
+        return self._select([int(per/100*self.n)])[0]
 
     # ----------------------------------------------------------------
     # estimates of variability
@@ -85,80 +240,94 @@ class NumericalList:
     def mu(self, k: int):
         """Returns the k-th statistical moment [float] related to the 
         arithmetic mean."""
+        if k in [2, 3, 4]:
+            return self.moments()[k-1]
         mean = self.arithmetic_mean()
-        return np.mean([(i-mean)**k for i in self.data])
+        return np.mean(np.subtract(self.data, mean, dtype=np.float64)**k)
 
     def avg_absolute_deviation_from_mean(self):
         """Returns the mean deviation from the mean [float]."""
         mean = self.arithmetic_mean()
-        return np.mean([abs(i-mean) for i in self.data])
+        return np.mean(np.abs(self.data - mean))
 
     def avg_absolute_deviation_from_median(self):
         """Returns the mean deviation from the median [float]."""
         median = self.median()
-        return np.mean([abs(i-median) for i in self.data])
+        return np.mean(np.abs(self.data - median))
 
     def median_absolute_deviaton(self):
         """Returns the median absolute deivation (MAD) [float]."""
         median = self.median()
-        deviations = [abs(i-median) for i in self.data]
-        return statistics.median(deviations)
+        deviations = np.abs(self.data - median)
+        k = (self.n-1)//2
+        if self.n % 2:
+            return np.partition(deviations, k)[k]
+        return np.mean(np.partition(deviations, [k, k+1])[[k, k+1]])
         
-    def variance(self, biased: bool):
-        """Returns the (biased/ unbiased) variance [float]"""
-        mu2 = self.mu(k=2)
-        if biased:
-            return mu2
-        else:
-            return mu2 * self.n/(self.n-1)
-
-    def stdev(self, biased: bool):
-        """Returns the (biased/ unbiased) standard deviation from 
-        arithmetic mean [float]."""
-        mu2 = self.mu(k=2)
-        n = self.n
-        if biased:
-            return mu2**(1/2)
-        else:
-            return (mu2*n/(n-1))**(1/2)
-
     def range(self):
         """Returns range [float]."""
-        return max(self.data)-min(self.data)
+        if self._sorted is not None:
+            return self._sorted[-1]-self._sorted[0]
+        return np.ptp(self.data)
 
     def iqr(self):
         """Returns IQR [float]."""
-        sort = sorted(self.data)
-        index_25 = int(0.25*len(sort))
-        index_75 = int(0.75*len(sort))
-        # return np.subtract(*np.percentile(self.data, [75, 25]))
-        return sort[index_75] - sort[index_25]
+        q25, q75 = self._select([int(0.25*self.n), int(0.75*self.n)])
+        return q75 - q25
 
     # ----------------------------------------------------------------
     # estimates of distribution
     # ----------------------------------------------------------------
 
-    def coefficient_of_skewness(self, biased: bool):
-        """Returns (biased/ unbiased) skewness [float]."""
-        stdev = self.stdev(biased=True)
-        mu3 = self.mu(k=3)
-        skew = mu3/stdev**3
-        if biased:
-            return skew
-        else:
-            return skew*(self.n**2)/((self.n-1)*(self.n-2))
-
-    def coefficient_of_kurtosis(self, biased:bool):
-        """Returns (biased/ unbiased) kortosis [float]."""
-        stdev = self.stdev(biased=True)
-        mu4 = self.mu(k=4)
-        kurt = mu4/stdev**4
-        if biased:
-            return kurt
-        else:
-            return kurt*(self.n**3)/((self.n-1)*(self.n-2)*(self.n-3))
-    
     def mode(self):
-        """Returns mode [float]."""
-        c = Counter(self.data)
-        return [k for k, v in c.items() if v == c.most_common(1)[0][1]]
+        """Returns mode [list[float]] in ascending order."""
+        sort = self.sorted()
+        starts = np.flatnonzero(np.r_[True, sort[1:] != sort[:-1]])
+        counts = np.diff(np.r_[starts, self.n])
+        return sort[starts[counts == counts.max()]].tolist()
+
+    # ----------------------------------------------------------------
+    # summary
+    # ----------------------------------------------------------------
+
+    def describe(self, biased: bool = False):
+        """Returns all estimates of location, variability and
+        distribution which need no further arguments [dict[str, float]].
+
+        Moments and order statistics are computed once and shared by
+        all estimates.
+
+        Args:
+            biased (bool, optional): use the biased estimators for
+                variance, stdev, skewness and kurtosis. Defaults to False.
+        """
+        sort = self.sorted()
+        positive = sort[0] > 0
+        non_negative = sort[0] >= 0
+        return {
+            "n": self.n,
+            "arithmetic_mean": self.arithmetic_mean(),
+            "geometric_mean": self.geometric_mean() if positive else np.nan,
+            "harmonic_mean": self.harmonic_mean() if non_negative else np.nan,
+            "median": self.median(),
+            "min": sort[0],
+            "max": sort[-1],
+            "range": self.range(),
+            "iqr": self.iqr(),
+            "avg_absolute_deviation_from_mean": self.avg_absolute_deviation_from_mean(),
+            "avg_absolute_deviation_from_median": self.avg_absolute_deviation_from_median(),
+            "median_absolute_deviaton": self.median_absolute_deviaton(),
+            "variance": self.variance(biased=biased),
+            "stdev": self.stdev(biased=biased),
+            "coefficient_of_skewness": self.coefficient_of_skewness(biased=biased),
+            "coefficient_of_kurtosis": self.coefficient_of_kurtosis(biased=biased),
+            "mode": self.mode(),
+        }
+
+
+def _median_of_sorted(sort: np.ndarray):
+    """Returns median [float] of an already sorted array."""
+    n = len(sort)
+    if n % 2:
+        return sort[n//2]
+    return (sort[n//2-1] + sort[n//2])/2
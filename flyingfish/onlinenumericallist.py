@@ -0,0 +1,227 @@
+import math
+import numpy as np
+
+from flyingfish.numericallist import MomentEstimates
+
+
+class OnlineNumericalList(MomentEstimates):
+
+    def __init__(self, relative_accuracy: float = 0.01, max_bins: int = 2048):
+        """Constructor
+
+        Accumulates numerical values chunk by chunk without keeping them
+        and exposes the estimates of NumericalList. Moments are updated
+        incrementally and partial accumulators can be combined with
+        merge(), e.g. after processing chunks in parallel.
+
+        Variance, stdev, skewness and kurtosis are shared with
+        NumericalList (see MomentEstimates).
+
+        Quantiles (median, percentile, iqr) are read from a logarithmic
+        histogram sketch: every returned quantile lies within a relative
+        error of relative_accuracy of the exact value at the same rank.
+        The IQR is a difference of two quantiles, so only its absolute
+        error is bounded, by relative_accuracy*(|q25| + |q75|); it can
+        be far off relatively if the spread is small against the level
+        of the values. The sketch holds at most max_bins bins per sign;
+        if there are more, the bins of the smallest magnitudes are
+        collapsed, which only affects quantiles among those smallest
+        values.
+
+        Args:
+            relative_accuracy (float, optional): relative error bound of
+                quantiles. Defaults to 0.01.
+            max_bins (int, optional): maximum number of sketch bins per
+                sign. Defaults to 2048.
+        """
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be between 0 and 1!")
+        self.relative_accuracy: float = relative_accuracy
+        self.max_bins: int = max_bins
+        self._gamma: float = (1 + relative_accuracy)/(1 - relative_accuracy)
+        self._log_gamma: float = math.log(self._gamma)
+
+        self.n: int = 0
+        self._mean: float = 0.0
+        self._m2: float = 0.0
+        self._m3: float = 0.0
+        self._m4: float = 0.0
+        self._min: float = math.inf
+        self._max: float = -math.inf
+        self._sum_log: float = 0.0
+        self._sum_inv: float = 0.0
+        self._n_positive: int = 0
+        self._n_zero: int = 0
+
+        self._positive: dict[int, int] = {}
+        self._negative: dict[int, int] = {}
+
+    # ----------------------------------------------------------------
+    # accumulation
+    # ----------------------------------------------------------------
+
+    def update(self, values: list[float] | np.ndarray):
+        """Adds a chunk of values and returns the accumulator."""
+        x = np.asarray(values, dtype=np.float64).ravel()
+        if len(x) == 0:
+            return self
+
+        chunk = OnlineNumericalList(self.relative_accuracy, self.max_bins)
+        chunk.n = len(x)
+        chunk._mean = np.mean(x)
+        d = x - chunk._mean
+        d2 = d*d
+        chunk._m2 = np.sum(d2)
+        chunk._m3 = np.dot(d2, d)
+        chunk._m4 = np.dot(d2, d2)
+        chunk._min = x.min()
+        chunk._max = x.max()
+
+        positive = x[x > 0]
+        chunk._n_positive = len(positive)
+        chunk._n_zero = int(np.count_nonzero(x == 0))
+        chunk._sum_log = np.sum(np.log(positive))
+        chunk._sum_inv = np.sum(1/positive)
+
+        chunk._positive = self._histogram(positive)
+        chunk._negative = self._histogram(-x[x < 0])
+
+        return self.merge(chunk)
+
+    def merge(self, other: "OnlineNumericalList"):
+        """Merges another accumulator into this one and returns it.
+
+        The moments are combined with the pairwise update formulas of
+        Pébay (2008), so merging partial results equals accumulating
+        all values at once (up to rounding)."""
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Accumulators with different relative_accuracy can not be merged!")
+        if other.n == 0:
+            return self
+        if self.n == 0:
+            self._mean, self._m2, self._m3, self._m4 = \
+                other._mean, other._m2, other._m3, other._m4
+        else:
+            na, nb = self.n, other.n
+            n = na + nb
+            delta = other._mean - self._mean
+            m2a, m3a = self._m2, self._m3
+
+            self._mean = self._mean + delta*nb/n
+            self._m2 = m2a + other._m2 + delta**2*na*nb/n
+            self._m3 = m3a + other._m3 \
+                + delta**3*na*nb*(na - nb)/n**2 \
+                + 3*delta*(na*other._m2 - nb*m2a)/n
+            self._m4 = self._m4 + other._m4 \
+                + delta**4*na*nb*(na**2 - na*nb + nb**2)/n**3 \
+                + 6*delta**2*(na**2*other._m2 + nb**2*m2a)/n**2 \
+                + 4*delta*(na*other._m3 - nb*m3a)/n
+
+        self.n += other.n
+        self._min = min(self._min, other._min)
+        self._max = max(self._max, other._max)
+        self._sum_log += other._sum_log
+        self._sum_inv += other._sum_inv
+        self._n_positive += other._n_positive
+        self._n_zero += other._n_zero
+
+        for store, other_store in [
+                (self._positive, other._positive),
+                (self._negative, other._negative)]:
+            for key, count in other_store.items():
+                store[key] = store.get(key, 0) + count
+            self._collapse(store)
+        return self
+
+    def _histogram(self, magnitudes: np.ndarray):
+        """Returns the sketch bins {key: count} of positive magnitudes."""
+        keys = np.ceil(np.log(magnitudes)/self._log_gamma).astype(np.int64)
+        keys, counts = np.unique(keys, return_counts=True)
+        store = dict(zip(keys.tolist(), counts.tolist()))
+        self._collapse(store)
+        return store
+
+    def _collapse(self, store: dict[int, int]):
+        """Collapses the bins of the smallest magnitudes if a store holds
+        more than max_bins bins."""
+        if len(store) <= self.max_bins:
+            return
+        keys = sorted(store)
+        n_collapse = len(keys) - self.max_bins + 1
+        target = keys[n_collapse - 1]
+        store[target] = sum(store.pop(key) for key in keys[:n_collapse - 1]) + store[target]
+
+    def _values_at_ranks(self, ranks: list[int]):
+        """Returns the approximate values [np.ndarray] at the given
+        (0-based) ranks of the sorted values."""
+        negative_keys = sorted(self._negative, reverse=True)
+        positive_keys = sorted(self._positive)
+        representative = 2/(self._gamma + 1)
+        values = np.concatenate([
+            [-self._gamma**k*representative for k in negative_keys],
+            [0.0],
+            [self._gamma**k*representative for k in positive_keys]])
+        counts = np.concatenate([
+            [self._negative[k] for k in negative_keys],
+            [self._n_zero],
+            [self._positive[k] for k in positive_keys]])
+        cumulative = np.cumsum(counts)
+        values = values[np.searchsorted(cumulative, np.asarray(ranks), side="right")]
+        # The exact extremes are known.
+        return np.clip(values, self._min, self._max)
+
+    # ----------------------------------------------------------------
+    # estimates of location
+    # ----------------------------------------------------------------
+
+    def arithmetic_mean(self):
+        """Returns arithmetic mean [float]."""
+        return self._mean
+
+    def geometric_mean(self):
+        """Returns geometric mean [float]."""
+        if self._n_positive < self.n:
+            raise ValueError("geometric mean requires positive numbers")
+        return math.exp(self._sum_log/self.n)
+
+    def harmonic_mean(self):
+        """Returns harmonic mean [float]."""
+        if self._min < 0:
+            raise ValueError("harmonic mean does not support negative values")
+        if self._n_zero:
+            return 0.0
+        return self.n/self._sum_inv
+
+    def median(self):
+        """Returns approximate median [float]."""
+        return np.mean(self._values_at_ranks([(self.n-1)//2, self.n//2]))
+
+    def percentile(self, per: int):
+        """Return approximate percentile value [float]."""
+        return self._values_at_ranks([int(per/100*self.n)])[0]
+
+    # ----------------------------------------------------------------
+    # estimates of variability
+    # ----------------------------------------------------------------
+
+    def moments(self):
+        """Returns the arithmetic mean and the (biased) central moments
+        of order 2, 3 and 4 [tuple[float, float, float, float]]."""
+        return self._mean, self._m2/self.n, self._m3/self.n, self._m4/self.n
+
+    def mu(self, k: int):
+        """Returns the k-th statistical moment [float] related to the
+        arithmetic mean (k = 2, 3 or 4)."""
+        if k not in [2, 3, 4]:
+            raise ValueError("OnlineNumericalList only holds the moments 2, 3 and 4!")
+        return self.moments()[k-1]
+
+    def range(self):
+        """Returns range [float]."""
+        return self._max - self._min
+
+    def iqr(self):
+        """Returns approximate IQR [float] with an absolute error of at
+        most relative_accuracy*(|q25| + |q75|)."""
+        q25, q75 = self._values_at_ranks([int(0.25*self.n), int(0.75*self.n)])
+        return q75 - q25
@@ -0,0 +1,51 @@
+from concurrent.futures import ProcessPoolExecutor
+
+
+def map_bounded(func, items, kwargs: dict = {}, processes: int = 1, chunksize: int = 1):
+    """Returns [func(item, **kwargs) for item in items] (in order),
+    computed in a process pool if processes > 1.
+
+    The items are sent to the workers in tasks of chunksize items and at
+    most two tasks per process are in flight, so items that are
+    generated lazily (e.g. chunks of stations) are not all held in
+    memory at once. func must be a module-level function (picklable).
+
+    Args:
+        func: function of one item and the keyword arguments
+        items: iterable of items
+        kwargs (dict, optional): keyword arguments of func.
+            Defaults to {}.
+        processes (int, optional): number of worker processes.
+            Defaults to 1 (no process pool).
+        chunksize (int, optional): items per task. Defaults to 1.
+    """
+    if processes == 1:
+        return [func(item, **kwargs) for item in items]
+    results = []
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        pending = []
+        for task in _tasks(items, chunksize):
+            pending.append(executor.submit(_apply, func, task, kwargs))
+            if len(pending) >= 2*processes:
+                results.extend(pending.pop(0).result())
+        for future in pending:
+            results.extend(future.result())
+    return results
+
+
+def _tasks(items, chunksize: int):
+    """Yields lists of chunksize consecutive items."""
+    task = []
+    for item in items:
+        task.append(item)
+        if len(task) == chunksize:
+            yield task
+            task = []
+    if task:
+        yield task
+
+
+def _apply(func, task: list, kwargs: dict):
+    """Returns [func(item, **kwargs) for item in task] (runs in a
+    worker process)."""
+    return [func(item, **kwargs) for item in task]
@@ -0,0 +1,227 @@
+import os
+import numpy as np
+import matplotlib
+from matplotlib.figure import Figure
+
+from flyingfish.parallel import map_bounded
+
+
+def downsample_minmax(values: np.ndarray, n_buckets: int):
+    """Returns the positions [np.ndarray] of the values to draw a line
+    plot of n_buckets pixels wide without visible difference (M4
+    downsampling): the first, lowest, highest and last value of each
+    bucket of consecutive values. Peaks and troughs are never lost.
+
+    The buckets are formed by padding the values to a multiple of the
+    bucket size and reshaping them to a 2-D array, so the extremes of
+    all buckets are found in one vectorized pass. Missing values (NaN)
+    are skipped by the extremes, but the first and last value of a bucket
+    are always kept, so longer gaps stay visible.
+
+    Args:
+        values (np.ndarray): values in plotting order
+        n_buckets (int): number of buckets (e.g. the plot width in
+            pixels)
+    """
+    n = len(values)
+    if n <= 4*n_buckets:
+        return np.arange(n)
+    size = -(-n // n_buckets)
+    n_rows = -(-n // size)
+    padded = np.full(n_rows*size, np.nan)
+    padded[:n] = values
+    rows = padded.reshape(n_rows, size)
+    missing = np.isnan(rows)
+    offsets = np.arange(n_rows)*size
+    lowest = np.argmin(np.where(missing, np.inf, rows), axis=1) + offsets
+    highest = np.argmax(np.where(missing, -np.inf, rows), axis=1) + offsets
+    last = np.minimum(offsets + size - 1, n - 1)
+    positions = np.sort(np.stack([offsets, lowest, highest, last], axis=1), axis=1).ravel()
+    return positions[np.r_[True, positions[1:] != positions[:-1]]]
+
+
+def plot_hydrograph(
+        ts,
+        varnames: list[str],
+        path: str | None = None,
+        figsize: tuple[float, float] = (10, 4),
+        dpi: int = 100,
+        title: str = "",
+        ylabel: str = ""):
+    """Returns (or saves) the hydrograph of one or more columns of a
+    TimeSeries. Each line is downsampled to the plot width in pixels
+    (see downsample_minmax), so long sub-daily records render fast and
+    produce small files without losing peaks.
+
+    Args:
+        ts (TimeSeries): time series
+        varnames (list[str]): column names (e.g. ["discharge"])
+        path (str | None, optional): file to save the figure to.
+            Defaults to None (the figure is returned).
+        figsize (tuple[float, float], optional): figure size in inches.
+            Defaults to (10, 4).
+        dpi (int, optional): resolution. Defaults to 100.
+        title (str, optional): title. Defaults to "".
+        ylabel (str, optional): label of the y axis. Defaults to "".
+
+    Returns:
+        Figure | str: the figure or the path of the saved file
+    """
+    dates = ts.df.index.to_numpy()
+    lines = {}
+    for varname in varnames:
+        values = ts.df[varname].to_numpy(dtype=float)
+        lines[varname] = (dates, values)
+    return _plot_lines(lines, path, figsize, dpi, title, ylabel)
+
+
+def plot_summation_curve(
+        ts,
+        varname: str,
+        reset: str | None = None,
+        path: str | None = None,
+        figsize: tuple[float, float] = (10, 4),
+        dpi: int = 100,
+        title: str = "",
+        ylabel: str = ""):
+    """Returns (or saves) the summation curve of a column of a TimeSeries
+    (see TimeSeries.summation_curve), downsampled to the plot width.
+
+    Args:
+        ts (TimeSeries): time series
+        varname (str): column name (e.g. "precipitation")
+        reset (str | None, optional): "year" or "hyd_year" to restart the
+            sum every (hydrological) year. Defaults to None.
+        path (str | None, optional): see plot_hydrograph.
+        figsize (tuple[float, float], optional): see plot_hydrograph.
+        dpi (int, optional): see plot_hydrograph.
+        title (str, optional): see plot_hydrograph.
+        ylabel (str, optional): see plot_hydrograph.
+
+    Returns:
+        Figure | str: the figure or the path of the saved file
+    """
+    curve = ts.summation_curve(varname, reset=reset)
+    lines = {varname: (curve.index.to_numpy(), curve.to_numpy())}
+    return _plot_lines(lines, path, figsize, dpi, title, ylabel)
+
+
+def plot_batch(
+        data: dict[str, object],
+        varname: str,
+        directory: str,
+        kind: str = "hydrograph",
+        file_format: str = "png",
+        processes: int = 1,
+        **kwargs):
+    """Renders one plot per station to files, optionally in a process
+    pool. The figures are drawn with the Agg canvas of matplotlib
+    without pyplot, so no display or GUI backend is needed.
+
+    Args:
+        data (dict[str, TimeSeries]): TimeSeries per station id
+        varname (str): column name (e.g. "discharge")
+        directory (str): output directory (created if missing)
+        kind (str, optional): "hydrograph" or "summation_curve".
+            Defaults to "hydrograph".
+        file_format (str, optional): file suffix. Defaults to "png".
+        processes (int, optional): number of worker processes.
+            Defaults to 1.
+        **kwargs: further arguments of plot_hydrograph or
+            plot_summation_curve
+
+    Returns:
+        dict[str, str]: path of the file per station id
+    """
+    if kind not in ["hydrograph", "summation_curve"]:
+        raise ValueError(f"Unknown plot kind {kind}!")
+    os.makedirs(directory, exist_ok=True)
+    paths = {station: os.path.join(directory, f"{station}.{file_format}") for station in data}
+    map_bounded(
+        _plot_file, ((ts, paths[station]) for station, ts in data.items()),
+        dict(varname=varname, kind=kind, **kwargs), processes,
+        max(1, len(data)//(4*processes)))
+    return paths
+
+
+def _plot_file(item: tuple, varname: str, kind: str, **kwargs):
+    """Saves the plot of one station (TimeSeries and path) of
+    plot_batch."""
+    ts, path = item
+    if kind == "hydrograph":
+        plot_hydrograph(ts, [varname], path=path, **kwargs)
+    else:
+        plot_summation_curve(ts, varname, path=path, **kwargs)
+
+
+def _plot_lines(
+        lines: dict[str, tuple[np.ndarray, np.ndarray]],
+        path: str | None,
+        figsize: tuple[float, float],
+        dpi: int,
+        title: str,
+        ylabel: str):
+    """Returns (or saves) a figure with one downsampled line per entry
+    (label: (x, y))."""
+    fig = Figure(figsize=figsize, dpi=dpi)
+    ax = fig.subplots()
+    n_buckets = int(figsize[0]*dpi)
+    for label, (x, y) in lines.items():
+        positions = downsample_minmax(y, n_buckets)
+        ax.plot(x[positions], y[positions], label=label, linewidth=0.8)
+    ax.set_title(title)
+    ax.set_ylabel(ylabel)
+    if len(lines) > 1:
+        ax.legend()
+    fig.autofmt_xdate()
+    if path is None:
+        return fig
+    fig.savefig(path)
+    return path
+
+
+def plot_wind_rose(
+        rose,
+        path: str | None = None,
+        figsize: tuple[float, float] = (6, 6),
+        dpi: int = 100,
+        title: str = "",
+        cmap: str = "viridis"):
+    """Returns (or saves) the plot of a wind rose as stacked polar bars
+    of the speed classes per sector. Only the accumulated frequencies
+    are drawn, so the cost does not depend on the number of values.
+
+    Args:
+        rose (WindRose): accumulated wind rose
+        path (str | None, optional): see plot_hydrograph.
+        figsize (tuple[float, float], optional): figure size in inches.
+            Defaults to (6, 6).
+        dpi (int, optional): resolution. Defaults to 100.
+        title (str, optional): title. Defaults to "".
+        cmap (str, optional): colormap of the speed classes.
+            Defaults to "viridis".
+
+    Returns:
+        Figure | str: the figure or the path of the saved file
+    """
+    frequencies = rose.frequencies()
+    theta = np.deg2rad(rose.sectors())
+    width = 2*np.pi/rose.n_sectors
+    colors = matplotlib.colormaps[cmap](np.linspace(0, 1, frequencies.shape[1]))
+
+    fig = Figure(figsize=figsize, dpi=dpi)
+    ax = fig.add_subplot(projection="polar")
+    ax.set_theta_zero_location("N")
+    ax.set_theta_direction(-1)
+    bottom = np.zeros(rose.n_sectors)
+    for color, label in zip(colors, frequencies.columns):
+        heights = frequencies[label].to_numpy()
+        ax.bar(theta, heights, width=width, bottom=bottom, color=color,
+               edgecolor="white", linewidth=0.5, label=label)
+        bottom += heights
+    ax.set_title(title or f"calm: {rose.calm_frequency():.1f} %")
+    ax.legend(loc="lower left", bbox_to_anchor=(1.0, 0.0), fontsize="small")
+    if path is None:
+        return fig
+    fig.savefig(path, bbox_inches="tight")
+    return path
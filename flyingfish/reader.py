@@ -0,0 +1,254 @@
+import os
+import numpy as np
+import pandas as pd
+
+from flyingfish.timeseries import TimeSeries
+
+
+CSV_SUFFIXES = [".csv", ".txt"]
+PARQUET_SUFFIXES = [".parquet", ".pq"]
+FEATHER_SUFFIXES = [".feather", ".arrow"]
+
+
+def read_timeseries(
+        path: str,
+        columns: list[str] | None = None,
+        date_start: pd.Timestamp | None = None,
+        date_end: pd.Timestamp | None = None,
+        dtype: type | dict[str, type] = np.float64,
+        date_col: str = "date",
+        date_format: str | None = None,
+        chunksize: int = 100_000,
+        ascending: bool = True):
+    """Returns a TimeSeries read from a CSV, Parquet or Feather file
+    (e.g. data/timeseries_discharge.csv) with "date" as DatetimeIndex.
+
+    Only the requested columns are read and the values are parsed with
+    explicit dtypes. If a timeframe is given, the file is read in chunks
+    and only rows within the timeframe are kept, so large archives can
+    be subset without loading them completely. Parquet files are pruned
+    by columns and row groups.
+
+    Args:
+        path (str): path of a .csv/.txt, .parquet/.pq or .feather/.arrow
+            file
+        columns (list[str] | None, optional): value columns to read.
+            Defaults to None (all columns except the date and a
+            leading "index" column).
+        date_start (pd.Timestamp | None, optional): first date
+            (included). Defaults to None.
+        date_end (pd.Timestamp | None, optional): last date (included).
+            Defaults to None.
+        dtype (type | dict[str, type], optional): dtype of all value
+            columns or per column. Defaults to np.float64.
+        date_col (str, optional): name of the date column.
+            Defaults to "date".
+        date_format (str | None, optional): strftime format of the
+            dates in CSV files (e.g. "%Y-%m-%d"). Defaults to None
+            (ISO 8601 dates are detected).
+        chunksize (int, optional): number of rows per chunk when reading
+            a timeframe. Defaults to 100_000.
+        ascending (bool, optional): the dates of the file are in
+            ascending order, so reading stops after date_end.
+            Defaults to True.
+
+    Returns:
+        TimeSeries: values with "date" as index
+    """
+    kwargs = dict(
+        columns=columns,
+        date_start=date_start,
+        date_end=date_end,
+        dtype=dtype,
+        date_col=date_col,
+        date_format=date_format)
+    suffix = _suffix(path)
+
+    if suffix in PARQUET_SUFFIXES:
+        import pyarrow.parquet
+        columns = _value_columns(path, columns, date_col)
+        filters = _parquet_filters(date_col, date_start, date_end)
+        df = pyarrow.parquet.read_table(
+            path, columns=[date_col, *columns], filters=filters).to_pandas()
+        return _to_timeseries(df, **kwargs)
+
+    if suffix in CSV_SUFFIXES and date_start is None and date_end is None:
+        columns = _value_columns(path, columns, date_col)
+        df = pd.read_csv(
+            path,
+            usecols=[date_col, *columns],
+            dtype={date_col: str, **_dtypes(columns, dtype)})
+        return _to_timeseries(df, **kwargs)
+
+    chunks = [ts.df for ts in iter_timeseries(path, chunksize=chunksize, ascending=ascending, **kwargs)]
+    if not chunks:
+        return _to_timeseries(_empty_frame(path, columns, date_col), **kwargs)
+    return TimeSeries(pd.concat(chunks))
+
+
+def iter_timeseries(
+        path: str,
+        chunksize: int = 100_000,
+        columns: list[str] | None = None,
+        date_start: pd.Timestamp | None = None,
+        date_end: pd.Timestamp | None = None,
+        dtype: type | dict[str, type] = np.float64,
+        date_col: str = "date",
+        date_format: str | None = None,
+        ascending: bool = True):
+    """Yields a CSV, Parquet or Feather file as TimeSeries chunks of at
+    most chunksize rows (see read_timeseries for the arguments). Chunks
+    without rows in the timeframe are skipped. Parquet row groups
+    outside of the timeframe are not read at all and Feather files are
+    memory-mapped.
+
+    Yields:
+        TimeSeries: values of one chunk with "date" as index
+    """
+    kwargs = dict(
+        columns=columns,
+        date_start=date_start,
+        date_end=date_end,
+        dtype=dtype,
+        date_col=date_col,
+        date_format=date_format)
+    suffix = _suffix(path)
+    columns = _value_columns(path, columns, date_col)
+
+    if suffix in CSV_SUFFIXES:
+        batches = pd.read_csv(
+            path,
+            usecols=[date_col, *columns],
+            dtype={date_col: str, **_dtypes(columns, dtype)},
+            chunksize=chunksize)
+    elif suffix in PARQUET_SUFFIXES:
+        import pyarrow.parquet
+        parquet_file = pyarrow.parquet.ParquetFile(path)
+        row_groups = _parquet_row_groups(parquet_file, date_col, date_start, date_end)
+        batches = (batch.to_pandas() for batch in parquet_file.iter_batches(
+            batch_size=chunksize, row_groups=row_groups, columns=[date_col, *columns]))
+    elif suffix in FEATHER_SUFFIXES:
+        import pyarrow.feather
+        table = pyarrow.feather.read_table(
+            path, columns=[date_col, *columns], memory_map=True)
+        batches = (batch.to_pandas() for batch in table.to_batches(max_chunksize=chunksize))
+    else:
+        raise ValueError(f"Unsupported file type {suffix}!")
+
+    for batch in batches:
+        ts = _to_timeseries(batch, **kwargs)
+        if len(ts.df) > 0:
+            yield ts
+        if ascending and date_end is not None and len(batch) > 0:
+            last = _parse_dates(batch[date_col].iloc[-1:], date_format)[0]
+            if last > pd.Timestamp(date_end):
+                break
+
+
+def _suffix(path: str):
+    """Returns the lower case file suffix."""
+    return os.path.splitext(path)[1].lower()
+
+
+def _value_columns(path: str, columns: list[str] | None, date_col: str):
+    """Returns the value columns to read (all but the date and a leading
+    "index" column if none are given)."""
+    if columns is not None:
+        return list(columns)
+    suffix = _suffix(path)
+    if suffix in CSV_SUFFIXES:
+        names = pd.read_csv(path, nrows=0).columns
+    else:
+        import pyarrow.parquet
+        import pyarrow.feather
+        if suffix in PARQUET_SUFFIXES:
+            names = pyarrow.parquet.read_schema(path).names
+        else:
+            names = pyarrow.feather.read_table(path, memory_map=True).column_names
+    return [name for name in names
+            if name not in [date_col, "index", "__index_level_0__"]
+            and not name.startswith("Unnamed: ")]
+
+
+def _dtypes(columns: list[str], dtype: type | dict[str, type]):
+    """Returns the dtype per value column."""
+    if isinstance(dtype, dict):
+        return {col: dtype.get(col, np.float64) for col in columns}
+    return {col: dtype for col in columns}
+
+
+def _parse_dates(dates: pd.Series, date_format: str | None):
+    """Returns a DatetimeIndex of date strings or datetimes."""
+    if pd.api.types.is_datetime64_any_dtype(dates):
+        return pd.DatetimeIndex(dates)
+    return pd.DatetimeIndex(pd.to_datetime(dates, format=date_format))
+
+
+def _to_timeseries(
+        df: pd.DataFrame,
+        columns: list[str] | None,
+        date_start: pd.Timestamp | None,
+        date_end: pd.Timestamp | None,
+        dtype: type | dict[str, type],
+        date_col: str,
+        date_format: str | None):
+    """Returns a TimeSeries of a raw chunk: dates parsed as index,
+    restricted to the timeframe and values cast to the dtypes."""
+    dates = _parse_dates(df[date_col], date_format)
+    mask = np.ones(len(df), dtype=bool)
+    if date_start is not None:
+        mask &= np.asarray(dates >= pd.Timestamp(date_start))
+    if date_end is not None:
+        mask &= np.asarray(dates <= pd.Timestamp(date_end))
+
+    value_columns = [col for col in df.columns if col != date_col] \
+        if columns is None else list(columns)
+    values = df[value_columns]
+    if not mask.all():
+        values = values[mask]
+        dates = dates[mask]
+    values = values.astype(_dtypes(value_columns, dtype), copy=False)
+    values.index = dates.rename("date")
+    return TimeSeries(values)
+
+
+def _empty_frame(path: str, columns: list[str] | None, date_col: str):
+    """Returns an empty raw chunk with the date and value columns."""
+    columns = _value_columns(path, columns, date_col)
+    return pd.DataFrame({
+        date_col: pd.Series([], dtype="datetime64[ns]"),
+        **{col: pd.Series([], dtype=np.float64) for col in columns}})
+
+
+def _parquet_filters(
+        date_col: str,
+        date_start: pd.Timestamp | None,
+        date_end: pd.Timestamp | None):
+    """Returns pyarrow filters of the timeframe (None if unrestricted)."""
+    filters = []
+    if date_start is not None:
+        filters.append((date_col, ">=", pd.Timestamp(date_start)))
+    if date_end is not None:
+        filters.append((date_col, "<=", pd.Timestamp(date_end)))
+    return filters or None
+
+
+def _parquet_row_groups(
+        parquet_file,
+        date_col: str,
+        date_start: pd.Timestamp | None,
+        date_end: pd.Timestamp | None):
+    """Returns the indices of the row groups whose date statistics
+    overlap the timeframe (all row groups without statistics)."""
+    metadata = parquet_file.metadata
+    i_col = parquet_file.schema_arrow.get_field_index(date_col)
+    row_groups = []
+    for i in range(metadata.num_row_groups):
+        stats = metadata.row_group(i).column(i_col).statistics
+        if stats is not None and stats.has_min_max:
+            if date_start is not None and pd.Timestamp(stats.max) < pd.Timestamp(date_start):
+                continue
+            if date_end is not None and pd.Timestamp(stats.min) > pd.Timestamp(date_end):
+                continue
+        row_groups.append(i)
+    return row_groups
@@ -0,0 +1,209 @@
+import numpy as np
+import pandas as pd
+
+from flyingfish.timeseries import TimeSeries
+
+
+# Precipitation types (rows of RICHTER_B)
+PRECIPITATION_TYPES = ["rain_summer", "rain_winter", "mixed", "snow"]
+
+# Exposure classes of the gauge (columns of RICHTER_B): A free,
+# B slightly, C moderately and D strongly protected
+EXPOSURE_CLASSES = ["A", "B", "C", "D"]
+
+# Coefficient b of the correction b*P^epsilon (Richter 1995)
+RICHTER_B = np.array([
+    [0.345, 0.310, 0.280, 0.245],
+    [0.340, 0.280, 0.240, 0.190],
+    [0.535, 0.390, 0.305, 0.185],
+    [0.720, 0.510, 0.330, 0.210],
+])
+
+# Exponent epsilon per precipitation type (Richter 1995)
+RICHTER_EPSILON = np.array([0.38, 0.46, 0.55, 0.82])
+
+
+def precipitation_type(
+        months: np.ndarray,
+        temperature: np.ndarray | None = None,
+        types: np.ndarray | None = None,
+        t_snow: float = 0.0,
+        t_rain: float = 3.0,
+        summer_months: list[int] = [5, 6, 7, 8, 9, 10]):
+    """Returns the precipitation type [np.ndarray] as index of
+    PRECIPITATION_TYPES, derived from given types or from the air
+    temperature (snow below t_snow, rain above t_rain, mixed in between).
+    Rain is split into summer and winter by month. Values without
+    temperature are treated as mixed.
+
+    Args:
+        months (np.ndarray): month of each value
+        temperature (np.ndarray | None, optional): air temperature in
+            degree Celsius. Defaults to None.
+        types (np.ndarray | None, optional): "rain", "mixed" or "snow"
+            per value, used instead of the temperature. Defaults to None.
+        t_snow (float, optional): temperature below which precipitation
+            falls as snow. Defaults to 0.0.
+        t_rain (float, optional): temperature above which precipitation
+            falls as rain. Defaults to 3.0.
+        summer_months (list[int], optional): months of the summer rain
+            coefficients. Defaults to [5, 6, 7, 8, 9, 10].
+    """
+    if types is not None:
+        codes = pd.Categorical(types, categories=["rain", "mixed", "snow"]).codes
+        if (codes < 0).any():
+            raise ValueError("Precipitation types must be 'rain', 'mixed' or 'snow'!")
+    elif temperature is not None:
+        temperature = np.asarray(temperature, dtype=float)
+        codes = np.where(temperature < t_snow, 2, np.where(temperature > t_rain, 0, 1))
+    else:
+        raise ValueError("Either temperature or types must be given!")
+    winter = ~np.isin(months, summer_months)
+    # rain -> 0 (summer) or 1 (winter), mixed -> 2, snow -> 3
+    return np.where(codes == 0, winter.astype(np.int8), codes + 1).astype(np.int8)
+
+
+def richter_correction_values(
+        values: np.ndarray,
+        ptypes: np.ndarray,
+        exposures: np.ndarray):
+    """Returns the corrected precipitation P + b*P^epsilon [np.ndarray].
+    b and epsilon are looked up for all values at once by fancy indexing
+    of RICHTER_B and RICHTER_EPSILON.
+
+    Args:
+        values (np.ndarray): measured precipitation in mm
+        ptypes (np.ndarray): precipitation type per value (index of
+            PRECIPITATION_TYPES, see precipitation_type)
+        exposures (np.ndarray): exposure class per value (index of
+            EXPOSURE_CLASSES)
+    """
+    values = np.asarray(values, dtype=float)
+    b = RICHTER_B[ptypes, exposures]
+    epsilon = RICHTER_EPSILON[ptypes]
+    return values + b*np.power(np.maximum(values, 0.0), epsilon)
+
+
+def richter_correction(
+        ts: TimeSeries,
+        exposure: str,
+        varname: str = "precipitation",
+        temperature_col: str | None = "temperature",
+        type_col: str | None = None,
+        t_snow: float = 0.0,
+        t_rain: float = 3.0,
+        summer_months: list[int] = [5, 6, 7, 8, 9, 10]):
+    """Returns a TimeSeries with the precipitation corrected after
+    Richter (1995) for the systematic measurement error (wind, wetting
+    and evaporation losses) of a Hellmann gauge.
+
+    Args:
+        ts (TimeSeries): daily precipitation (and temperature)
+        exposure (str): exposure class of the gauge "A" (free), "B",
+            "C" or "D" (strongly protected)
+        varname (str, optional): precipitation column.
+            Defaults to "precipitation".
+        temperature_col (str | None, optional): air temperature column
+            to derive the precipitation type. Defaults to "temperature".
+        type_col (str | None, optional): column with the precipitation
+            type ("rain", "mixed", "snow"), used instead of the
+            temperature. Defaults to None.
+        t_snow (float, optional): see precipitation_type.
+            Defaults to 0.0.
+        t_rain (float, optional): see precipitation_type.
+            Defaults to 3.0.
+        summer_months (list[int], optional): see precipitation_type.
+            Defaults to [5, 6, 7, 8, 9, 10].
+
+    Returns:
+        TimeSeries: copy of the time series with corrected precipitation
+    """
+    df = ts.df
+    ptypes = _precipitation_type_of_frame(
+        df, ts.calendar("month"), temperature_col, type_col, t_snow, t_rain, summer_months)
+    df_new = df.copy(deep=True)
+    df_new[varname] = richter_correction_values(
+        df[varname].to_numpy(dtype=float), ptypes, _exposure_codes([exposure])[0])
+    return TimeSeries(df_new)
+
+
+def richter_correction_batch(
+        data: pd.DataFrame,
+        exposures: dict[str, str],
+        varname: str = "precipitation",
+        station_col: str = "station",
+        date_col: str = "date",
+        temperature_col: str | None = "temperature",
+        type_col: str | None = None,
+        t_snow: float = 0.0,
+        t_rain: float = 3.0,
+        summer_months: list[int] = [5, 6, 7, 8, 9, 10]):
+    """Returns a long-format DataFrame of many gauges with the
+    precipitation corrected after Richter (see richter_correction) in
+    one vectorized call. The exposure class of each row is looked up
+    from the station codes.
+
+    Args:
+        data (pd.DataFrame): long-format DataFrame with the columns
+            station_col, date_col, varname and temperature_col or
+            type_col
+        exposures (dict[str, str]): exposure class per station id
+        varname (str, optional): precipitation column.
+            Defaults to "precipitation".
+        station_col (str, optional): name of the station column.
+            Defaults to "station".
+        date_col (str, optional): name of the date column.
+            Defaults to "date".
+        temperature_col (str | None, optional): see richter_correction.
+            Defaults to "temperature".
+        type_col (str | None, optional): see richter_correction.
+            Defaults to None.
+        t_snow (float, optional): see precipitation_type.
+            Defaults to 0.0.
+        t_rain (float, optional): see precipitation_type.
+            Defaults to 3.0.
+        summer_months (list[int], optional): see precipitation_type.
+            Defaults to [5, 6, 7, 8, 9, 10].
+
+    Returns:
+        pd.DataFrame: copy of data with corrected precipitation
+    """
+    codes, uniques = pd.factorize(data[station_col])
+    missing = [station for station in uniques if station not in exposures]
+    if missing:
+        raise ValueError(f"No exposure class for the stations {missing}!")
+    station_exposures = _exposure_codes([exposures[station] for station in uniques])
+    months = pd.DatetimeIndex(data[date_col]).month.to_numpy()
+    ptypes = _precipitation_type_of_frame(
+        data, months, temperature_col, type_col, t_snow, t_rain, summer_months)
+    df_new = data.copy(deep=True)
+    df_new[varname] = richter_correction_values(
+        data[varname].to_numpy(dtype=float), ptypes, station_exposures[codes])
+    return df_new
+
+
+def _exposure_codes(exposures: list[str]):
+    """Returns the indices of exposure classes [np.ndarray]."""
+    codes = pd.Categorical(exposures, categories=EXPOSURE_CLASSES).codes
+    if (codes < 0).any():
+        raise ValueError(f"Exposure classes must be one of {EXPOSURE_CLASSES}!")
+    return codes.astype(np.int8)
+
+
+def _precipitation_type_of_frame(
+        df: pd.DataFrame,
+        months: np.ndarray,
+        temperature_col: str | None,
+        type_col: str | None,
+        t_snow: float,
+        t_rain: float,
+        summer_months: list[int]):
+    """Returns the precipitation types of the rows of a DataFrame."""
+    if type_col is not None:
+        return precipitation_type(months, types=df[type_col].to_numpy(),
+                                  summer_months=summer_months)
+    if temperature_col is None:
+        raise ValueError("Either temperature_col or type_col must be given!")
+    return precipitation_type(
+        months, temperature=df[temperature_col].to_numpy(dtype=float),
+        t_snow=t_snow, t_rain=t_rain, summer_months=summer_months)
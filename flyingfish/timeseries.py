@@ -1,8 +1,19 @@
-import collections
 import matplotlib.pyplot as plt
 import pandas as pd
 from enum import Enum
 import numpy as np
+import warnings
+
+from flyingfish.numericallist import NumericalList, Status as NumericalListStatus
+from flyingfish.empiricaldistribution import plotting_positions
+from flyingfish import plotting
+
+
+# Scale of the MAD to the standard deviation of a normal distribution
+MAD_SCALE = 1.4826
+
+# Calendar arrays derived from the index (see TimeSeries.calendar)
+CALENDAR_FIELDS = ["year", "month", "day", "dayofyear"]
 
 
 class Status(Enum):
@@ -27,76 +38,315 @@ class TimeSeries:
         self.df: pd.DataFrame = df
         self.status: Status = status
 
+    @property
+    def df(self):
+        """DataFrame with "date" as index. Chunks added by append are
+        concatenated on first access."""
+        if self._pending:
+            appended = self._yearly_index is self._df.index
+            self._df = pd.concat([self._df, *self._pending])
+            self._pending = []
+            if appended:
+                # the yearly aggregates were updated by append
+                self._yearly_index = self._df.index
+        return self._df
+
+    @df.setter
+    def df(self, df: pd.DataFrame):
+        self._df = df
+        self._pending: list[pd.DataFrame] = []
+        self._last_date = df.index[-1] if len(df) else None
+        # yearly aggregates per (varname, aggregation) of
+        # self._yearly_index, see yearly_aggregates
+        self._yearly: dict[tuple, dict[str, np.ndarray]] = {}
+        self._yearly_index: pd.Index | None = df.index
+        # calendar arrays of self._calendar_index, see calendar
+        self._calendar: dict[str | tuple, np.ndarray] = {}
+        self._calendar_index: pd.Index | None = None
+
+    def calendar(
+            self,
+            field: str,
+            hyd_year_begin_month: int = 11,
+            hyd_year_begin_day: int = 1):
+        """Returns a calendar array of the index: "year", "month", "day",
+        "dayofyear" or "hyd_year" (see hyd_year) [np.ndarray].
+
+        Year, month, day and day of year are derived from the index
+        together on first use and kept as read-only int16 arrays until
+        the index changes (checked by identity), so repeated selections
+        and groupings do not decompose the dates again.
+
+        Args:
+            field (str): "year", "month", "day", "dayofyear" or "hyd_year"
+            hyd_year_begin_month (int, optional): begin month of the
+                hydrological year. Defaults to 11.
+            hyd_year_begin_day (int, optional): begin day of the
+                hydrological year. Defaults to 1.
+        """
+        index = self.df.index
+        if index is not self._calendar_index:
+            self._calendar = {}
+            self._calendar_index = index
+        key = ("hyd_year", hyd_year_begin_month, hyd_year_begin_day) \
+            if field == "hyd_year" else field
+        if key not in self._calendar:
+            if field == "hyd_year":
+                array = _hyd_years(
+                    self.calendar("year"), self.calendar("month"), self.calendar("day"),
+                    hyd_year_begin_month, hyd_year_begin_day)
+                array.flags.writeable = False
+                self._calendar[key] = array
+            elif field in CALENDAR_FIELDS:
+                for name, array in _calendar_fields(index).items():
+                    array.flags.writeable = False
+                    self._calendar[name] = array
+            else:
+                raise ValueError(f"Unknown calendar field {field}!")
+        return self._calendar[key]
+
+    def append(self, df_new: pd.DataFrame):
+        """Appends new observations (e.g. the values of the last day)
+        and updates the cached yearly aggregates.
+
+        The cost only depends on the size of the new data: the chunk is
+        aggregated per year and merged into the cached aggregates, the
+        DataFrame itself is concatenated lazily on the next access of
+        df.
+
+        Args:
+            df_new (pd.DataFrame): new values with "date" as index, all
+                later than the last date of the series
+
+        Returns:
+            TimeSeries: the updated time series (self)
+        """
+        if len(df_new) == 0:
+            return self
+        if self._last_date is not None and df_new.index[0] <= self._last_date:
+            raise ValueError("Appended data must start after the last date of the TimeSeries!")
+        if not df_new.index.is_monotonic_increasing:
+            raise ValueError("Appended data must be sorted by date!")
+        if self._df.index is not self._yearly_index:
+            self._yearly = {}
+        for (varname, aggr, begin_month, begin_day), yearly in self._yearly.items():
+            new = _yearly_aggregates(
+                df_new.index.asi8, _calendar_fields(df_new.index),
+                df_new[varname].to_numpy(dtype=float), aggr, begin_month, begin_day)
+            self._yearly[(varname, aggr, begin_month, begin_day)] = _merge_yearly(yearly, new)
+        self._pending.append(df_new)
+        self._last_date = df_new.index[-1]
+        return self
+
+    def yearly_aggregates(
+            self,
+            varname: str,
+            aggr: str = "year",
+            hyd_year_begin_month: int = 11,
+            hyd_year_begin_day: int = 1):
+        """Returns the maximum, minimum, mean, sum and number of values
+        per (hydrological) year of a column. The aggregates are computed
+        once and kept up to date by append. They are recomputed if the
+        index changes (checked by identity like calendar); values changed
+        in place (e.g. ts.df.iloc[0, 0] = 1.0) are not detected, assign
+        the DataFrame again (ts.df = df) to reset the aggregates.
+
+        Args:
+            varname (str): column name (e.g. "discharge")
+            aggr (str, optional): "year" or "hyd_year" (see hyd_year).
+                Defaults to "year".
+            hyd_year_begin_month (int, optional): begin month of the
+                hydrological year. Defaults to 11.
+            hyd_year_begin_day (int, optional): begin day of the
+                hydrological year. Defaults to 1.
+
+        Returns:
+            pd.DataFrame: index aggr and the columns "max", "min", "mean",
+                "sum" and "count"
+        """
+        yearly = self._cached_yearly(varname, aggr, hyd_year_begin_month, hyd_year_begin_day)
+        count = yearly["count"]
+        return pd.DataFrame({
+            "max": yearly["max"],
+            "min": yearly["min"],
+            "mean": yearly["sum"]/np.where(count == 0, np.nan, count),
+            "sum": yearly["sum"],
+            "count": count,
+        }, index=pd.Index(yearly["year"], name=aggr))
+
+    def _cached_yearly(
+            self,
+            varname: str,
+            aggr: str,
+            hyd_year_begin_month: int,
+            hyd_year_begin_day: int):
+        """Returns the cached yearly aggregates [dict[str, np.ndarray]]
+        of a column (computed on first use)."""
+        if aggr not in ["year", "hyd_year"]:
+            raise ValueError(f"Unknown aggregation {aggr}!")
+        key = (varname, aggr, hyd_year_begin_month, hyd_year_begin_day)
+        # pending chunks of append are already merged into the aggregates,
+        # so the check must not concatenate them (see df)
+        if self._df.index is not self._yearly_index:
+            self._yearly = {}
+            self._yearly_index = self._df.index
+        if key not in self._yearly:
+            dates, calendar, order = self._sorted_calendar()
+            values = self.df[varname].to_numpy(dtype=float)
+            self._yearly[key] = _yearly_aggregates(
+                dates, calendar, values if order is None else values[order], *key[1:])
+        return self._yearly[key]
+
+    def annual_principal_values(
+            self,
+            varnames: list[str],
+            aggr: str = "year",
+            hyd_year_begin_month: int = 11,
+            hyd_year_begin_day: int = 1):
+        """Returns principal values HHX, HX, MHX, MX, MNX, NX, NNX
+        (see principal_values) of the whole record from the cached
+        yearly aggregates (see yearly_aggregates), so after append they
+        are updated without reading the history again. Equal to
+        principal_values_table over the whole record and all months
+        (HX equals HHX and NX equals NNX).
+
+        Args:
+            varnames (list[str]): column names (e.g. ["discharge"])
+            aggr (str, optional): "year" or "hyd_year".
+                Defaults to "year".
+            hyd_year_begin_month (int, optional): begin month of the
+                hydrological year. Defaults to 11.
+            hyd_year_begin_day (int, optional): begin day of the
+                hydrological year. Defaults to 1.
+
+        Returns:
+            pd.DataFrame: one row per variable (index "variable") and the
+                columns "HHX", "HX", "MHX", "MX", "MNX", "NX", "NNX"
+        """
+        rows = [
+            _principal_values_of_yearly(self._cached_yearly(
+                varname, aggr, hyd_year_begin_month, hyd_year_begin_day))
+            for varname in varnames]
+        return pd.DataFrame(
+            rows, columns=["HHX", "HX", "MHX", "MX", "MNX", "NX", "NNX"],
+            index=pd.Index(list(varnames), name="variable")).round(2)
+
     def subset_timeframe(
             self,
             date_start: pd.Timestamp,
-            date_end: pd.Timestamp):
+            date_end: pd.Timestamp,
+            copy: bool = False):
         """Returns a sub-DataFrame based on a start and end date
         (both included).
 
         Args:
             date_start (datetime.datetime): first date
             date_end (datetime.datetime): last date
+            copy (bool, optional): return a copy instead of a view of
+                the data. Defaults to False.
 
         Returns:
             pd.DataFrame: sub-DataFrame with "date" as index
         """
-        df_sub = self.df.loc[date_start:date_end]
-        return TimeSeries(df_sub)
+        return self.subset(date_start=date_start, date_end=date_end, copy=copy)
 
     def subset_period(
             self,
-            months: list[int] = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12]):
+            months: list[int] = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12],
+            copy: bool = False):
         """Returns a sub-DataFrame based on given months.
 
         Args:
             months (list[int]): month index (e.g. 1 for January).
                 Defaults to [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12].
+            copy (bool, optional): return a copy even if all months are
+                selected. Defaults to False.
 
         Returns:
             pd.DataFrame: sub-DataFrame with "date" as index
         """
-        df_sub = self.df.copy(deep=True)
-        df_sub["month"] = df_sub.index
-        df_sub["month"] = [int(x.month) for x in df_sub["month"].tolist()]
-        df_sub = df_sub[df_sub["month"].isin(months)]
-        df_sub = df_sub.drop(columns=["month"], axis=1)
+        return self.subset(months=months, copy=copy)
+
+    def subset(
+            self,
+            date_start: pd.Timestamp | None = None,
+            date_end: pd.Timestamp | None = None,
+            months: list[int] | None = None,
+            copy: bool = False):
+        """Returns a sub-DataFrame based on a timeframe and given months
+        in one selection (equal to subset_timeframe followed by
+        subset_period).
+
+        The timeframe is selected as slice of the sorted index and the
+        months as boolean mask of the cached months within that slice. The
+        data is only copied if rows are dropped by the months or if
+        copy is True; otherwise the result is a view.
+
+        Args:
+            date_start (datetime.datetime | None, optional): first date
+                (included). Defaults to None (begin of the series).
+            date_end (datetime.datetime | None, optional): last date
+                (included). Defaults to None (end of the series).
+            months (list[int] | None, optional): month index (e.g. 1 for
+                January). Defaults to None (all months).
+            copy (bool, optional): return a copy instead of a view of
+                the data. Defaults to False.
+
+        Returns:
+            TimeSeries: sub-DataFrame with "date" as index
+        """
+        df_sub = self.df.iloc[self._subset_indexer(date_start, date_end, months)]
+        if copy:
+            df_sub = df_sub.copy(deep=True)
         return TimeSeries(df_sub)
 
+    def _subset_indexer(
+            self,
+            date_start: pd.Timestamp | None,
+            date_end: pd.Timestamp | None,
+            months: list[int] | None):
+        """Returns the positions [slice | np.ndarray] of the rows within
+        the timeframe and months. A slice is returned if all rows of
+        the timeframe are within the months."""
+        index = self.df.index
+        positions = index.slice_indexer(date_start, date_end)
+        if months is None:
+            return positions
+        mask = np.isin(self.calendar("month")[positions], months)
+        if mask.all():
+            return positions
+        return np.arange(len(index))[positions][mask]
+
     def hyd_year(
             self,
             hyd_year_begin_month: int = 11,
-            hyd_year_begin_day: int = 1):
+            hyd_year_begin_day: int = 1,
+            copy: bool = True):
         """Add column "hyd_year" which contains the hydrological year
         based on the given begin. Defaults to the first of November (Germany).
 
+        The hydrological year is derived in one vectorized pass from the
+        cached calendar arrays of the DatetimeIndex (see calendar), so sub-daily and
+        time-zone-aware indexes are supported (the local calendar date
+        of each timestamp is used).
+
         Args:
             hyd_year_begin_month (int, optional): number of month of a year.
                 Defaults to 11.
             hyd_year_begin_day (int, optional): number of day of a month.
                 Defaults to 1.
+            copy (bool, optional): if False, the column is added to the
+                DataFrame of this instance in place instead of a deep copy.
+                Defaults to True.
 
         Returns:
-            pd.DataFrame: given input DataFrame with new column "hyd_year"
-        """
-        df_copy = self.df.copy(deep=True)
-        
-        # Initialize hydrological year with calendric year.
-        df_copy['hyd_year'] = df_copy.index.year
-        
-        # Increment the hydrological year if it starts before 1st of January.
-        for index, _ in df_copy.iterrows():
-            hyd_new_year = pd.Timestamp(
-                year=index.year,
-                month=hyd_year_begin_month,
-                day=hyd_year_begin_day)
-            
-            if index >= hyd_new_year:
-                df_copy.loc[index,"hyd_year"] = int(index.year + 1)
-            else:
-                df_copy.loc[index,"hyd_year"] = int(index.year)
+            TimeSeries: given input DataFrame with new column "hyd_year"
+        """
+        hyd_years = self.calendar("hyd_year", hyd_year_begin_month, hyd_year_begin_day)
+        df = self.df.copy(deep=True) if copy else self.df
+        df["hyd_year"] = hyd_years.astype(np.int64)
 
-        return TimeSeries(df_copy)
+        return TimeSeries(df)
 
     def principal_values(
             self,
@@ -130,59 +380,1020 @@ class TimeSeries:
                 (e.g. "hyd_year" derived from function hyd_year)
 
         Returns:
-            float, float, float, float, float: values representing
-                HHX, HX, MX, NX, NNX
+            float, float, float, float, float, float, float: values
+                representing HHX, HX, MHX, MX, MNX, NX, NNX
+        """
+        table = self.principal_values_table(
+            date_start=date_start,
+            date_end=date_end,
+            varnames=[varname],
+            aggr_col_name=aggr_col_name,
+            months=months)
+        return tuple(table.loc[varname])
+
+    def principal_values_table(
+            self,
+            date_start: pd.Timestamp,
+            date_end: pd.Timestamp,
+            varnames: list[str],
+            aggr_col_name: str = "",
+            months: list[int] = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12]):
+        """Returns principal values HHX, HX, MHX, MX, MNX, NX, NNX
+        (see principal_values) for several columns at once.
+
+        Only the requested columns are read and the yearly maximum,
+        minimum and mean of all of them are computed in a single grouped
+        aggregation without copying the DataFrame.
+
+        Args:
+            date_start (datetime.datetime): first day of time series
+            date_end (datetime.datetime): last day of time series
+            varnames (list[str]): column names to derive principal values
+                (e.g. ["discharge_m3_s", "water_level"])
+            aggr_col_name (str): column name for aggregation
+                (e.g. "hyd_year" derived from function hyd_year). Uses the
+                calendric year of the index if empty. Defaults to "".
+            months (list[int], optional): month index.
+                Defaults to [1,2,3,4,5,6,7,8,9,10,11,12].
+
+        Returns:
+            pd.DataFrame: one row per variable (index "variable") and the
+                columns "HHX", "HX", "MHX", "MX", "MNX", "NX", "NNX"
         """
+        varnames = list(varnames)
+        df = self.df
 
-        # Create new TimeSeries instance
-        df_copy = self.df.copy(deep=True)
-        ts_new = TimeSeries(df=df_copy)
-        
         # Derive highest and lowest value ever observed
-        hhx = np.round(np.max(ts_new.df[varname]), 2)
-        nnx = np.round(np.min(ts_new.df[varname]), 2)
+        hhx = df[varnames].max()
+        nnx = df[varnames].min()
 
         # limit data to timeframe and months
-        ts_new = (ts_new.subset_timeframe(date_start, date_end)).subset_period(months)
-        df_new = ts_new.df
+        rows = self._subset_indexer(date_start, date_end, months)
+        if aggr_col_name == "":
+            keys = self.calendar("year")[rows]
+        else:
+            keys = df[aggr_col_name].to_numpy()[rows]
+        values = df.iloc[rows, df.columns.get_indexer(varnames)]
+
+        # Yearly max, min and mean of all variables in one pass
+        yearly = values.groupby(keys).agg(["max", "min", "mean"])
+
+        table = pd.DataFrame({
+            "HHX": hhx,
+            "HX": values.max(),
+            "MHX": yearly.xs("max", axis=1, level=1).mean(),
+            "MX": yearly.xs("mean", axis=1, level=1).mean(),
+            "MNX": yearly.xs("min", axis=1, level=1).mean(),
+            "NX": values.min(),
+            "NNX": nnx,
+        }, index=pd.Index(varnames, name="variable"))
+
+        return table.astype(float).round(2)
 
-        # Use year from index to aggregate if no other aggregation
-        # column name is given.
+    def partial_series(
+            self,
+            varname: str,
+            threshold: float | None = None,
+            per: float | None = None):
+        """Returns the partial duration series (peaks over threshold) of
+        a column: one row per run of consecutive values above the
+        threshold.
+
+        The run boundaries, peaks and volumes are derived with
+        vectorized NumPy operations without a loop over the values.
+
+        Args:
+            varname (str): column name (e.g. "discharge")
+            threshold (float | None, optional): fixed threshold.
+                Defaults to None.
+            per (float | None, optional): percentile of the column used
+                as threshold (see NumericalList.percentile) if no fixed
+                threshold is given. Defaults to None.
+
+        Returns:
+            pd.DataFrame: columns "start", "end" (first and last date
+                above the threshold), "peak_date", "peak", "duration"
+                (number of time steps times the time step) and "volume"
+                (sum of the exceedances above the threshold times the
+                time step in seconds, e.g. m³ for discharge in m³/s)
+        """
+        values = self.df[varname].to_numpy(dtype=float)
+        if threshold is None:
+            if per is None:
+                raise ValueError("Either threshold or per must be given!")
+            valid = values[~np.isnan(values)]
+            threshold = NumericalList(valid, status=NumericalListStatus.READY).percentile(per)
+        runs = _exceedance_runs(values, np.full(len(values), threshold))
+        return _partial_series_frame(self.df.index, runs, pd.Timedelta(self._time_step()))
+
+    def independent_events(
+            self,
+            varname: str,
+            threshold: float,
+            min_inter_event_time: str | pd.Timedelta,
+            recession_ratio: float | None = None):
+        """Returns the independent events of a flood or rainfall series.
+
+        Runs of values above the threshold (see partial_series) are
+        merged into one event if the time between them is shorter than
+        min_inter_event_time or, if recession_ratio is given, if the
+        values between them do not fall below recession_ratio times the
+        smaller of both peaks. Only consecutive runs are compared, so the
+        declustering is linear in the number of runs.
+
+        Args:
+            varname (str): column name (e.g. "discharge")
+            threshold (float): values above the threshold belong to an
+                event (e.g. 0 for rainfall)
+            min_inter_event_time (str | pd.Timedelta): minimum time
+                between the end of an event and the begin of the next
+                one (e.g. "6H")
+            recession_ratio (float | None, optional): maximum ratio of the
+                lowest value between two events to the smaller peak
+                (e.g. 2/3). Defaults to None (not applied).
+
+        Returns:
+            pd.DataFrame: columns "start", "peak_date", "end", "peak",
+                "duration", "volume" (see partial_series) and "total"
+                (sum of all values from start to end, e.g. the rainfall
+                depth)
+        """
+        events = _separate_events(
+            self.df.index.asi8,
+            self.df[varname].to_numpy(dtype=float),
+            threshold,
+            pd.Timedelta(min_inter_event_time).value,
+            recession_ratio)
+        return _event_frame(self.df.index, events, pd.Timedelta(self._time_step()))
+
+    def flow_duration_curve(
+            self,
+            varname: str,
+            aggr_col_name: str = "",
+            plotting_position: str = "weibull"):
+        """Returns the flow duration curves of a column for each year.
+
+        All years are ranked in one pass (one sort by year and value),
+        missing values are skipped.
+
+        Args:
+            varname (str): column name (e.g. "discharge")
+            aggr_col_name (str, optional): column name for aggregation
+                (e.g. "hyd_year" derived from function hyd_year). Uses the
+                calendric year of the index if empty. Defaults to "".
+            plotting_position (str, optional): "weibull", "blom",
+                "cunnane", "gringorten" or "hazen". Defaults to "weibull".
+
+        Returns:
+            pd.DataFrame: columns aggr_col_name (or "year"), "rank"
+                (1 for the highest value of a year), "value" and
+                "exceedance_probability"
+        """
+        values = self.df[varname].to_numpy(dtype=float)
         if aggr_col_name == "":
             aggr_col_name = "year"
-            df_new[aggr_col_name] = df_new.index.year
-            
+            keys = self.calendar("year")
+        else:
+            keys = self.df[aggr_col_name].to_numpy()
+        valid = ~np.isnan(values)
+        values, keys = values[valid], keys[valid]
+
+        # sort by year and descending value
+        order = np.lexsort((-values, keys))
+        values, keys = values[order], keys[order]
+        starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+        counts = np.diff(np.r_[starts, len(keys)])
+        n = np.repeat(counts, counts)
+        ranks = np.arange(len(keys)) - np.repeat(starts, counts) + 1
 
-        df_max = df_new.groupby([aggr_col_name]).max()
-        df_min = df_new.groupby([aggr_col_name]).min()
-        df_mean = df_new.groupby([aggr_col_name]).mean()
+        return pd.DataFrame({
+            aggr_col_name: keys,
+            "rank": ranks,
+            "value": values,
+            # exceedance probability of rank m equals the non-exceedance
+            # probability of the ascending rank m
+            "exceedance_probability": plotting_positions(ranks, n, plotting_position),
+        })
 
-        # Calculate other principal values
-        hx = np.round(np.max(df_new[varname]), 2)
-        mhx = df_max[varname].mean().__round__(2)
-        mx = df_mean[varname].mean().__round__(2)
-        mnx = df_min[varname].mean().__round__(2)
-        nx = np.round(np.min(df_new[varname]), 2)
+    def resample(
+            self,
+            freq: str = "day",
+            rules: dict[str, str | list[str]] | None = None,
+            min_coverage: float | dict[str, float] = 0.0,
+            hyd_year_begin_month: int = 11,
+            hyd_year_begin_day: int = 1,
+            previous=None,
+            since: pd.Timestamp | None = None):
+        """Returns the series aggregated to days, months, (hydrological)
+        years or custom windows (e.g. sub-daily gauges to daily values).
+
+        Every row is assigned to the start of its period once and all
+        columns and rules are aggregated over the contiguous periods of
+        the sorted index with ufunc.reduceat, so there is a single
+        grouping pass without pandas groupby. Missing values (NaN) are
+        skipped. The coverage of a period is the number of values
+        divided by the number of time steps (most common step of the
+        index) within the period. It can not be derived for a single
+        date, so min_coverage must be 0 then.
+
+        Days, months, (hydrological) years and windows of whole days of
+        a time-zone-aware index are floored on the local wall time, so
+        a day lasts 23 or 25 hours at daylight saving time switches.
+        Shorter windows keep their length and are aligned in the local
+        time of the first date. The result index keeps the time zone.
+
+        If previous (an earlier result of resample) is given, only the
+        periods from since on are recomputed and appended to the
+        periods of previous before since. since defaults to the last
+        period of previous, which may have been incomplete. The time
+        step is then taken from the recomputed values and the value
+        before them.
+
+        Args:
+            freq (str, optional): "day", "month", "year", "hyd_year" or
+                a fixed window length (e.g. "6H", "7D"; windows start at
+                multiples of the length since 1970-01-01).
+                Defaults to "day".
+            rules (dict[str, str | list[str]] | None, optional): rule(s)
+                per column: "sum", "mean", "max", "min" or "count"
+                (e.g. {"precipitation": "sum", "discharge": ["mean",
+                "max"]}). Defaults to None ("mean" for all numerical
+                columns).
+            min_coverage (float | dict[str, float], optional): minimum
+                coverage (0 to 1) of a period, overall or per column.
+                Aggregates of periods below are set to NaN ("count" is
+                kept). Defaults to 0.0.
+            hyd_year_begin_month (int, optional): begin month of the
+                hydrological year (see hyd_year). Defaults to 11.
+            hyd_year_begin_day (int, optional): begin day of the
+                hydrological year. Defaults to 1.
+            previous (TimeSeries | None, optional): earlier result of
+                resample with the same arguments. Defaults to None.
+            since (pd.Timestamp | None, optional): first date of the new
+                data; its period and all later ones are recomputed.
+                Defaults to None.
+
+        Returns:
+            TimeSeries: aggregated values with the period start as
+                "date" index. Columns are named after the column for a
+                single rule and "<column>_<rule>" for a list of rules.
+        """
+        df = self.df
+        tz = df.index.tz
+        dates, calendar, order = self._sorted_calendar()
+        if order is not None:
+            df = df.iloc[order]
+        if rules is None:
+            rules = {col: "mean" for col in df.select_dtypes(include="number").columns}
+        wall_time = tz is not None and (
+            freq in ["day", "month", "year", "hyd_year"] or pd.Timedelta(freq).value % DAY == 0)
+        # sub-daily windows of a time-zone-aware index are aligned to the
+        # UTC offset of the first date
+        shift = 0
+        if tz is not None and not wall_time and len(dates):
+            shift = pd.Timedelta(pd.Timestamp(dates[0], tz="UTC").tz_convert(tz).utcoffset()).value
+
+        first = None
+        i0 = 0
+        if previous is not None and since is None:
+            since = previous.df.index[-1]
+        if since is not None:
+            since = pd.DatetimeIndex([since])
+            first = _period_starts(
+                _local_dates(since) if wall_time else since.asi8 + shift,
+                _calendar_fields(since), freq, hyd_year_begin_month, hyd_year_begin_day)
+            first = _localize(first, tz) if wall_time else first - shift
+            i0 = np.searchsorted(dates, first[0])
+            df = df.iloc[i0:]
+            calendar = {k: v[i0:] for k, v in calendar.items()}
+        # the value before the recomputed ones gives the step of a single new value
+        step = _most_common_step(np.diff(dates[max(i0 - 1, 0):]))
+        dates = dates[i0:]
+
+        local = _local_dates(df.index) if wall_time else dates + shift
+        starts = _period_starts(local, calendar, freq, hyd_year_begin_month, hyd_year_begin_day)
+        offsets = np.flatnonzero(np.r_[len(starts) > 0, starts[1:] != starts[:-1]])
+        period_starts = starts[offsets]
+        period_ends = _period_ends(period_starts, freq, hyd_year_begin_day)
+        if wall_time:
+            period_starts, period_ends = _localize(period_starts, tz), _localize(period_ends, tz)
+        else:
+            period_starts, period_ends = period_starts - shift, period_ends - shift
+
+        columns = {}
+        for col, col_rules in rules.items():
+            names = [col_rules] if isinstance(col_rules, str) else list(col_rules)
+            aggregates = _aggregate_periods(df[col].to_numpy(dtype=float), offsets, names)
+            threshold = min_coverage.get(col, 0.0) if isinstance(min_coverage, dict) \
+                else min_coverage
+            incomplete = np.zeros(len(offsets), dtype=bool)
+            if threshold > 0:
+                if step == 0:
+                    raise ValueError("min_coverage requires at least two different dates!")
+                incomplete = aggregates["count"]/((period_ends - period_starts)/step) < threshold
+            for rule in names:
+                values = aggregates[rule]
+                if rule != "count":
+                    values = np.where(incomplete, np.nan, values)
+                columns[col if isinstance(col_rules, str) else f"{col}_{rule}"] = values
+
+        index = pd.DatetimeIndex(period_starts, name="date")
+        if tz is not None:
+            index = index.tz_localize("UTC").tz_convert(tz)
+        result = pd.DataFrame(columns, index=index)
+        if previous is not None:
+            first = pd.Timestamp(first[0]) if tz is None \
+                else pd.Timestamp(first[0], tz="UTC").tz_convert(tz)
+            result = pd.concat([previous.df[previous.df.index < first], result])
+        return TimeSeries(result)
+
+    def summation_curve(
+            self,
+            varname: str,
+            reset: str | None = None,
+            hyd_year_begin_month: int = 11,
+            hyd_year_begin_day: int = 1):
+        """Returns the summation curve (cumulative sum) of a column, e.g.
+        of the precipitation. Missing values count as 0. The sum can be
+        restarted every (hydrological) year; the years are taken from
+        the cached calendar arrays.
+
+        Args:
+            varname (str): column name (e.g. "precipitation")
+            reset (str | None, optional): "year" or "hyd_year".
+                Defaults to None (one sum over the whole record).
+            hyd_year_begin_month (int, optional): begin month of the
+                hydrological year. Defaults to 11.
+            hyd_year_begin_day (int, optional): begin day of the
+                hydrological year. Defaults to 1.
+
+        Returns:
+            pd.Series: cumulative sum with "date" as index
+        """
+        match reset:
+            case None:
+                keys = None
+            case "year" | "hyd_year":
+                keys = self.calendar(reset, hyd_year_begin_month, hyd_year_begin_day)
+            case _:
+                raise ValueError(f"Unknown reset {reset}!")
+        values = _summation_curve_values(self.df[varname].to_numpy(dtype=float), keys)
+        return pd.Series(values, index=self.df.index, name=varname)
+
+    def plot_hydrograph(self, varnames: list[str], **kwargs):
+        """Returns (or saves) the hydrograph of the given columns,
+        downsampled to the plot width (see plotting.plot_hydrograph for
+        the arguments)."""
+        return plotting.plot_hydrograph(self, varnames, **kwargs)
+
+    def plot_summation_curve(self, varname: str, reset: str | None = None, **kwargs):
+        """Returns (or saves) the summation curve of a column,
+        downsampled to the plot width (see plotting.plot_summation_curve
+        for the arguments)."""
+        return plotting.plot_summation_curve(self, varname, reset=reset, **kwargs)
+
+    def outlier_bounds(
+            self,
+            method: str = "zscore",
+            threshold: float = 3.0,
+            window: int = 7,
+            columns: list[str] | None = None):
+        """Returns lower and upper bounds of regular values per column.
+        Values outside of the bounds are outliers.
 
-        return hhx, hx, mhx, mx, mnx, nx, nnx
+        zscore: mean -/+ threshold * standard deviation
+        mad: median -/+ threshold * 1.4826 * MAD (median absolute
+            deviation, scaled to the standard deviation of a normal
+            distribution)
+        hampel: rolling median -/+ threshold * 1.4826 * rolling MAD
+            within a centered window of window values (Hampel filter).
+            The MAD of a window is the median of the deviations of its
+            values from the median of the same window.
 
-    def ausreisser(self):
-        solving = "drop_outlier"
+        zscore and mad are vectorized over all columns; hampel takes
+        the medians of all windows of a column at once from a strided
+        window view (see _hampel_center_scale).
+
+        Args:
+            method (str, optional): "zscore", "mad" or "hampel".
+                Defaults to "zscore".
+            threshold (float, optional): number of standard deviations
+                (or scaled MADs). Defaults to 3.0.
+            window (int, optional): window size of "hampel".
+                Defaults to 7.
+            columns (list[str] | None, optional): columns to check.
+                Defaults to None (all numerical columns).
+
+        Returns:
+            pd.Series | pd.DataFrame, pd.Series | pd.DataFrame: lower
+                and upper bounds per column (pd.Series) or per value for
+                "hampel" (pd.DataFrame)
+        """
+        df = self._numerical_columns(columns)
+        match method:
+            case "zscore":
+                center = df.mean()
+                scale = df.std()
+            case "mad":
+                center = pd.Series(np.nan, index=df.columns)
+                scale = pd.Series(np.nan, index=df.columns)
+                for col in df.columns:
+                    values = df[col].dropna().to_numpy()
+                    if len(values) == 0:
+                        continue
+                    nl = NumericalList(values, status=NumericalListStatus.READY)
+                    center[col] = nl.median()
+                    scale[col] = MAD_SCALE*nl.median_absolute_deviaton()
+            case "hampel":
+                center = pd.DataFrame(index=df.index, columns=df.columns, dtype=float)
+                scale = center.copy()
+                for col in df.columns:
+                    center[col], mad = _hampel_center_scale(
+                        df[col].to_numpy(dtype=float), window)
+                    scale[col] = MAD_SCALE*mad
+            case _:
+                raise ValueError(f"Unknown outlier method {method}!")
+
+        return center - threshold*scale, center + threshold*scale
+
+    def outliers(
+            self,
+            method: str = "zscore",
+            threshold: float = 3.0,
+            window: int = 7,
+            columns: list[str] | None = None):
+        """Returns a boolean DataFrame which marks the outliers of the
+        given columns (see outlier_bounds for the arguments)."""
+        df = self._numerical_columns(columns)
+        lower, upper = self.outlier_bounds(method, threshold, window, columns)
+        return (df < lower) | (df > upper)
+
+    def ausreisser(
+            self,
+            method: str = "zscore",
+            solving: str = "drop_outlier",
+            threshold: float = 3.0,
+            window: int = 7,
+            columns: list[str] | None = None):
+        """Returns a TimeSeries with treated outliers (see outlier_bounds
+        for the detection methods).
+
+        Args:
+            method (str, optional): "zscore", "mad" or "hampel".
+                Defaults to "zscore".
+            solving (str, optional): "drop_outlier" replaces outliers by
+                NaN, "cap_outlier" sets them to the exceeded bound.
+                Defaults to "drop_outlier".
+            threshold (float, optional): number of standard deviations
+                (or scaled MADs). Defaults to 3.0.
+            window (int, optional): window size of "hampel".
+                Defaults to 7.
+            columns (list[str] | None, optional): columns to treat.
+                Defaults to None (all numerical columns).
+
+        Returns:
+            TimeSeries: copy of the time series with treated outliers
+        """
+        df = self._numerical_columns(columns)
+        lower, upper = self.outlier_bounds(method, threshold, window, columns)
+        df_new = self.df.copy(deep=True)
         match solving:
             case "drop_outlier":
-                pass
+                df_new[df.columns] = df.mask((df < lower) | (df > upper))
             case "cap_outlier":
-                pass
-        return 0
+                axis = 1 if isinstance(lower, pd.Series) else None
+                df_new[df.columns] = df.clip(lower=lower, upper=upper, axis=axis)
+            case _:
+                raise ValueError(f"Unknown outlier solving {solving}!")
+        return TimeSeries(df_new)
+
+    def _numerical_columns(self, columns: list[str] | None):
+        """Returns the given or all numerical columns as DataFrame."""
+        if columns is None:
+            return self.df.select_dtypes(include="number")
+        return self.df[columns]
 
     def duplicates(self):
         """Returns the number of duplicate dates [int]."""
-        dates = list(self.df.index.values)
-        n_duplicates = len([item for item, count in collections.Counter(dates).items() if count > 1])
-        return n_duplicates
+        index = self.df.index
+        return index[index.duplicated()].nunique()
 
     def missing_days(self):
         """Returns the number of missing days [int]"""
         diff = (self.df.index[-1]-self.df.index[0]).days
         n_missing = (diff+1) - len(self.df)
         return n_missing
+
+    def _sorted_calendar(self):
+        """Returns the dates (int64 nanoseconds), the calendar arrays
+        "year", "month" and "day" in ascending order of the dates and the
+        sort order (None if the index is sorted)."""
+        dates = self.df.index.asi8
+        calendar = {k: self.calendar(k) for k in ["year", "month", "day"]}
+        if self.df.index.is_monotonic_increasing:
+            return dates, calendar, None
+        order = np.argsort(dates, kind="stable")
+        return dates[order], {k: v[order] for k, v in calendar.items()}, order
+
+    def _time_step(self):
+        """Returns the most common time step of the index [int] in
+        nanoseconds."""
+        dates = self.df.index.asi8
+        if not self.df.index.is_monotonic_increasing:
+            dates = np.sort(dates)
+        return _most_common_step(np.diff(dates))
+
+    def consistency(self, freq: str | pd.Timedelta | None = None):
+        """Returns a consistency report of the time series: duplicate
+        dates, gaps of the index and runs of missing values (NaN) per
+        column.
+
+        The index is scanned once in sorted order with vectorized NumPy
+        operations, so sub-daily series and records with millions of
+        rows are supported. Dates of time-zone-aware indexes are
+        reported in UTC.
+
+        Args:
+            freq (str | pd.Timedelta | None, optional): sampling
+                frequency (e.g. "15min"). Defaults to None (inferred as
+                the most common time step).
+
+        Returns:
+            dict: with the keys
+                "frequency" (pd.Timedelta): sampling frequency,
+                "duplicates" (np.ndarray): structured array with the
+                    fields "date" and "count" per duplicate date,
+                "gaps" (np.ndarray): structured array with the fields
+                    "start", "end" (first and last missing date) and
+                    "length" (number of missing time steps) per gap,
+                "nan_runs" (dict[str, np.ndarray]): structured array with
+                    the fields "start", "end" and "length" per run of
+                    missing values for each column
+        """
+        dates = self.df.index.asi8
+        order = None
+        if not self.df.index.is_monotonic_increasing:
+            order = np.argsort(dates, kind="stable")
+            dates = dates[order]
+        steps = np.diff(dates)
+
+        # Duplicates: runs of equal dates
+        starts = np.flatnonzero(np.r_[True, steps != 0])
+        counts = np.diff(np.r_[starts, len(dates)])
+        is_duplicate = counts > 1
+        duplicates = np.empty(is_duplicate.sum(), dtype=[("date", "M8[ns]"), ("count", "i8")])
+        duplicates["date"] = dates[starts[is_duplicate]].view("M8[ns]")
+        duplicates["count"] = counts[is_duplicate]
+
+        # Sampling frequency: most common positive time step
+        if freq is None:
+            step = _most_common_step(steps)
+        else:
+            step = pd.Timedelta(freq).value
+
+        # Gaps: time steps larger than the frequency
+        gaps = np.empty(0, dtype=[("start", "M8[ns]"), ("end", "M8[ns]"), ("length", "i8")])
+        if step > 0:
+            n_missing = np.rint(steps/step).astype(np.int64) - 1
+            i_gap = np.flatnonzero(n_missing >= 1)
+            gaps = np.empty(len(i_gap), dtype=gaps.dtype)
+            gaps["start"] = (dates[i_gap] + step).view("M8[ns]")
+            gaps["end"] = (dates[i_gap + 1] - step).view("M8[ns]")
+            gaps["length"] = n_missing[i_gap]
+
+        # Runs of missing values per column
+        nan_runs = {}
+        for col in self.df.columns:
+            is_nan = self.df[col].isna().to_numpy()
+            if order is not None:
+                is_nan = is_nan[order]
+            edges = np.diff(np.r_[0, is_nan.view(np.int8), 0])
+            run_start = np.flatnonzero(edges == 1)
+            run_end = np.flatnonzero(edges == -1) - 1
+            runs = np.empty(len(run_start), dtype=gaps.dtype)
+            runs["start"] = dates[run_start].view("M8[ns]")
+            runs["end"] = dates[run_end].view("M8[ns]")
+            runs["length"] = run_end - run_start + 1
+            nan_runs[col] = runs
+
+        return {
+            "frequency": pd.Timedelta(step),
+            "duplicates": duplicates,
+            "gaps": gaps,
+            "nan_runs": nan_runs,
+        }
+
+
+# Length of a day in nanoseconds
+DAY = 86_400_000_000_000
+
+
+def _calendar_fields(index: pd.DatetimeIndex):
+    """Returns year, month, day and day of year of the dates
+    [dict[str, np.ndarray]] as int16 arrays."""
+    return {
+        "year": index.year.to_numpy().astype(np.int16),
+        "month": index.month.to_numpy().astype(np.int16),
+        "day": index.day.to_numpy().astype(np.int16),
+        "dayofyear": index.dayofyear.to_numpy().astype(np.int16),
+    }
+
+
+def _hyd_years(
+        year: np.ndarray,
+        month: np.ndarray,
+        day: np.ndarray,
+        hyd_year_begin_month: int,
+        hyd_year_begin_day: int):
+    """Returns the hydrological year [np.ndarray] (int16) of dates given
+    by calendar arrays: the calendar year is incremented for all dates on
+    or after the begin of the hydrological year."""
+    after_begin = (month > hyd_year_begin_month) | (
+        (month == hyd_year_begin_month) & (day >= hyd_year_begin_day))
+    return (year + after_begin).astype(np.int16)
+
+
+def _period_starts(
+        dates: np.ndarray,
+        calendar: dict[str, np.ndarray],
+        freq: str,
+        hyd_year_begin_month: int,
+        hyd_year_begin_day: int):
+    """Returns the start of the period of each date [np.ndarray] as
+    int64 nanoseconds (see TimeSeries.resample for freq).
+
+    Args:
+        dates (np.ndarray): dates as int64 nanoseconds
+        calendar (dict[str, np.ndarray]): arrays "year", "month" and
+            "day" of the dates
+        freq (str): see TimeSeries.resample
+        hyd_year_begin_month (int): begin month of the hydrological year
+        hyd_year_begin_day (int): begin day of the hydrological year
+    """
+    year = calendar["year"].astype(np.int64)
+    match freq:
+        case "day":
+            return dates // DAY * DAY
+        case "month":
+            months = (year - 1970)*12 + calendar["month"] - 1
+            return months.astype("datetime64[M]").astype("datetime64[ns]").view(np.int64)
+        case "year":
+            return (year - 1970).astype("datetime64[Y]").astype("datetime64[ns]").view(np.int64)
+        case "hyd_year":
+            years = _hyd_years(
+                year, calendar["month"], calendar["day"],
+                hyd_year_begin_month, hyd_year_begin_day).astype(np.int64) - 1
+            return _hyd_year_start(years, hyd_year_begin_month, hyd_year_begin_day)
+        case _:
+            length = pd.Timedelta(freq).value
+            return dates // length * length
+
+
+def _local_dates(index: pd.DatetimeIndex):
+    """Returns the local wall time of the dates [np.ndarray] as int64
+    nanoseconds (the dates themselves for a time-zone-naive index)."""
+    if index.tz is None:
+        return index.asi8
+    return index.tz_localize(None).asi8
+
+
+def _localize(dates: np.ndarray, tz):
+    """Returns the UTC dates [np.ndarray] (int64 nanoseconds) of local
+    wall times in the time zone tz. Non-existent times are shifted
+    forward, ambiguous times are taken as the first occurrence."""
+    return pd.DatetimeIndex(dates).tz_localize(
+        tz, ambiguous=np.ones(len(dates), dtype=bool), nonexistent="shift_forward").asi8
+
+
+def _period_ends(starts: np.ndarray, freq: str, hyd_year_begin_day: int):
+    """Returns the end (exclusive) of the periods [np.ndarray] starting
+    at starts (int64 nanoseconds)."""
+    match freq:
+        case "day":
+            return starts + DAY
+        case "month" | "year":
+            unit = "datetime64[M]" if freq == "month" else "datetime64[Y]"
+            return (starts.view("datetime64[ns]").astype(unit) + 1) \
+                .astype("datetime64[ns]").view(np.int64)
+        case "hyd_year":
+            months = (starts - (hyd_year_begin_day - 1)*DAY).view("datetime64[ns]") \
+                .astype("datetime64[M]") + 12
+            return months.astype("datetime64[ns]").view(np.int64) + (hyd_year_begin_day - 1)*DAY
+        case _:
+            return starts + pd.Timedelta(freq).value
+
+
+def _hyd_year_start(years: np.ndarray, begin_month: int, begin_day: int):
+    """Returns the begin of the hydrological years which start in the
+    calendar years [np.ndarray] as int64 nanoseconds."""
+    months = (years - 1970)*12 + begin_month - 1
+    return months.astype("datetime64[M]").astype("datetime64[ns]").view(np.int64) \
+        + (begin_day - 1)*DAY
+
+
+def _aggregate_periods(values: np.ndarray, offsets: np.ndarray, rules: list[str]):
+    """Returns the aggregates [dict[str, np.ndarray]] "count" and the
+    given rules of contiguous periods starting at offsets. Missing values
+    (NaN) are skipped; periods without values are NaN."""
+    if len(offsets) == 0:
+        return {rule: np.zeros(0) for rule in ["count", *rules]}
+    valid = ~np.isnan(values)
+    count = np.add.reduceat(valid.astype(np.int64), offsets)
+    aggregates = {"count": count}
+    empty = count == 0
+    for rule in rules:
+        match rule:
+            case "count":
+                continue
+            case "sum":
+                result = np.add.reduceat(np.where(valid, values, 0.0), offsets)
+            case "mean":
+                result = np.add.reduceat(np.where(valid, values, 0.0), offsets) \
+                    / np.where(empty, 1, count)
+            case "max":
+                result = np.maximum.reduceat(np.where(valid, values, -np.inf), offsets)
+            case "min":
+                result = np.minimum.reduceat(np.where(valid, values, np.inf), offsets)
+            case _:
+                raise ValueError(f"Unknown aggregation rule {rule}!")
+        aggregates[rule] = np.where(empty, np.nan, result)
+    return aggregates
+
+
+def _yearly_aggregates(
+        dates: np.ndarray,
+        calendar: dict[str, np.ndarray],
+        values: np.ndarray,
+        aggr: str,
+        hyd_year_begin_month: int,
+        hyd_year_begin_day: int):
+    """Returns the (hydrological) year, maximum, minimum, sum (0 without
+    values) and number of values per year [dict[str, np.ndarray]] of a
+    sorted series (dates and calendar arrays see _period_starts)."""
+    starts = _period_starts(dates, calendar, aggr, hyd_year_begin_month, hyd_year_begin_day)
+    offsets = np.flatnonzero(np.r_[len(starts) > 0, starts[1:] != starts[:-1]])
+    aggregates = _aggregate_periods(values, offsets, ["max", "min", "sum"])
+    years = starts[offsets].view("datetime64[ns]").astype("datetime64[Y]").astype(np.int64) + 1970
+    return {
+        # hydrological years are named after the calendar year they end in
+        "year": years + (aggr == "hyd_year"),
+        "max": aggregates["max"],
+        "min": aggregates["min"],
+        "sum": np.nan_to_num(aggregates["sum"]),
+        "count": aggregates["count"].astype(np.int64),
+    }
+
+
+def _merge_yearly(old: dict[str, np.ndarray], new: dict[str, np.ndarray]):
+    """Returns the yearly aggregates of a series followed by new data.
+    Only the last year of old and the first year of new can overlap."""
+    if len(new["year"]) == 0:
+        return new if len(old["year"]) == 0 else old
+    if len(old["year"]) == 0 or old["year"][-1] != new["year"][0]:
+        return {k: np.concatenate([old[k], new[k]]) for k in old}
+    shared = {
+        "year": new["year"][:1],
+        "max": np.fmax(old["max"][-1:], new["max"][:1]),
+        "min": np.fmin(old["min"][-1:], new["min"][:1]),
+        "sum": old["sum"][-1:] + new["sum"][:1],
+        "count": old["count"][-1:] + new["count"][:1],
+    }
+    return {k: np.concatenate([old[k][:-1], shared[k], new[k][1:]]) for k in old}
+
+
+def _principal_values_of_yearly(yearly: dict[str, np.ndarray]):
+    """Returns HHX, HX, MHX, MX, MNX, NX, NNX [list[float]] of the
+    yearly aggregates of a whole record."""
+    count = yearly["count"]
+    valid = count > 0
+    if not valid.any():
+        return [np.nan]*7
+    hhx = yearly["max"][valid].max()
+    nnx = yearly["min"][valid].min()
+    return [
+        hhx,
+        hhx,
+        yearly["max"][valid].mean(),
+        (yearly["sum"][valid]/count[valid]).mean(),
+        yearly["min"][valid].mean(),
+        nnx,
+        nnx,
+    ]
+
+
+def _summation_curve_values(values: np.ndarray, keys: np.ndarray | None = None):
+    """Returns the cumulative sum [np.ndarray] of values (missing values
+    count as 0), restarted whenever keys change."""
+    total = np.cumsum(np.nan_to_num(values))
+    if keys is None or len(total) == 0:
+        return total
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    before = np.r_[0.0, total][starts]
+    return total - np.repeat(before, np.diff(np.r_[starts, len(total)]))
+
+
+def _hampel_center_scale(values: np.ndarray, window: int, groups: np.ndarray | None = None):
+    """Returns the median and the MAD [np.ndarray, np.ndarray] of the
+    centered window of window values around each value (Hampel filter,
+    like pandas rolling(window, center=True, min_periods=1)). Missing
+    values and, if groups (e.g. station codes of a sorted long-format
+    frame) are given, values of other groups are left out of a window."""
+    left = window//2
+    right = window - 1 - left
+    windows = np.lib.stride_tricks.sliding_window_view(
+        np.pad(values, (left, right), constant_values=np.nan), window)
+    if groups is not None:
+        group_windows = np.lib.stride_tricks.sliding_window_view(
+            np.pad(groups, (left, right), constant_values=-1), window)
+        windows = np.where(group_windows == groups[:, None], windows, np.nan)
+    with warnings.catch_warnings():
+        # windows without values give NaN
+        warnings.simplefilter("ignore", RuntimeWarning)
+        center = np.nanmedian(windows, axis=1)
+        mad = np.nanmedian(np.abs(windows - center[:, None]), axis=1)
+    return center, mad
+
+
+def _most_common_step(steps: np.ndarray):
+    """Returns the most common positive value [int] of time steps in
+    nanoseconds (0 if there is none)."""
+    values, counts = np.unique(steps[steps > 0], return_counts=True)
+    return values[np.argmax(counts)] if len(values) else 0
+
+
+def _exceedance_runs(
+        values: np.ndarray,
+        threshold: np.ndarray,
+        breaks: np.ndarray | None = None):
+    """Returns the runs of consecutive values above the threshold.
+
+    Args:
+        values (np.ndarray): values (NaN never exceeds)
+        threshold (np.ndarray): threshold per value
+        breaks (np.ndarray | None, optional): boolean array which is
+            True where a new series begins (e.g. a new station), so that
+            no run crosses it. Defaults to None.
+
+    Returns:
+        dict[str, np.ndarray]: positions "start", "end" (included) and
+            "peak" and the "peak_value" and summed "excess" above the
+            threshold per run
+    """
+    above = values > threshold
+    begins = above & ~np.r_[False, above[:-1]]
+    if breaks is not None:
+        begins |= above & breaks
+    ends = above & (~np.r_[above[1:], False] | np.r_[begins[1:], False])
+    start = np.flatnonzero(begins)
+    end = np.flatnonzero(ends)
+    lengths = end - start + 1
+
+    run_values = values[above]
+    offsets = np.r_[0, np.cumsum(lengths)[:-1]].astype(np.int64)
+    if len(start) == 0:
+        empty = np.empty(0)
+        return {"start": start, "end": end, "peak": start,
+                "peak_value": empty, "excess": empty}
+    peak_value = np.maximum.reduceat(run_values, offsets)
+    excess = np.add.reduceat(run_values - threshold[above], offsets)
+
+    # first position of the peak within each run
+    run_id = np.repeat(np.arange(len(start)), lengths)
+    is_peak = np.flatnonzero(run_values == np.repeat(peak_value, lengths))
+    _, first = np.unique(run_id[is_peak], return_index=True)
+    peak = np.flatnonzero(above)[is_peak[first]]
+
+    return {"start": start, "end": end, "peak": peak,
+            "peak_value": peak_value, "excess": excess}
+
+
+def _partial_series_frame(
+        index: pd.DatetimeIndex,
+        runs: dict[str, np.ndarray],
+        step: pd.Timedelta):
+    """Returns the partial series table of exceedance runs."""
+    return pd.DataFrame({
+        "start": index[runs["start"]],
+        "end": index[runs["end"]],
+        "peak_date": index[runs["peak"]],
+        "peak": runs["peak_value"],
+        "duration": (runs["end"] - runs["start"] + 1)*step,
+        "volume": runs["excess"]*step.total_seconds(),
+    })
+
+
+def iter_independent_events(
+        chunks,
+        varname: str,
+        threshold: float,
+        min_inter_event_time: str | pd.Timedelta,
+        recession_ratio: float | None = None):
+    """Yields the independent events (see TimeSeries.independent_events)
+    of a time series given as consecutive TimeSeries chunks (e.g. from
+    reader.iter_timeseries).
+
+    Only the last event of a chunk can be merged with runs of the next
+    chunk, so all other events are yielded right away and the values
+    from the begin of the last event are carried into the next chunk.
+
+    Args:
+        chunks (Iterable[TimeSeries]): consecutive, sorted chunks
+        varname (str): column name (e.g. "precipitation")
+        threshold (float): values above the threshold belong to an event
+        min_inter_event_time (str | pd.Timedelta): minimum time between
+            two events
+        recession_ratio (float | None, optional): see
+            TimeSeries.independent_events. Defaults to None.
+
+    Yields:
+        pd.DataFrame: events completed within a chunk
+    """
+    mit = pd.Timedelta(min_inter_event_time).value
+    carry = None
+    for ts in chunks:
+        df = ts.df[[varname]]
+        if carry is not None:
+            df = pd.concat([carry, df])
+        events = _separate_events(
+            df.index.asi8, df[varname].to_numpy(dtype=float), threshold, mit, recession_ratio)
+        step = pd.Timedelta(TimeSeries(df)._time_step())
+        table = _event_frame(df.index, events, step)
+        if len(table) == 0:
+            carry = None
+            continue
+        carry = df.iloc[events["start"][-1]:]
+        if len(table) > 1:
+            yield table.iloc[:-1]
+    if carry is not None:
+        events = _separate_events(
+            carry.index.asi8, carry[varname].to_numpy(dtype=float), threshold, mit, recession_ratio)
+        yield _event_frame(carry.index, events, pd.Timedelta(TimeSeries(carry)._time_step()))
+
+
+def _separate_events(
+        dates: np.ndarray,
+        values: np.ndarray,
+        threshold: float,
+        min_inter_event_time: int,
+        recession_ratio: float | None):
+    """Returns the independent events of exceedance runs.
+
+    Args:
+        dates (np.ndarray): sorted dates in nanoseconds
+        values (np.ndarray): values
+        threshold (float): threshold
+        min_inter_event_time (int): minimum time between two events in
+            nanoseconds
+        recession_ratio (float | None): see TimeSeries.independent_events
+
+    Returns:
+        dict[str, np.ndarray]: positions "start", "end" and "peak", the
+            "peak_value", the summed "excess" above the threshold and
+            the "total" of all values per event
+    """
+    runs = _exceedance_runs(values, np.full(len(values), threshold))
+    n_runs = len(runs["start"])
+    if n_runs == 0:
+        empty = np.empty(0)
+        return {**runs, "total": empty}
+
+    # Compare each run with the next one only
+    gap = dates[runs["start"][1:]] - dates[runs["end"][:-1]]
+    merge = gap < min_inter_event_time
+    if recession_ratio is not None and n_runs > 1:
+        # lowest value between consecutive runs (NaN is ignored)
+        bounds = np.column_stack([runs["end"][:-1] + 1, runs["start"][1:]]).ravel()
+        trough = np.fmin.reduceat(values, bounds)[::2]
+        trough = np.where(np.isnan(trough), -np.inf, trough)
+        smaller_peak = np.minimum(runs["peak_value"][:-1], runs["peak_value"][1:])
+        merge |= trough >= recession_ratio*smaller_peak
+
+    first = np.flatnonzero(np.r_[True, ~merge])
+    last = np.r_[first[1:] - 1, n_runs - 1]
+    peak_value = np.maximum.reduceat(runs["peak_value"], first)
+    lengths = last - first + 1
+    is_peak = np.flatnonzero(runs["peak_value"] == np.repeat(peak_value, lengths))
+    run_event = np.repeat(np.arange(len(first)), lengths)
+    _, first_peak = np.unique(run_event[is_peak], return_index=True)
+
+    start = runs["start"][first]
+    end = runs["end"][last]
+    cumulative = np.r_[0, np.cumsum(np.nan_to_num(values))]
+    return {
+        "start": start,
+        "end": end,
+        "peak": runs["peak"][is_peak[first_peak]],
+        "peak_value": peak_value,
+        "excess": np.add.reduceat(runs["excess"], first),
+        "total": cumulative[end + 1] - cumulative[start],
+    }
+
+
+def _event_frame(
+        index: pd.DatetimeIndex,
+        events: dict[str, np.ndarray],
+        step: pd.Timedelta):
+    """Returns the event table of separated events."""
+    table = _partial_series_frame(index, events, step)
+    table["total"] = events["total"]
+    return table[["start", "peak_date", "end", "peak", "duration", "volume", "total"]]
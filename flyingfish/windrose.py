@@ -0,0 +1,124 @@
+import numpy as np
+import pandas as pd
+
+from flyingfish import plotting
+
+
+class WindRose:
+
+    def __init__(
+            self,
+            n_sectors: int = 16,
+            speed_bins: list[float] = [0.5, 2, 4, 6, 8, 10, np.inf]):
+        """Constructor
+
+        Accumulates the joint frequencies of wind direction sectors and
+        speed classes chunk by chunk (e.g. years of 10-minute values read
+        with reader.iter_timeseries) without keeping the values. Partial
+        wind roses, e.g. of several masts or of chunks processed in
+        parallel, can be combined with merge(). Rendering only needs the
+        accumulated counts (see plot).
+
+        Args:
+            n_sectors (int, optional): number of direction sectors, the
+                first one centered on north (0 degree). Defaults to 16.
+            speed_bins (list[float], optional): edges of the speed
+                classes. Speeds below the first edge are counted as calm.
+                A finite last edge gets an open class above it, so every
+                valid value is counted. Defaults to
+                [0.5, 2, 4, 6, 8, 10, np.inf].
+        """
+        if n_sectors < 1:
+            raise ValueError("n_sectors must be positive!")
+        self.n_sectors: int = n_sectors
+        self.speed_bins: np.ndarray = np.asarray(speed_bins, dtype=float)
+        if len(self.speed_bins) < 2 or (np.diff(self.speed_bins) <= 0).any():
+            raise ValueError("speed_bins must be at least two increasing edges!")
+        if np.isfinite(self.speed_bins[-1]):
+            self.speed_bins = np.r_[self.speed_bins, np.inf]
+        self.counts: np.ndarray = np.zeros((n_sectors, len(self.speed_bins) - 1), dtype=np.int64)
+        self.n_calm: int = 0
+        self.n_missing: int = 0
+
+    @classmethod
+    def from_timeseries(
+            cls,
+            ts,
+            direction_col: str = "wind_direction",
+            speed_col: str = "wind_speed",
+            **kwargs):
+        """Returns the WindRose of the direction and speed columns of a
+        TimeSeries (further arguments see constructor)."""
+        return cls(**kwargs).update(ts.df[direction_col], ts.df[speed_col])
+
+    def update(self, directions: np.ndarray, speeds: np.ndarray):
+        """Adds a chunk of wind directions (degree, clockwise from north)
+        and speeds and returns the wind rose.
+
+        All values of the chunk are binned in one 2-D histogram. The
+        directions are shifted by half a sector, so that the sector
+        around north covers both sides of 0 degree.
+        """
+        directions = np.asarray(directions, dtype=np.float64).ravel()
+        speeds = np.asarray(speeds, dtype=np.float64).ravel()
+        if len(directions) != len(speeds):
+            raise ValueError("directions and speeds must have the same length!")
+        valid = ~(np.isnan(directions) | np.isnan(speeds))
+        self.n_missing += int(len(valid) - np.count_nonzero(valid))
+        directions, speeds = directions[valid], speeds[valid]
+
+        calm = speeds < self.speed_bins[0]
+        self.n_calm += int(np.count_nonzero(calm))
+        width = 360/self.n_sectors
+        shifted = (directions[~calm] + width/2) % 360
+        counts, _, _ = np.histogram2d(
+            shifted, speeds[~calm],
+            bins=[np.linspace(0, 360, self.n_sectors + 1), self.speed_bins])
+        self.counts += counts.astype(np.int64)
+        return self
+
+    def merge(self, other: "WindRose"):
+        """Merges another wind rose with the same sectors and speed
+        classes into this one and returns it."""
+        if other.n_sectors != self.n_sectors \
+                or not np.array_equal(other.speed_bins, self.speed_bins):
+            raise ValueError("Wind roses with different bins can not be merged!")
+        self.counts += other.counts
+        self.n_calm += other.n_calm
+        self.n_missing += other.n_missing
+        return self
+
+    @property
+    def n(self):
+        """Number of valid observations (including calms) [int]."""
+        return int(self.counts.sum()) + self.n_calm
+
+    def sectors(self):
+        """Returns the center of each sector in degree [np.ndarray]."""
+        return np.arange(self.n_sectors)*360/self.n_sectors
+
+    def speed_labels(self):
+        """Returns the labels of the speed classes [list[str]]."""
+        edges = self.speed_bins
+        return [f">= {lo:g}" if np.isinf(hi) else f"{lo:g}-{hi:g}"
+                for lo, hi in zip(edges[:-1], edges[1:])]
+
+    def frequencies(self, percent: bool = True):
+        """Returns the frequencies of the sectors and speed classes
+        [pd.DataFrame] (index "sector": center in degree, one column per
+        speed class), as percentage of all valid observations including
+        calms or as counts."""
+        values = self.counts*100/max(self.n, 1) if percent else self.counts
+        return pd.DataFrame(
+            values, columns=self.speed_labels(),
+            index=pd.Index(self.sectors(), name="sector"))
+
+    def calm_frequency(self, percent: bool = True):
+        """Returns the frequency of calms [float] as percentage of all
+        valid observations or as count."""
+        return self.n_calm*100/max(self.n, 1) if percent else self.n_calm
+
+    def plot(self, **kwargs):
+        """Returns (or saves) the wind rose plot (see
+        plotting.plot_wind_rose for the arguments)."""
+        return plotting.plot_wind_rose(self, **kwargs)
@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from flyingfish.numericallist import NumericalList, Status
+from flyingfish.timeseries import TimeSeries
+from flyingfish.empiricaldistribution import EmpiricalDistribution
+
+
+def test_plotting_positions_weibull():
+    ed = EmpiricalDistribution(NumericalList(input=[3, 1, 2], status=Status.READY))
+    assert [1.0, 2.0, 3.0] == ed.values.tolist()
+    assert [0.25, 0.5, 0.75] == ed.probabilities.tolist()
+
+
+def test_plotting_positions_gringorten():
+    ed = EmpiricalDistribution(
+        NumericalList(input=[3, 1, 2], status=Status.READY), plotting_position="gringorten")
+    assert pytest.approx([0.56/3.12, 1.56/3.12, 2.56/3.12]) == ed.probabilities.tolist()
+
+
+def test_cdf_quantile():
+    ed = EmpiricalDistribution(NumericalList(input=[1, 2, 3], status=Status.READY))
+    assert [0.0, 0.25, 0.375, 0.75, 1.0] == ed.cdf(np.array([0.5, 1.0, 1.5, 3.0, 4.0])).tolist()
+    assert [1.0, 1.5, 3.0] == ed.quantile(np.array([0.1, 0.375, 0.9])).tolist()
+
+
+def test_duration_curve():
+    ed = EmpiricalDistribution(NumericalList(input=[1, 3, 2], status=Status.READY))
+    test = ed.duration_curve()
+    assert [3.0, 2.0, 1.0] == test["value"].tolist()
+    assert [0.25, 0.5, 0.75] == test["exceedance_probability"].tolist()
+
+
+def test_flow_duration_curve_per_year():
+    df = pd.DataFrame({
+            "date": pd.to_datetime([
+                "2000-01-01", "2000-06-01", "2000-12-01", "2001-01-01", "2001-02-01"]),
+            "discharge": [1.0, 3.0, 2.0, 5.0, np.nan]
+            }).set_index("date")
+    test = TimeSeries(df).flow_duration_curve("discharge")
+
+    assert [2000, 2000, 2000, 2001] == test["year"].tolist()
+    assert [1, 2, 3, 1] == test["rank"].tolist()
+    assert [3.0, 2.0, 1.0, 5.0] == test["value"].tolist()
+    assert [0.25, 0.5, 0.75, 0.5] == test["exceedance_probability"].tolist()
+
+    ref = EmpiricalDistribution.from_timeseries(TimeSeries(df.loc["2000"]), "discharge")
+    assert ref.duration_curve()["exceedance_probability"].tolist() \
+        == test.loc[test["year"] == 2000, "exceedance_probability"].tolist()
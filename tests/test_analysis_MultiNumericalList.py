@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from flyingfish.numericallist import Status
+from flyingfish.multinumericallist import MultiNumericalList
+
+
+def _frame(with_nan: bool):
+    rng = np.random.default_rng(7)
+    base = rng.normal(size=(200, 1))
+    df = pd.DataFrame(base + rng.normal(size=(200, 9)), columns=[f"s{i}" for i in range(9)])
+    if with_nan:
+        df = df.mask(rng.random(df.shape) < 0.1)
+    return df
+
+
+def test_covariance():
+    df = _frame(with_nan=False)
+    mnl = MultiNumericalList(df, status=Status.READY)
+    np.testing.assert_allclose(df.cov().to_numpy(), mnl.covariance())
+    np.testing.assert_allclose(df.cov(ddof=0).to_numpy(), mnl.covariance(biased=True))
+    assert list(df.columns) == mnl.names
+
+
+@pytest.mark.parametrize("with_nan", [False, True])
+def test_covariance_pairwise_complete(with_nan):
+    df = _frame(with_nan)
+    mnl = MultiNumericalList(df, status=Status.READY)
+    np.testing.assert_allclose(df.cov().to_numpy(), mnl.covariance())
+
+
+@pytest.mark.parametrize("with_nan", [False, True])
+def test_correlation_pearson(with_nan):
+    df = _frame(with_nan)
+    mnl = MultiNumericalList(df, status=Status.READY)
+    np.testing.assert_allclose(df.corr().to_numpy(), mnl.correlation())
+
+
+def test_correlation_spearman():
+    df = _frame(with_nan=False)
+    mnl = MultiNumericalList(df, status=Status.READY)
+    np.testing.assert_allclose(df.corr(method="spearman").to_numpy(), mnl.correlation("spearman"))
+
+
+def test_blocked_out_of_core(tmp_path):
+    df = _frame(with_nan=True)
+    mnl = MultiNumericalList(df, status=Status.READY)
+    path = str(tmp_path / "corr.npy")
+    test = mnl.correlation(block_size=4, out=path)
+    np.testing.assert_allclose(mnl.correlation(), np.load(path))
+    np.testing.assert_allclose(mnl.correlation(), test)
+    np.testing.assert_allclose(mnl.covariance(), mnl.covariance(max_memory=60_000))
+
+
+def test_memory_mapped_input(tmp_path):
+    df = _frame(with_nan=True)
+    path = str(tmp_path / "data.npy")
+    np.save(path, df.to_numpy())
+    data = np.load(path, mmap_mode="r")
+    mnl = MultiNumericalList(data, status=Status.READY)
+    assert np.shares_memory(data, mnl.data)
+    np.testing.assert_allclose(df.cov().to_numpy(), mnl.covariance(block_size=2))
@@ -1,8 +1,40 @@
+import numpy as np
+import pandas as pd
+import pytest
 import scipy
 
 from flyingfish.numericallist import NumericalList, Status
 
 
+# -------------------------------------------------------------------------
+# storage
+# -------------------------------------------------------------------------
+
+def test_array_input_zero_copy():
+    values = np.array([1.0, 2.0, 3.0])
+    bs = NumericalList(input=values, status=Status.READY)
+    assert np.shares_memory(bs.data, values)
+    assert not bs.data.flags.writeable
+
+
+def test_series_input_zero_copy():
+    values = pd.Series([1.0, 2.0, 3.0])
+    bs = NumericalList(input=values, status=Status.READY)
+    assert np.shares_memory(bs.data, values.to_numpy())
+    assert 2.0 == bs.arithmetic_mean()
+
+
+def test_float32_input():
+    bs = NumericalList(input=[1, 2, 3], status=Status.READY, dtype=np.float32)
+    assert np.float32 == bs.data.dtype
+    assert 2/3 == pytest.approx(bs.variance(biased=True))
+
+
+def test_two_dimensional_input():
+    with pytest.raises(ValueError):
+        NumericalList(input=[[1, 2], [3, 4]], status=Status.READY)
+
+
 # -------------------------------------------------------------------------
 # estimates of location
 # -------------------------------------------------------------------------
@@ -15,6 +47,7 @@ def test_arithmetic_mean():
 def test_weighted_mean():
     bs = NumericalList(input=[1, 2, 3], status=Status.READY)
     assert 2.0 == bs.weighted_arithmetic_mean(weights=[2, 2, 2])
+    assert 2.5 == bs.weighted_arithmetic_mean(weights=[0.0, 0.5, 0.5])
 
 
 def test_trimmed_mean():
@@ -57,6 +90,24 @@ def test_weighted_median_odd():
     assert 3.0 == bs.weighted_median(weights=[1, 1, 3])
 
 
+def test_weighted_median_non_integer_weights():
+    bs = NumericalList(input=[3, 1, 2], status=Status.READY)
+    assert 2.0 == bs.weighted_median(weights=[0.5, 0.25, 1.75])
+    assert 2.5 == bs.weighted_median(weights=[0.5, 0.25, 0.25])
+
+
+def test_weighted_median_large_weights():
+    bs = NumericalList(input=[1, 2, 3], status=Status.READY)
+    assert 2.0 == bs.weighted_median(weights=[1e6, 2, 1e6-1])
+    assert 2.0 == bs.weighted_median(weights=[1.5e6, 0.25, 1.5e6-0.1])
+
+
+def test_weighted_percentile_multiple():
+    bs = NumericalList(input=[1, 2, 3, 4], status=Status.READY)
+    test = bs.weighted_percentile(per=[10, 50, 90], weights=[1, 1, 1, 1])
+    assert [1.0, 2.5, 4.0] == test.tolist()
+
+
 def test_percentile():
     bs = NumericalList(input=range(1, 12, 1), status=Status.READY)
     test = bs.percentile(per=50)
@@ -175,3 +226,59 @@ def test_mode_single():
 def test_mode_multiple():
     bs = NumericalList(input=[1, 2, 3], status=Status.READY)
     assert [1, 2, 3] == bs.mode()
+
+
+def test_moments_cache_invalidated():
+    bs = NumericalList(input=[1, 2, 3], status=Status.READY)
+    assert (2.0, 2/3, 0.0, 2/3) == bs.moments()
+    bs.data = [2, 4, 6]
+    assert 4.0 == bs.arithmetic_mean()
+    assert 8/3 == bs.variance(biased=True)
+
+
+# -------------------------------------------------------------------------
+# summary
+# -------------------------------------------------------------------------
+
+def test_describe():
+    data = [1, 5, 5, 1, 2, 8, 3]
+    bs = NumericalList(input=data, status=Status.READY)
+    test = bs.describe(biased=False)
+    ref = NumericalList(input=data, status=Status.READY)
+    assert test["arithmetic_mean"] == ref.arithmetic_mean()
+    assert test["median"] == ref.median()
+    assert test["iqr"] == ref.iqr()
+    assert test["variance"] == ref.variance(biased=False)
+    assert round(test["coefficient_of_skewness"], 4) == \
+        round(ref.coefficient_of_skewness(biased=False), 4)
+    assert round(test["coefficient_of_kurtosis"], 4) == \
+        round(ref.coefficient_of_kurtosis(biased=False), 4)
+    assert [1.0, 5.0] == test["mode"]
+
+
+def test_describe_with_zero():
+    bs = NumericalList(input=[0, 1, 2, 4], status=Status.READY)
+    test = bs.describe()
+    assert bs.harmonic_mean() == test["harmonic_mean"] == 0.0
+    assert np.isnan(test["geometric_mean"])
+
+
+# -------------------------------------------------------------------------
+# sorted view
+# -------------------------------------------------------------------------
+
+def test_sorted_cache_invalidated():
+    bs = NumericalList(input=[3, 1, 2], status=Status.READY)
+    assert [1.0, 2.0, 3.0] == bs.sorted().tolist()
+    assert bs.sorted() is bs.sorted()
+    bs.data = [5, 4]
+    assert [4.0, 5.0] == bs.sorted().tolist()
+    assert 4.5 == bs.median()
+
+
+def test_percentile_selection_equals_sorted():
+    bs = NumericalList(input=[9, 1, 7, 3, 5, 2, 8], status=Status.READY)
+    selected = [bs.percentile(per=p) for p in [0, 25, 50, 75, 90]]
+    bs.sorted()
+    assert selected == [bs.percentile(per=p) for p in [0, 25, 50, 75, 90]]
+    assert 6.0 == bs.iqr()
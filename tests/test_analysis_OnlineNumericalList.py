@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+from flyingfish.numericallist import NumericalList, Status
+from flyingfish.onlinenumericallist import OnlineNumericalList
+
+
+def _data():
+    rng = np.random.default_rng(3)
+    return np.concatenate([rng.gamma(2.0, 10.0, 5000), -rng.gamma(1.0, 1.0, 500), [0.0]*10])
+
+
+def test_moments_equal_numericallist():
+    data = _data()
+    ref = NumericalList(input=data, status=Status.READY)
+    test = OnlineNumericalList()
+    for chunk in np.array_split(data, 7):
+        test.update(chunk)
+
+    assert test.n == ref.n
+    assert test.arithmetic_mean() == pytest.approx(ref.arithmetic_mean())
+    assert test.range() == ref.range()
+    for biased in [True, False]:
+        assert test.variance(biased=biased) == pytest.approx(ref.variance(biased=biased))
+        assert test.stdev(biased=biased) == pytest.approx(ref.stdev(biased=biased))
+        assert test.coefficient_of_skewness(biased=biased) == \
+            pytest.approx(ref.coefficient_of_skewness(biased=biased))
+        assert test.coefficient_of_kurtosis(biased=biased) == \
+            pytest.approx(ref.coefficient_of_kurtosis(biased=biased))
+
+
+def test_merge_equals_single_accumulator():
+    data = _data()
+    single = OnlineNumericalList().update(data)
+    parts = [OnlineNumericalList().update(chunk) for chunk in np.array_split(data, 4)]
+    merged = parts[0]
+    for part in parts[1:]:
+        merged.merge(part)
+
+    assert merged.moments() == pytest.approx(single.moments())
+    assert merged.median() == single.median()
+
+
+def test_quantiles_within_relative_accuracy():
+    data = _data()
+    ref = NumericalList(input=data, status=Status.READY)
+    test = OnlineNumericalList(relative_accuracy=0.01).update(data)
+
+    assert test.median() == pytest.approx(ref.median(), rel=0.01)
+    for per in [1, 5, 25, 75, 95, 99]:
+        assert test.percentile(per=per) == pytest.approx(ref.percentile(per=per), rel=0.01)
+    q25, q75 = ref.percentile(per=25), ref.percentile(per=75)
+    assert abs(test.iqr() - ref.iqr()) <= 0.01*(abs(q25) + abs(q75))
+
+
+def test_positive_means():
+    data = [1, 2, 3]
+    ref = NumericalList(input=data, status=Status.READY)
+    test = OnlineNumericalList().update(data)
+    assert test.geometric_mean() == pytest.approx(ref.geometric_mean())
+    assert test.harmonic_mean() == pytest.approx(ref.harmonic_mean())
@@ -1,8 +1,10 @@
 import pandas as pd
+import numpy as np
 import datetime
-from pandas.testing import assert_frame_equal
+import pytest
+from pandas.testing import assert_frame_equal, assert_index_equal
 
-from flyingfish.timeseries import TimeSeries
+from flyingfish.timeseries import TimeSeries, iter_independent_events
 
 
 def test_subset_timeframe():
@@ -57,6 +59,50 @@ def test_subset_period():
     assert_frame_equal(test.df, df_ref)
 
 
+def test_subset_view_and_copy():
+
+    # create test df
+    df = pd.DataFrame({
+            "date": pd.date_range("2000-01-01", "2000-12-31", freq="D"),
+            "discharge": np.arange(366.0)
+            }).set_index("date")
+
+    ts = TimeSeries(df=df)
+    view = ts.subset_timeframe(
+            date_start=datetime.datetime(2000, 3, 1),
+            date_end=datetime.datetime(2000, 4, 30))
+    copy = ts.subset_timeframe(
+            date_start=datetime.datetime(2000, 3, 1),
+            date_end=datetime.datetime(2000, 4, 30),
+            copy=True)
+
+    assert np.shares_memory(view.df["discharge"].to_numpy(), df["discharge"].to_numpy())
+    assert not np.shares_memory(copy.df["discharge"].to_numpy(), df["discharge"].to_numpy())
+    assert_frame_equal(view.df, copy.df)
+
+
+def test_subset_fused():
+
+    # create test df
+    df = pd.DataFrame({
+            "date": pd.date_range("2000-01-01", "2001-12-31", freq="D"),
+            "discharge": np.arange(731.0)
+            }).set_index("date")
+
+    ts = TimeSeries(df=df)
+    test = ts.subset(
+            date_start=datetime.datetime(2000, 6, 15),
+            date_end=datetime.datetime(2001, 2, 10),
+            months=[12, 1, 2])
+    ref = ts.subset_timeframe(
+            date_start=datetime.datetime(2000, 6, 15),
+            date_end=datetime.datetime(2001, 2, 10)).subset_period(months=[12, 1, 2])
+
+    assert_frame_equal(test.df, ref.df)
+    assert pd.Timestamp(2000, 12, 1) == test.df.index[0]
+    assert pd.Timestamp(2001, 2, 10) == test.df.index[-1]
+
+
 def test_hyd_year():
 
     # create test df
@@ -141,6 +187,43 @@ def test_principal_values_no_given_aggr_col_name():
     assert tuple_test == tuple_ref
 
 
+def test_principal_values_table():
+
+    # create test df
+    df = pd.DataFrame({
+            "date": [
+                datetime.datetime(1999, 12, 1),
+                datetime.datetime(2000, 1, 2),
+                datetime.datetime(2001, 1, 1),
+                datetime.datetime(2001, 1, 2),
+                datetime.datetime(2001, 3, 3),
+                datetime.datetime(2010, 1, 2)],
+            "discharge": [1, 2, 3, 4, 5, 6],
+            "water_level": [10, 20, 30, 40, 50, 60]
+            }).set_index("date")
+
+    ts = TimeSeries(df)
+    test = ts.principal_values_table(
+        date_start=datetime.datetime(1999, 1, 1),
+        date_end=datetime.datetime(2002, 1, 1),
+        varnames=["discharge", "water_level"],
+        months=[12, 1, 2])
+
+    # create reference df
+    df_ref = pd.DataFrame({
+            "variable": ["discharge", "water_level"],
+            "HHX": [6.0, 60.0],
+            "HX": [4.0, 40.0],
+            "MHX": [2.33, 23.33],
+            "MX": [2.17, 21.67],
+            "MNX": [2.0, 20.0],
+            "NX": [1.0, 10.0],
+            "NNX": [1.0, 10.0]
+            }).set_index("variable")
+
+    assert_frame_equal(test, df_ref)
+
+
 def test_duplicates():
     df = pd.DataFrame({
             "date": [
@@ -192,3 +275,397 @@ def test_missing_days_2():
     ts = TimeSeries(df)
     
     assert 2 == ts.missing_days()
+
+
+def test_hyd_year_subdaily_tz_aware():
+
+    # create test df
+    df = pd.DataFrame({
+            "date": pd.to_datetime([
+                "2000-10-31 23:00",
+                "2000-11-01 00:00",
+                "2000-11-01 06:00",
+                "2001-05-01 12:00"]).tz_localize("Europe/Berlin"),
+            "discharge": [1, 2, 3, 4]
+            }).set_index("date")
+
+    ts = TimeSeries(df=df)
+    test = ts.hyd_year(hyd_year_begin_month=11, hyd_year_begin_day=1)
+
+    assert [2000, 2001, 2001, 2001] == test.df["hyd_year"].tolist()
+
+
+def test_hyd_year_no_copy():
+
+    # create test df
+    df = pd.DataFrame({
+            "date": [
+                datetime.datetime(2000, 5, 14),
+                datetime.datetime(2000, 5, 15)],
+            "discharge": [1, 2]
+            }).set_index("date")
+
+    ts = TimeSeries(df=df)
+    test = ts.hyd_year(hyd_year_begin_month=5, hyd_year_begin_day=15, copy=False)
+
+    assert test.df is df
+    assert [2000, 2001] == df["hyd_year"].tolist()
+
+
+def test_consistency():
+    df = pd.DataFrame({
+            "date": pd.to_datetime([
+                "2000-01-01 00:00",
+                "2000-01-01 01:00",
+                "2000-01-01 01:00",
+                "2000-01-01 02:00",
+                "2000-01-01 05:00",
+                "2000-01-01 06:00",
+                "2000-01-01 07:00"]),
+            "discharge": [1, np.nan, np.nan, 3, np.nan, 4, np.nan]
+            }).set_index("date")
+    ts = TimeSeries(df)
+    report = ts.consistency()
+
+    assert pd.Timedelta(hours=1) == report["frequency"]
+    duplicates = report["duplicates"]
+    assert [pd.Timestamp("2000-01-01 01:00")] == list(pd.to_datetime(duplicates["date"]))
+    assert [2] == duplicates["count"].tolist()
+
+    gaps = report["gaps"]
+    assert [pd.Timestamp("2000-01-01 03:00")] == list(pd.to_datetime(gaps["start"]))
+    assert [pd.Timestamp("2000-01-01 04:00")] == list(pd.to_datetime(gaps["end"]))
+    assert [2] == gaps["length"].tolist()
+
+    nan_runs = report["nan_runs"]["discharge"]
+    assert list(pd.to_datetime(["2000-01-01 01:00", "2000-01-01 05:00", "2000-01-01 07:00"])) \
+        == list(pd.to_datetime(nan_runs["start"]))
+    assert list(nan_runs["start"]) == list(nan_runs["end"])
+    assert [2, 1, 1] == nan_runs["length"].tolist()
+
+
+def _series_with_outliers():
+    values = np.sin(np.arange(30.0))
+    values[10] = 50.0
+    values[20] = -40.0
+    return pd.DataFrame({
+            "date": pd.date_range("2000-01-01", periods=30, freq="D"),
+            "discharge": values
+            }).set_index("date")
+
+
+def test_outliers():
+    ts = TimeSeries(_series_with_outliers())
+    for method in ["zscore", "mad", "hampel"]:
+        test = ts.outliers(method=method, threshold=3.0)
+        assert [10, 20] == np.flatnonzero(test["discharge"]).tolist()
+
+
+def _hampel_reference(values: np.ndarray, window: int, threshold: float):
+    left, right = window//2, window - 1 - window//2
+    lower, upper = [], []
+    for i in range(len(values)):
+        win = values[max(0, i - left):i + right + 1]
+        win = win[~np.isnan(win)]
+        median = np.median(win)
+        scale = 1.4826*np.median(np.abs(win - median))
+        lower.append(median - threshold*scale)
+        upper.append(median + threshold*scale)
+    return np.array(lower), np.array(upper)
+
+
+@pytest.mark.parametrize("window", [7, 6])
+def test_outlier_bounds_hampel_reference(window):
+    rng = np.random.default_rng(1)
+    values = rng.normal(size=500)
+    values[[3, 250]] = np.nan
+    df = pd.DataFrame({"discharge": values}, index=pd.date_range(
+        "2000-01-01", periods=500, freq="D", name="date"))
+    lower, upper = TimeSeries(df).outlier_bounds(method="hampel", threshold=3.0, window=window)
+    ref_lower, ref_upper = _hampel_reference(values, window, 3.0)
+
+    np.testing.assert_allclose(ref_lower, lower["discharge"])
+    np.testing.assert_allclose(ref_upper, upper["discharge"])
+
+
+def test_ausreisser_drop_outlier():
+    df = _series_with_outliers()
+    ts = TimeSeries(df)
+    test = ts.ausreisser(method="mad", solving="drop_outlier")
+    assert [10, 20] == np.flatnonzero(test.df["discharge"].isna()).tolist()
+    assert 50.0 == df["discharge"].iloc[10]
+
+
+def test_ausreisser_cap_outlier():
+    ts = TimeSeries(_series_with_outliers())
+    lower, upper = ts.outlier_bounds(method="mad", threshold=3.0)
+    test = ts.ausreisser(method="mad", solving="cap_outlier", threshold=3.0)
+    assert upper["discharge"] == test.df["discharge"].iloc[10]
+    assert lower["discharge"] == test.df["discharge"].iloc[20]
+
+
+def test_partial_series():
+    df = pd.DataFrame({
+            "date": pd.date_range("2000-01-01", periods=12, freq="H"),
+            "discharge": [0, 5, 6, 2, 7, np.nan, 8, 9, 9, 1, 0, 10]
+            }).set_index("date")
+    ts = TimeSeries(df)
+    test = ts.partial_series("discharge", threshold=4.0)
+
+    assert [1, 4, 6, 11] == [df.index.get_loc(x) for x in test["start"]]
+    assert [2, 4, 8, 11] == [df.index.get_loc(x) for x in test["end"]]
+    assert [2, 4, 7, 11] == [df.index.get_loc(x) for x in test["peak_date"]]
+    assert [6.0, 7.0, 9.0, 10.0] == test["peak"].tolist()
+    assert [2, 1, 3, 1] == (test["duration"]/pd.Timedelta(hours=1)).tolist()
+    assert [3*3600, 3*3600, 14*3600, 6*3600] == test["volume"].tolist()
+
+
+def test_partial_series_percentile():
+    df = pd.DataFrame({
+            "date": pd.date_range("2000-01-01", periods=5, freq="D"),
+            "discharge": [1, 5, 2, 4, 3]
+            }).set_index("date")
+    ts = TimeSeries(df)
+    test = ts.partial_series("discharge", per=60)
+
+    assert [5.0] == test["peak"].tolist()
+
+
+def _event_series():
+    return pd.DataFrame({
+            "date": pd.date_range("2000-01-01", periods=14, freq="H"),
+            "discharge": [0, 5, 6, 2, 7, 0, 0, 0, 0, 9, 3, 4, 9, 0]
+            }).set_index("date")
+
+
+def test_independent_events_min_inter_event_time():
+    df = _event_series()
+    ts = TimeSeries(df)
+    test = ts.independent_events("discharge", threshold=1.0, min_inter_event_time="3H")
+
+    assert [1, 9] == [df.index.get_loc(x) for x in test["start"]]
+    assert [4, 9] == [df.index.get_loc(x) for x in test["peak_date"]]
+    assert [4, 12] == [df.index.get_loc(x) for x in test["end"]]
+    assert [7.0, 9.0] == test["peak"].tolist()
+    assert [20.0, 25.0] == test["total"].tolist()
+
+
+def test_independent_events_recession_ratio():
+    ts = TimeSeries(_event_series())
+    test = ts.independent_events(
+        "discharge", threshold=3.5, min_inter_event_time="1H", recession_ratio=0.3)
+
+    assert [7.0, 9.0] == test["peak"].tolist()
+    assert [20.0, 25.0] == test["total"].tolist()
+
+    test = ts.independent_events(
+        "discharge", threshold=3.5, min_inter_event_time="1H", recession_ratio=0.4)
+
+    assert [6.0, 7.0, 9.0, 9.0] == test["peak"].tolist()
+
+
+def test_iter_independent_events():
+    rng = np.random.default_rng(5)
+    values = rng.gamma(0.3, 2.0, 2000)
+    values[rng.random(2000) < 0.6] = 0.0
+    df = pd.DataFrame({
+            "date": pd.date_range("2000-01-01", periods=2000, freq="10min"),
+            "precipitation": values
+            }).set_index("date")
+    kwargs = dict(
+        varname="precipitation", threshold=0.0,
+        min_inter_event_time="1H", recession_ratio=None)
+
+    ref = TimeSeries(df).independent_events(**kwargs)
+    chunks = (TimeSeries(df.iloc[i:i+137]) for i in range(0, len(df), 137))
+    test = pd.concat(iter_independent_events(chunks, **kwargs), ignore_index=True)
+
+    assert_frame_equal(ref, test)
+
+
+def _quarter_hourly_series():
+    rng = np.random.default_rng(11)
+    index = pd.date_range("2000-10-01", "2002-03-01", freq="15min", inclusive="left", name="date")
+    df = pd.DataFrame({
+            "discharge": rng.gamma(2.0, 5.0, len(index)),
+            "precipitation": rng.gamma(0.3, 1.0, len(index))
+            }, index=index)
+    df.iloc[100:300, 0] = np.nan
+    return df
+
+
+def test_resample_daily():
+    df = _quarter_hourly_series()
+    test = TimeSeries(df).resample(
+        "day", rules={"discharge": ["mean", "max"], "precipitation": "sum"})
+    ref = df.resample("D").agg({"discharge": ["mean", "max"], "precipitation": "sum"})
+
+    assert ["discharge_mean", "discharge_max", "precipitation"] == list(test.df.columns)
+    np.testing.assert_allclose(ref[("discharge", "mean")], test.df["discharge_mean"])
+    np.testing.assert_allclose(ref[("discharge", "max")], test.df["discharge_max"])
+    np.testing.assert_allclose(ref[("precipitation", "sum")], test.df["precipitation"])
+
+
+def test_resample_monthly_and_windows():
+    df = _quarter_hourly_series()
+    ts = TimeSeries(df)
+
+    test = ts.resample("month", rules={"precipitation": "sum"})
+    assert_frame_equal(df[["precipitation"]].resample("MS").sum(), test.df, check_freq=False)
+
+    test = ts.resample("6H", rules={"discharge": "min"})
+    np.testing.assert_allclose(df["discharge"].resample("6H").min(), test.df["discharge"])
+
+
+def test_resample_hyd_year_coverage():
+    df = _quarter_hourly_series()
+    test = TimeSeries(df).resample(
+        "hyd_year", rules={"precipitation": "sum", "discharge": "count"},
+        min_coverage={"precipitation": 0.9})
+
+    assert [pd.Timestamp("1999-11-01"), pd.Timestamp("2000-11-01"),
+            pd.Timestamp("2001-11-01")] == list(test.df.index)
+    assert [31*96 - 200, 365*96, 120*96] == test.df["discharge"].tolist()
+    assert np.isnan(test.df["precipitation"].iloc[0])
+    assert np.isnan(test.df["precipitation"].iloc[2])
+    assert np.isclose(df.loc["2000-11-01":"2001-10-31", "precipitation"].sum(),
+                      test.df["precipitation"].iloc[1])
+
+
+def test_resample_incremental():
+    df = _quarter_hourly_series()
+    rules = {"discharge": ["mean", "max"], "precipitation": "sum"}
+    ref = TimeSeries(df).resample("month", rules=rules)
+
+    previous = TimeSeries(df[:"2001-06-10 07:00"]).resample("month", rules=rules)
+    test = TimeSeries(df).resample("month", rules=rules, previous=previous)
+
+    assert_frame_equal(ref.df, test.df)
+
+
+def test_resample_tz_aware():
+    index = pd.date_range(
+        "2000-03-25", "2000-03-28", freq="H", inclusive="left", tz="Europe/Berlin", name="date")
+    df = pd.DataFrame({"discharge": np.arange(len(index), dtype=float)}, index=index)
+    ts = TimeSeries(df)
+
+    test = ts.resample("day", rules={"discharge": ["count", "sum"]}, min_coverage=0.99)
+    ref = df.resample("D").agg(["count", "sum"])
+    assert_index_equal(ref.index, test.df.index, exact=False)
+    assert [24, 23, 24] == test.df["discharge_count"].tolist()
+    np.testing.assert_allclose(ref[("discharge", "sum")], test.df["discharge_sum"])
+
+    test = ts.resample("6H", rules={"discharge": "sum"})
+    assert_frame_equal(df.resample("6H").sum(), test.df, check_freq=False)
+
+
+def test_resample_single_date():
+    df = pd.DataFrame({"discharge": [1.0]}, index=pd.DatetimeIndex(["2000-01-01"], name="date"))
+    assert [1.0] == TimeSeries(df).resample("day").df["discharge"].tolist()
+    with pytest.raises(ValueError):
+        TimeSeries(df).resample("day", min_coverage=0.5)
+
+
+def _daily_series():
+    rng = np.random.default_rng(3)
+    index = pd.date_range("1990-01-01", "1999-12-31", freq="D", name="date")
+    df = pd.DataFrame({"discharge": rng.gamma(2.0, 5.0, len(index))}, index=index)
+    df.iloc[500:520] = np.nan
+    return df
+
+
+def test_append_yearly_aggregates():
+    df = _daily_series()
+    ts = TimeSeries(df.iloc[:1000])
+    ts.yearly_aggregates("discharge", aggr="hyd_year")
+    for i in range(1000, len(df), 333):
+        ts.append(df.iloc[i:i+333])
+
+    assert_frame_equal(df, ts.df)
+    ref = TimeSeries(df).yearly_aggregates("discharge", aggr="hyd_year")
+    assert_frame_equal(ref, ts.yearly_aggregates("discharge", aggr="hyd_year"))
+    assert 2000 == ref.index[-1]
+    assert len(df) - 20 == ref["count"].sum()
+
+
+def test_append_rejects_earlier_dates():
+    df = _daily_series()
+    ts = TimeSeries(df.iloc[:100])
+    try:
+        ts.append(df.iloc[99:120])
+        assert False
+    except ValueError:
+        pass
+
+
+def test_append_rejects_unsorted_dates():
+    df = _daily_series()
+    ts = TimeSeries(df.iloc[:100])
+    with pytest.raises(ValueError):
+        ts.append(df.iloc[[101, 100, 102]])
+
+
+def test_yearly_aggregates_index_change():
+    df = _daily_series()
+    ts = TimeSeries(df.copy())
+    ts.yearly_aggregates("discharge")
+    ts.df.drop(ts.df.index[:400], inplace=True)
+
+    ref = TimeSeries(df.iloc[400:]).yearly_aggregates("discharge")
+    assert_frame_equal(ref, ts.yearly_aggregates("discharge"))
+
+
+def test_annual_principal_values():
+    df = _daily_series()
+    ts = TimeSeries(df.iloc[:2000])
+    ts.annual_principal_values(["discharge"])
+    ts.append(df.iloc[2000:])
+    test = ts.annual_principal_values(["discharge"])
+    ref = TimeSeries(df).principal_values_table(
+        df.index[0], df.index[-1], ["discharge"])
+
+    assert_frame_equal(ref, test)
+
+    df_hyd = TimeSeries(df).hyd_year().df
+    ref = TimeSeries(df_hyd).principal_values_table(
+        df.index[0], df.index[-1], ["discharge"], aggr_col_name="hyd_year")
+    test = ts.annual_principal_values(["discharge"], aggr="hyd_year")
+
+    assert_frame_equal(ref, test)
+
+
+def test_annual_principal_values_without_concat():
+    df = _daily_series()
+    ts = TimeSeries(df.iloc[:2000])
+    ts.annual_principal_values(["discharge"])
+    ts.append(df.iloc[2000:2100])
+    ts.append(df.iloc[2100:])
+    test = ts.annual_principal_values(["discharge"])
+
+    # the appended chunks are merged into the cache, not into the DataFrame
+    assert 2 == len(ts._pending)
+    assert_frame_equal(TimeSeries(df).annual_principal_values(["discharge"]), test)
+
+
+def test_calendar_cache():
+    df = _daily_series()
+    ts = TimeSeries(df.copy())
+    year = ts.calendar("year")
+
+    assert np.int16 == year.dtype
+    assert not year.flags.writeable
+    assert df.index.year.tolist() == year.tolist()
+    assert df.index.dayofyear.tolist() == ts.calendar("dayofyear").tolist()
+    assert year is ts.calendar("year")
+    hyd_year = ts.calendar("hyd_year", 11, 1)
+    assert TimeSeries(df).hyd_year().df["hyd_year"].tolist() == hyd_year.tolist()
+    assert hyd_year is ts.calendar("hyd_year", 11, 1)
+
+    # a new index invalidates the cache
+    ts.df.index = ts.df.index + pd.Timedelta("400D")
+    assert (df.index + pd.Timedelta("400D")).year.tolist() == ts.calendar("year").tolist()
+
+    ts = TimeSeries(df.iloc[:100])
+    assert 100 == len(ts.calendar("month"))
+    ts.append(df.iloc[100:150])
+    assert df.index[:150].month.tolist() == ts.calendar("month").tolist()
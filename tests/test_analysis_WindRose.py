@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+import pytest
+from matplotlib.figure import Figure
+
+from flyingfish.timeseries import TimeSeries
+from flyingfish.windrose import WindRose
+
+
+def test_update_sectors_and_calms():
+    rose = WindRose(n_sectors=4, speed_bins=[0.5, 5, np.inf])
+    rose.update([0, 44.9, 45, 359, 180, 90, 200, np.nan], [1, 1, 1, 6, 7, 100, 0.2, 3])
+
+    assert [[2, 1], [1, 1], [0, 1], [0, 0]] == rose.counts.tolist()
+    assert 1 == rose.n_calm
+    assert 1 == rose.n_missing
+    assert 7 == rose.n
+    assert [0, 90, 180, 270] == rose.sectors().tolist()
+    assert ["0.5-5", ">= 5"] == rose.speed_labels()
+    assert pytest.approx(100) == rose.frequencies().to_numpy().sum() + rose.calm_frequency()
+
+
+def test_finite_last_speed_bin():
+    rose = WindRose(n_sectors=4, speed_bins=[0.5, 2, 4])
+    rose.update([0, 0, 90, 90, 180, 270], [1, 3, 1, 10, 0.2, 4])
+
+    assert ["0.5-2", "2-4", ">= 4"] == rose.speed_labels()
+    assert [[1, 1, 0], [1, 0, 1], [0, 0, 0], [0, 0, 1]] == rose.counts.tolist()
+    assert 6 == rose.n
+    assert pytest.approx(100) == rose.frequencies().to_numpy().sum() + rose.calm_frequency()
+
+
+def _mast(seed: int, n: int = 5000):
+    rng = np.random.default_rng(seed)
+    index = pd.date_range("2020-01-01", periods=n, freq="10min", name="date")
+    return pd.DataFrame({
+        "wind_direction": rng.uniform(0, 360, n),
+        "wind_speed": rng.gamma(2.0, 2.0, n)}, index=index)
+
+
+def test_chunks_and_merge():
+    df = _mast(1)
+    ref = WindRose.from_timeseries(TimeSeries(df))
+
+    chunked = WindRose()
+    for i in range(0, len(df), 777):
+        chunked.update(df["wind_direction"].iloc[i:i+777], df["wind_speed"].iloc[i:i+777])
+    assert (ref.counts == chunked.counts).all()
+    assert ref.n_calm == chunked.n_calm
+
+    other = _mast(2)
+    merged = WindRose.from_timeseries(TimeSeries(df)).merge(
+        WindRose.from_timeseries(TimeSeries(other)))
+    both = WindRose.from_timeseries(TimeSeries(pd.concat([df, other])))
+    assert (both.counts == merged.counts).all()
+    assert both.n == merged.n == 10000
+
+    with pytest.raises(ValueError):
+        ref.merge(WindRose(n_sectors=8))
+
+
+def test_plot_wind_rose(tmp_path):
+    rose = WindRose.from_timeseries(TimeSeries(_mast(3)))
+    assert isinstance(rose.plot(), Figure)
+    path = str(tmp_path / "rose.png")
+    assert path == rose.plot(path=path, figsize=(3, 3), dpi=40)
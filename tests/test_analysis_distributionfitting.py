@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+import pytest
+import scipy.stats
+
+from flyingfish.numericallist import NumericalList, Status
+from flyingfish.distributionfitting import (
+    lmoments, fit, fit_batch, bootstrap_return_levels)
+
+
+def _sample(seed: int = 0, size: int = 5000):
+    return scipy.stats.genextreme(c=-0.1, loc=100, scale=30).rvs(
+        size=size, random_state=np.random.default_rng(seed))
+
+
+def test_lmoments():
+    l1, l2, t3, t4 = lmoments(np.array([1.0, 2.0, 3.0, 4.0, 10.0]))
+    assert 4.0 == pytest.approx(l1)
+    assert 2.0 == pytest.approx(l2)
+    assert 0.5 == pytest.approx(t3)
+    assert 0.5 == pytest.approx(t4)
+
+
+def test_fit_gumbel_lmoments():
+    data = NumericalList(input=[1.0, 2.0, 3.0, 4.0, 10.0], status=Status.READY)
+    test = fit(data, "gumbel")
+    assert 2.0/np.log(2) == pytest.approx(test.params["scale"])
+    assert 4.0 - 0.5772156649*2.0/np.log(2) == pytest.approx(test.params["loc"])
+
+
+def test_fit_pearson3_symmetric_sample():
+    data = NumericalList(input=[1.0, 2.0, 3.0, 4.0, 5.0], status=Status.READY)
+    test = fit(data, "pearson3")
+    norm = fit(data, "norm")
+    assert 0.0 == test.params["skew"]
+    assert 3.0 == pytest.approx(test.params["loc"])
+    assert norm.params["scale"] == pytest.approx(test.params["scale"])
+    assert norm.return_level(100) == pytest.approx(test.return_level(100))
+
+
+@pytest.mark.parametrize("distribution", ["gumbel", "gev", "pearson3", "lognorm", "norm"])
+def test_fit_lmoments_close_to_mle(distribution):
+    data = NumericalList(input=_sample(), status=Status.READY)
+    lmom = fit(data, distribution, method="lmoments")
+    mle = fit(data, distribution, method="mle")
+    assert lmom.return_level(10) == pytest.approx(mle.return_level(10), rel=0.05)
+    assert {"ks", "ks_pvalue", "ad", "loglik", "aic"} == set(lmom.goodness_of_fit(data))
+
+
+def test_fit_batch_matches_single_fit():
+    samples = np.array([_sample(seed, 50) for seed in range(20)])
+    test = fit_batch(samples, "gev", return_periods=[10, 100])
+    for i, sample in enumerate(samples):
+        ref = fit(NumericalList(input=sample, status=Status.READY), "gev")
+        assert pytest.approx(list(ref.params.values())) == test.loc[i, ["c", "loc", "scale"]].tolist()
+        assert ref.return_level(100) == pytest.approx(test.loc[i, "T100"])
+
+
+def test_fit_batch_process_pool():
+    samples = {f"station_{i}": _sample(i, 40 + i) for i in range(6)}
+    kwargs = dict(samples=samples, distribution="gumbel", method="mle")
+    pd.testing.assert_frame_equal(
+        fit_batch(**kwargs), fit_batch(**kwargs, processes=2, chunksize=2))
+
+
+def test_bootstrap_return_levels():
+    data = NumericalList(input=_sample(size=60), status=Status.READY)
+    test = bootstrap_return_levels(data, "gev", [10, 100], n_boot=500, seed=1)
+    assert [10, 100] == test.index.tolist()
+    assert (test["lower"] < test["estimate"]).all()
+    assert (test["estimate"] < test["upper"]).all()
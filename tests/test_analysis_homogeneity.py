@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from flyingfish.numericallist import NumericalList, Status
+from flyingfish.timeseries import TimeSeries
+from flyingfish.homogeneity import pettitt, snht, buishand, mann_kendall, homogeneity_batch
+
+
+def _shifted(seed: int = 0):
+    rng = np.random.default_rng(seed)
+    return np.round(np.r_[rng.normal(0, 1, 30), rng.normal(2, 1, 20)], 1)
+
+
+def test_pettitt_matches_pairwise_definition():
+    x = _shifted()
+    n = len(x)
+    u = [np.sign(x[:t, None] - x[None, t:]).sum() for t in range(1, n)]
+    test = pettitt(NumericalList(x, status=Status.READY), seed=1)
+
+    assert np.max(np.abs(u)) == test["statistic"]
+    assert np.argmax(np.abs(u)) + 1 == test["change_point"]
+    assert 0.002 > test["p_value"]
+
+
+def test_mann_kendall_matches_pairwise_definition():
+    x = _shifted()
+    i, j = np.triu_indices(len(x), k=1)
+    test = mann_kendall(NumericalList(x, status=Status.READY))
+
+    assert np.sign(x[j] - x[i]).sum() == test["statistic"]
+    assert 0.001 > test["p_value"]
+
+
+def test_snht_and_buishand():
+    x = _shifted()
+    nl = NumericalList(x, status=Status.READY)
+    z = (x - x.mean())/x.std(ddof=1)
+    t = [k*z[:k].mean()**2 + (len(x)-k)*z[k:].mean()**2 for k in range(1, len(x))]
+    test = snht(nl, seed=1)
+
+    assert pytest.approx(max(t)) == test["statistic"]
+    assert np.argmax(t) + 1 == test["change_point"]
+    assert 0.002 > test["p_value"]
+
+    test = buishand(nl, seed=1)
+    s = np.cumsum(x - x.mean())[:-1]
+    assert pytest.approx(np.abs(s).max()/(x.std()*np.sqrt(len(x)))) == test["statistic"]
+    assert 0.002 > test["p_value"]
+
+
+def test_homogeneous_series():
+    nl = NumericalList(np.random.default_rng(2).normal(size=60), status=Status.READY)
+    for test in [pettitt, snht, buishand]:
+        assert 0.05 < test(nl, seed=3)["p_value"] <= 1
+
+
+def test_timeseries_change_date():
+    index = pd.date_range("1951-01-01", periods=50, freq="YS", name="date")
+    ts = TimeSeries(pd.DataFrame({"discharge": _shifted()}, index=index))
+
+    assert pd.Timestamp("1981-01-01") == pettitt(ts, "discharge", seed=1)["change_point"]
+
+
+def test_homogeneity_batch():
+    samples = {f"s{i}": _shifted(i) for i in range(6)}
+    test = homogeneity_batch(samples, n_permutations=199, seed=5)
+
+    assert list(samples) == list(test.index)
+    assert (test["snht_p_value"] < 0.05).all()
+    assert "mann_kendall_change_point" not in test.columns
+    ref = pettitt(NumericalList(samples["s0"], status=Status.READY), n_permutations=0)
+    assert ref["statistic"] == test.loc["s0", "pettitt_statistic"]
+
+    parallel = homogeneity_batch(samples, n_permutations=199, seed=5, processes=2, chunksize=2)
+    pd.testing.assert_frame_equal(test, parallel)
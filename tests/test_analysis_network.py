@@ -0,0 +1,116 @@
+import pandas as pd
+import numpy as np
+import datetime
+
+from flyingfish.timeseries import TimeSeries
+from flyingfish.network import (
+    principal_values_batch, to_long_format, ausreisser_batch, partial_series_batch,
+    append_batch, annual_principal_values_batch)
+
+
+def _stations():
+    rng = np.random.default_rng(1)
+    index = pd.date_range("2000-01-01", "2004-12-31", freq="D", name="date")
+    return {
+        name: TimeSeries(pd.DataFrame(
+            {"discharge": rng.gamma(2.0, 3.0, len(index))}, index=index))
+        for name in ["a", "b", "c"]}
+
+
+def test_principal_values_batch_matches_single_station():
+    stations = _stations()
+    date_start = datetime.datetime(2001, 1, 1)
+    date_end = datetime.datetime(2003, 12, 31)
+    windows = {"winter": [11, 12, 1, 2, 3, 4], "summer": [5, 6, 7, 8, 9, 10]}
+
+    test = principal_values_batch(
+        data=stations,
+        date_start=date_start,
+        date_end=date_end,
+        varname="discharge",
+        windows=windows)
+
+    for name, ts in stations.items():
+        for window, months in windows.items():
+            ref = ts.principal_values(
+                date_start=date_start,
+                date_end=date_end,
+                varname="discharge",
+                months=months)
+            assert ref == tuple(test.loc[(name, window)])
+
+
+def test_principal_values_batch_long_format_hyd_year():
+    stations = _stations()
+    long = to_long_format(stations, varname="discharge")
+    date_start = datetime.datetime(2000, 11, 1)
+    date_end = datetime.datetime(2004, 10, 31)
+
+    test = principal_values_batch(
+        data=long,
+        date_start=date_start,
+        date_end=date_end,
+        varname="discharge",
+        aggr_col_name="hyd_year",
+        chunk_stations=2)
+
+    for name, ts in stations.items():
+        ref = ts.hyd_year().principal_values(
+            date_start=date_start,
+            date_end=date_end,
+            varname="discharge",
+            aggr_col_name="hyd_year")
+        assert ref == tuple(test.loc[(name, "year")])
+
+
+def test_principal_values_batch_process_pool():
+    stations = _stations()
+    kwargs = dict(
+        data=stations,
+        date_start=datetime.datetime(2000, 1, 1),
+        date_end=datetime.datetime(2004, 12, 31),
+        varname="discharge")
+
+    pd.testing.assert_frame_equal(
+        principal_values_batch(**kwargs),
+        principal_values_batch(**kwargs, processes=2, chunk_stations=1))
+
+
+def test_ausreisser_batch_long_format_matches_single_station():
+    stations = _stations()
+    long = to_long_format(stations, varname="discharge")
+
+    for method in ["zscore", "mad", "hampel"]:
+        test = ausreisser_batch(long, varnames=["discharge"], method=method, solving="cap_outlier")
+        for name, ts in stations.items():
+            ref = ts.ausreisser(method=method, solving="cap_outlier")
+            np.testing.assert_allclose(
+                ref.df["discharge"].to_numpy(),
+                test.loc[test["station"] == name, "discharge"].to_numpy())
+
+
+def test_partial_series_batch_matches_single_station():
+    stations = _stations()
+
+    for kwargs in [dict(threshold=10.0), dict(per=95)]:
+        test = partial_series_batch(stations, varname="discharge", **kwargs)
+        for name, ts in stations.items():
+            ref = ts.partial_series("discharge", **kwargs)
+            pd.testing.assert_frame_equal(
+                ref, test[test["station"] == name].drop(columns="station").reset_index(drop=True))
+
+
+def test_append_batch_daily_refresh():
+    stations = _stations()
+    long = to_long_format(stations, "discharge")
+    last = long["date"] > pd.Timestamp("2004-12-29")
+    data = {name: TimeSeries(ts.df.iloc[:-2]) for name, ts in stations.items()}
+    annual_principal_values_batch(data, "discharge", aggr="hyd_year")
+
+    append_batch(data, long[last])
+    test = annual_principal_values_batch(data, "discharge", aggr="hyd_year")
+
+    for name, ts in stations.items():
+        assert ts.df.equals(data[name].df)
+        ref = ts.annual_principal_values(["discharge"], aggr="hyd_year")
+        assert ref.loc["discharge"].tolist() == test.loc[name].tolist()
@@ -0,0 +1,29 @@
+from benchmarks.generators import synthetic_frame, synthetic_long_frame
+from benchmarks.suite import missing_cases, run, compare
+
+
+def test_generators():
+    df = synthetic_frame(144, "10min")
+    assert len(df) == 144
+    assert df.index[-1] - df.index[0] == df.index.freq * 143
+    assert (df > 0).all().all()
+    df = synthetic_long_frame(3, 10, "hourly")
+    assert len(df) == 30
+    assert list(df.columns) == ["station", "date", "discharge"]
+
+
+def test_all_public_methods_covered():
+    assert missing_cases() == []
+
+
+def test_run_and_compare():
+    results = run(points=[500], stations=[2], station_points=400, repeat=1, verbose=False)
+    names = {r["name"] for r in results}
+    assert "TimeSeries.hyd_year" in names and "network.partial_series_batch" in names
+    assert all(r["time_s"] >= 0 and r["peak_memory_bytes"] >= 0 for r in results)
+
+    assert compare(results, results) == []
+    slower = [{**r, "time_s": r["time_s"]*2 + 1} for r in results]
+    regressions = compare(slower, results)
+    assert len(regressions) == len(results)
+    assert all(r["field"] == "time_s" and r["ratio"] > 1 for r in regressions)
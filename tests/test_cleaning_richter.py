@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from flyingfish.timeseries import TimeSeries
+from flyingfish.richter import (
+    precipitation_type, richter_correction_values, richter_correction, richter_correction_batch)
+
+
+def test_precipitation_type():
+    months = np.array([7, 1, 1, 1, 12])
+    temperature = np.array([15.0, 5.0, 1.5, -4.0, np.nan])
+    assert [0, 1, 2, 3, 2] == precipitation_type(months, temperature).tolist()
+
+    types = np.array(["rain", "rain", "mixed", "snow", "snow"])
+    assert [0, 1, 2, 3, 3] == precipitation_type(months, types=types).tolist()
+
+    with pytest.raises(ValueError):
+        precipitation_type(months, types=np.array(["hail"]*5))
+
+
+def test_richter_correction_values():
+    values = np.array([10.0, 10.0, 0.0, np.nan])
+    test = richter_correction_values(values, np.array([0, 3, 3, 0]), np.array([1, 0, 0, 0]))
+
+    assert pytest.approx(10 + 0.310*10**0.38) == test[0]
+    assert pytest.approx(10 + 0.720*10**0.82) == test[1]
+    assert 0.0 == test[2]
+    assert np.isnan(test[3])
+
+
+def _gauge():
+    index = pd.date_range("2000-01-01", periods=6, freq="61D", name="date")
+    return pd.DataFrame({
+        "precipitation": [2.0, 0.0, 5.0, 12.0, 3.0, 1.0],
+        "temperature": [-2.0, 4.0, 12.0, 18.0, 8.0, 1.0]}, index=index)
+
+
+def test_richter_correction():
+    df = _gauge()
+    test = richter_correction(TimeSeries(df), exposure="C").df
+
+    # months 1, 3, 5, 7, 9, 11
+    b = np.array([0.330, 0.240, 0.280, 0.280, 0.280, 0.305])
+    eps = np.array([0.82, 0.46, 0.38, 0.38, 0.38, 0.55])
+    p = df["precipitation"].to_numpy()
+    np.testing.assert_allclose(p + b*p**eps, test["precipitation"])
+    assert df["temperature"].equals(test["temperature"])
+    assert 2.0 == df["precipitation"].iloc[0]
+
+
+def test_richter_correction_batch():
+    df = _gauge()
+    long = pd.concat([df.reset_index().assign(station=s) for s in ["x", "y"]])
+    test = richter_correction_batch(long, exposures={"x": "A", "y": "D"})
+
+    for station, exposure in [("x", "A"), ("y", "D")]:
+        ref = richter_correction(TimeSeries(df), exposure=exposure).df
+        np.testing.assert_allclose(
+            ref["precipitation"], test[test["station"] == station]["precipitation"])
+
+    with pytest.raises(ValueError):
+        richter_correction_batch(long, exposures={"x": "A"})
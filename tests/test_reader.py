@@ -0,0 +1,59 @@
+import os
+import numpy as np
+import pandas as pd
+import pytest
+
+from flyingfish.reader import read_timeseries, iter_timeseries
+
+
+PATH = os.path.join(
+    os.path.dirname(__file__), "..", "flyingfish", "data",
+    "timeseries_discharge_waterlevel.csv")
+
+
+def test_read_timeseries_csv():
+    ts = read_timeseries(PATH)
+    assert ["water_level", "discharge_m3_s"] == list(ts.df.columns)
+    assert isinstance(ts.df.index, pd.DatetimeIndex)
+    assert "date" == ts.df.index.name
+    assert 1173 == len(ts.df)
+
+
+def test_read_timeseries_csv_timeframe_and_columns():
+    ts = read_timeseries(
+        PATH,
+        columns=["discharge_m3_s"],
+        date_start=pd.Timestamp(2019, 1, 1),
+        date_end=pd.Timestamp(2019, 1, 31),
+        dtype=np.float32,
+        chunksize=100)
+
+    ref = read_timeseries(PATH).df.loc["2019-01-01":"2019-01-31", ["discharge_m3_s"]]
+    assert ["discharge_m3_s"] == list(ts.df.columns)
+    assert np.float32 == ts.df["discharge_m3_s"].dtype
+    assert ref.index.equals(ts.df.index)
+
+
+def test_iter_timeseries_csv():
+    chunks = list(iter_timeseries(PATH, chunksize=500))
+    assert [500, 500, 173] == [len(ts.df) for ts in chunks]
+
+
+def test_read_timeseries_parquet(tmp_path):
+    pytest.importorskip("pyarrow")
+    ref = read_timeseries(PATH).df
+    path = str(tmp_path / "gauge.parquet")
+    ref.reset_index().to_parquet(path, row_group_size=100)
+
+    ts = read_timeseries(
+        path,
+        columns=["water_level"],
+        date_start=pd.Timestamp(2019, 1, 1),
+        date_end=pd.Timestamp(2019, 1, 31))
+    pd.testing.assert_frame_equal(
+        ref.loc["2019-01-01":"2019-01-31", ["water_level"]], ts.df, check_freq=False)
+
+    chunks = list(iter_timeseries(
+        path, chunksize=50, date_start=pd.Timestamp(2019, 1, 1),
+        date_end=pd.Timestamp(2019, 1, 31)))
+    assert 31 == sum(len(ts.df) for ts in chunks)
@@ -0,0 +1,63 @@
+import os
+import numpy as np
+import pandas as pd
+from matplotlib.figure import Figure
+
+from flyingfish.timeseries import TimeSeries
+from flyingfish.plotting import downsample_minmax, plot_batch
+
+
+def _series(n: int = 10_000):
+    rng = np.random.default_rng(4)
+    index = pd.date_range("2000-01-01", periods=n, freq="15min", name="date")
+    values = rng.gamma(2.0, 1.0, n)
+    values[1234 % n] = 100.0
+    values[5678 % n] = -5.0
+    return pd.DataFrame({"discharge": values, "precipitation": values/10}, index=index)
+
+
+def test_downsample_minmax():
+    values = _series()["discharge"].to_numpy()
+    positions = downsample_minmax(values, 100)
+
+    assert len(positions) <= 400
+    assert (np.diff(positions) > 0).all()
+    assert {0, 1234, 5678, len(values) - 1} <= set(positions)
+    for bucket in np.array_split(np.arange(len(values)), 100):
+        assert values[bucket].max() in values[positions]
+    assert np.arange(50).tolist() == downsample_minmax(np.arange(50.0), 100).tolist()
+
+
+def test_summation_curve():
+    df = _series(200)
+    df.iloc[3, 1] = np.nan
+    ts = TimeSeries(df)
+
+    test = ts.summation_curve("precipitation")
+    np.testing.assert_allclose(df["precipitation"].fillna(0).cumsum(), test)
+
+    df = pd.DataFrame({"precipitation": np.ones(6)}, index=pd.date_range(
+        "2000-10-30", periods=6, freq="D", name="date"))
+    test = TimeSeries(df).summation_curve("precipitation", reset="hyd_year")
+    assert [1, 2, 1, 2, 3, 4] == test.tolist()
+
+
+def test_plot_hydrograph():
+    ts = TimeSeries(_series())
+    fig = ts.plot_hydrograph(["discharge", "precipitation"], figsize=(5, 3), dpi=20)
+
+    assert isinstance(fig, Figure)
+    line = fig.axes[0].get_lines()[0]
+    assert len(line.get_ydata()) <= 4*100
+    assert 100.0 == max(line.get_ydata())
+
+
+def test_plot_batch(tmp_path):
+    data = {"a": TimeSeries(_series(500)), "b": TimeSeries(_series(800))}
+    paths = plot_batch(data, "discharge", str(tmp_path), processes=2, figsize=(3, 2), dpi=30)
+    assert all(os.path.getsize(path) > 0 for path in paths.values())
+
+    paths = plot_batch(data, "precipitation", str(tmp_path / "sum"), kind="summation_curve",
+                       reset="year", figsize=(3, 2), dpi=30)
+    assert ["a", "b"] == sorted(paths)
+    assert all(os.path.exists(path) for path in paths.values())